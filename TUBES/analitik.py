@@ -0,0 +1,125 @@
+# analitik.py
+# Perhitungan analitik deret waktu yang vektor (pandas/NumPy), terpisah dari akses database.
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+from konfigurasi import ANALITIK_JENDELA_HARI, ANALITIK_EWM_SPAN
+
+def hitung_rolling(harian: pd.DataFrame, jendela: tuple[int, ...] = ANALITIK_JENDELA_HARI, span: int = ANALITIK_EWM_SPAN,
+                   ewm_awal: dict | None = None) -> pd.DataFrame:
+    """Untuk setiap kolom `m` pada deret harian (index tanggal, urut naik) menambahkan m_rata{n} (rata-rata bergulir n hari
+    kalender), m_ewm (rata-rata eksponensial, adjust=False) dan m_delta (selisih terhadap hari data sebelumnya).
+    `ewm_awal` = nilai EWM hari sebelum baris pertama, untuk melanjutkan perhitungan ekor tanpa mengulang seluruh riwayat."""
+    hasil = {}
+    for kolom in harian.columns:
+        seri = harian[kolom]
+        hasil[kolom] = seri
+        for n in jendela:
+            hasil[f"{kolom}_rata{n}"] = seri.rolling(f"{n}D", min_periods=1).mean()
+        awal = (ewm_awal or {}).get(kolom)
+        if awal is None or pd.isna(awal):
+            hasil[f"{kolom}_ewm"] = seri.ewm(span=span, adjust=False, ignore_na=True).mean()
+        else: # Rekursi EWM dilanjutkan dari nilai terakhir: y0 = awal, y_t = a*x_t + (1-a)*y_(t-1)
+            seri_awal = pd.concat([pd.Series([awal], index=[seri.index[0] - pd.Timedelta(days=1)]), seri])
+            hasil[f"{kolom}_ewm"] = seri_awal.ewm(span=span, adjust=False, ignore_na=True).mean().iloc[1:]
+        hasil[f"{kolom}_delta"] = seri - seri.ffill().shift(1)
+    return pd.DataFrame(hasil, index=harian.index)
+
+class RollingInkremental:
+    """Menyimpan deret harian dan hasil hitung_rolling satu sumber data. Saat ada tulis baru, hanya ekor mulai
+    tanggal perubahan terkecil yang dibaca ulang dan dihitung ulang (ditambah konteks jendela terpanjang)."""
+
+    def __init__(self, muat_harian, isi_nol: bool = False, jendela: tuple[int, ...] = ANALITIK_JENDELA_HARI, span: int = ANALITIK_EWM_SPAN):
+        self.muat_harian = muat_harian # fungsi(mulai: date | None) -> DataFrame harian berindeks DatetimeIndex (hanya hari berdata)
+        self.isi_nol = isi_nol # True untuk jumlah harian (kalori, air): hari tanpa catatan bernilai 0
+        self.jendela = jendela
+        self.span = span
+        self.harian: pd.DataFrame | None = None
+        self.hasil: pd.DataFrame | None = None
+        self.jumlah_hitung_penuh = 0
+        self.jumlah_hitung_ekor = 0
+        self._kunci = threading.Lock()
+
+    def ambil(self, perubahan: tuple[bool, datetime.date | None]) -> pd.DataFrame:
+        """`perubahan` = (ada perubahan, tanggal terkecil yang berubah atau None jika tidak diketahui)."""
+        ada, mulai = perubahan
+        with self._kunci:
+            if self.hasil is None or (ada and mulai is None):
+                self._hitung_penuh()
+            elif ada:
+                self._hitung_ekor(pd.Timestamp(mulai))
+            return self.hasil.copy()
+
+    def _lengkapi(self, harian: pd.DataFrame) -> pd.DataFrame:
+        return harian.asfreq("D", fill_value=0) if self.isi_nol and not harian.empty else harian
+
+    def _hitung_penuh(self) -> None:
+        self.harian = self._lengkapi(self.muat_harian(None))
+        self.hasil = hitung_rolling(self.harian, self.jendela, self.span)
+        self.jumlah_hitung_penuh += 1
+
+    def _hitung_ekor(self, mulai: pd.Timestamp) -> None:
+        ekor = self.muat_harian(mulai.date())
+        if not self.hasil.empty: # Hari kosong yang diisi 0 antara akhir lama dan `mulai` juga baris baru
+            mulai = min(mulai, self.hasil.index[-1] + pd.Timedelta(days=1))
+        self.harian = self._lengkapi(pd.concat([self.harian[self.harian.index < mulai], ekor]))
+        if self.harian.empty:
+            self.hasil = hitung_rolling(self.harian, self.jendela, self.span)
+            return
+        # Konteks: jendela terpanjang sebelum `mulai`, minimal satu hari data sebelumnya (untuk delta)
+        konteks_awal = mulai - pd.Timedelta(days=max(self.jendela))
+        sebelumnya = self.harian.index[self.harian.index < mulai]
+        if len(sebelumnya):
+            konteks_awal = min(konteks_awal, sebelumnya[-1])
+        konteks = self.harian[self.harian.index >= konteks_awal]
+        sebelum = self.hasil[self.hasil.index < konteks_awal]
+        ewm_awal = {k: sebelum[f"{k}_ewm"].iloc[-1] for k in self.harian.columns} if not sebelum.empty else None
+        baru = hitung_rolling(konteks, self.jendela, self.span, ewm_awal)
+        self.hasil = pd.concat([self.hasil[self.hasil.index < mulai], baru[baru.index >= mulai]])
+        self.jumlah_hitung_ekor += 1
+
+# --- Downsampling seri untuk grafik ---
+def lttb(x, y, target: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indeks `target` titik yang paling mempertahankan bentuk seri (x urut naik).
+    Titik pertama & terakhir selalu ikut; setiap bucket dipilih dengan operasi vektor atas isi bucket."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if target >= n or target < 3:
+        return np.arange(n)
+    tepi = np.linspace(1, n - 1, target - 1).astype(np.int64) # target - 2 bucket untuk titik di tengah
+    terpilih = np.empty(target, dtype=np.int64)
+    terpilih[0], terpilih[-1] = 0, n - 1
+    a = 0
+    for i in range(target - 2):
+        mulai, akhir = tepi[i], tepi[i + 1]
+        akhir_berikut = tepi[i + 2] if i + 2 < len(tepi) else n
+        rata_x, rata_y = x[akhir:akhir_berikut].mean(), y[akhir:akhir_berikut].mean()
+        luas = np.abs((x[a] - rata_x) * (y[mulai:akhir] - y[a]) - (x[a] - x[mulai:akhir]) * (rata_y - y[a]))
+        a = mulai + int(np.argmax(luas))
+        terpilih[i + 1] = a
+    return terpilih
+
+def minmax_bucket(y, target: int) -> np.ndarray:
+    """Indeks titik minimum & maksimum per bucket (target // 2 bucket), ditambah titik pertama & terakhir; sepenuhnya vektor."""
+    seri = pd.Series(np.asarray(y, dtype=np.float64))
+    n = len(seri)
+    if target >= n or target < 4:
+        return np.arange(n)
+    bucket = (np.arange(n) * ((target - 2) // 2)) // n
+    kelompok = seri.groupby(bucket)
+    return np.unique(np.concatenate([[0, n - 1], kelompok.idxmin().dropna().to_numpy(np.int64), kelompok.idxmax().dropna().to_numpy(np.int64)]))
+
+def turunkan_sampel(df: pd.DataFrame, kolom_y: str, target: int, kolom_x: str | None = None, metode: str = "lttb") -> pd.DataFrame:
+    """Mengurangi baris df menjadi paling banyak `target` titik sebelum dikirim ke grafik.
+    kolom_x (numerik/datetime) dipakai sebagai sumbu LTTB; tanpa kolom_x posisi baris yang dipakai."""
+    if len(df) <= target:
+        return df
+    df = df.dropna(subset=[kolom_y])
+    if metode == "minmax":
+        indeks = minmax_bucket(df[kolom_y], target)
+    else:
+        x = np.arange(len(df)) if kolom_x is None else pd.to_numeric(df[kolom_x]).to_numpy()
+        indeks = lttb(x, df[kolom_y], target)
+    return df.iloc[indeks].reset_index(drop=True)
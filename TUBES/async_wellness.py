@@ -0,0 +1,129 @@
+# async_wellness.py
+# Facade asyncio untuk WellnessTracker: setiap method dijalankan di executor khusus yang memiliki
+# pool koneksinya sendiri, sehingga baca yang independen bisa ditunggu bersamaan dengan asyncio.gather.
+# Cache baca facade memakai generasi tabel yang sama dengan WellnessTracker lain untuk file database yang sama
+# (cache_wellness.generasi_untuk), sehingga tulis lewat salah satunya langsung terlihat oleh yang lain.
+import os
+import asyncio
+import datetime
+import functools
+import threading
+import weakref
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import database
+from manajer_wellness import WellnessTracker, TABEL_RIWAYAT
+from konfigurasi import DB_PATH, ASYNC_MAKS_KONKUREN
+
+# Method get_data_* per tabel riwayat
+_METHOD_RIWAYAT = {
+    "pengukuran_tubuh": "get_data_pengukuran",
+    "aktivitas_fisik": "get_data_aktivitas",
+    "asupan_makanan": "get_data_makanan",
+    "asupan_air": "get_data_air",
+    "catatan_harian": "get_data_catatan",
+}
+
+class _Panggilan:
+    """Status satu pemanggilan di executor, agar pembatalan dapat menghentikan query yang sedang berjalan."""
+
+    def __init__(self):
+        self._kunci = threading.Lock()
+        self.batal = False
+        self.conn: sqlite3.Connection | None = None
+
+    def pasang(self, conn: sqlite3.Connection | None) -> None:
+        with self._kunci:
+            self.conn = conn
+
+    def batalkan(self) -> None:
+        with self._kunci:
+            self.batal = True
+            if self.conn is not None:
+                # Query yang sedang berjalan gagal dengan "interrupted"; baca yang gagal dicatat (database.jumlah_gagal_baca)
+                # sehingga hasil kosongnya tidak disimpan dicache untuk pemanggil berikutnya
+                self.conn.interrupt()
+
+class AsyncWellnessTracker:
+    """Versi asyncio dari WellnessTracker. Semua method publik WellnessTracker tersedia sebagai coroutine
+    (mis. `await tracker.get_data_air(start=...)`); jumlah query yang berjalan bersamaan dibatasi maks_konkuren."""
+
+    def __init__(self, db_path: str = DB_PATH, maks_konkuren: int = ASYNC_MAKS_KONKUREN, pengguna: str | None = None):
+        self.maks_konkuren = maks_konkuren
+        if pengguna is not None: # Mode multi-pengguna: shard milik pengguna, tetap dengan koneksi sendiri
+            db_path = database.get_router().path_untuk(pengguna)
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db = database.PoolKoneksi(db_path, maks_konkuren)
+        self._executor = ThreadPoolExecutor(max_workers=maks_konkuren, thread_name_prefix="wellness-async")
+        self._tracker = WellnessTracker(self.db)
+        self._batas: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary() # Semaphore per event loop
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._batas:
+            self._batas[loop] = asyncio.Semaphore(self.maks_konkuren)
+        return self._batas[loop]
+
+    def _kerjakan(self, panggilan: _Panggilan, fungsi):
+        if panggilan.batal:
+            raise asyncio.CancelledError()
+        with self.db.koneksi() as conn: # Pemanggilan bersarang di dalam tracker memakai koneksi yang sama
+            panggilan.pasang(conn)
+            try:
+                return fungsi()
+            finally:
+                panggilan.pasang(None)
+
+    async def jalankan(self, fungsi, *args, **kwargs):
+        """Menjalankan fungsi sinkron apa pun di executor DB. Jika coroutine dibatalkan, query yang sedang berjalan di-interrupt."""
+        async with self._semaphore():
+            panggilan = _Panggilan()
+            future = asyncio.get_running_loop().run_in_executor(self._executor, self._kerjakan, panggilan, functools.partial(fungsi, *args, **kwargs))
+            try:
+                return await future
+            except asyncio.CancelledError:
+                panggilan.batalkan()
+                raise
+
+    def __getattr__(self, nama: str):
+        if nama.startswith("_"): # Hanya method publik yang diteruskan
+            raise AttributeError(nama)
+        method = getattr(self._tracker, nama)
+        if not callable(method):
+            return method
+
+        @functools.wraps(method)
+        async def coroutine(*args, **kwargs):
+            return await self.jalankan(method, *args, **kwargs)
+        return coroutine
+
+    # --- Baca bersamaan untuk halaman Streamlit ---
+    async def muat_riwayat(self, start: datetime.date | None = None, end: datetime.date | None = None, limit: int | None = None) -> dict:
+        """Lima tabel riwayat sekaligus: {nama_tabel: DataFrame bertipe}."""
+        hasil = await asyncio.gather(*(self.jalankan(getattr(self._tracker, _METHOD_RIWAYAT[tabel]), start=start, end=end, limit=limit) for tabel in TABEL_RIWAYAT))
+        return dict(zip(TABEL_RIWAYAT, hasil))
+
+    async def muat_analisis(self, periode_berat: str = "mingguan", start: datetime.date | None = None, end: datetime.date | None = None,
+                            maks_titik: int | None = None) -> dict:
+        """Data grafik halaman analisis: tren berat, tren IMT, kalori per jenis aktivitas, dan seri kalori (jika start & end diisi)."""
+        tugas = {
+            "tren_berat": self.jalankan(self._tracker.get_data_tren_berat_badan, periode_berat, maks_titik),
+            "tren_imt": self.jalankan(self._tracker.get_data_tren_imt, start, end, maks_titik),
+            "kalori_per_jenis": self.jalankan(self._tracker.get_kalori_aktivitas_per_jenis, start, end),
+        }
+        if start and end:
+            tugas["seri_kalori"] = self.jalankan(self._tracker.get_seri_kalori, start, end)
+        hasil = await asyncio.gather(*tugas.values())
+        return dict(zip(tugas, hasil))
+
+    # --- Siklus hidup ---
+    def tutup(self) -> None:
+        """Menghentikan executor (membatalkan pekerjaan yang belum mulai) dan menutup koneksinya."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.db.tutup()
+
+    async def __aenter__(self) -> "AsyncWellnessTracker":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.tutup)
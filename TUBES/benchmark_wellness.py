@@ -0,0 +1,247 @@
+# benchmark_wellness.py
+# Mengukur performa bagian-bagian WellnessTracker:
+#   python benchmark_wellness.py [--jumlah 100000]
+#   python benchmark_wellness.py --suite [--ukuran 30x5 365x5 1825x10] [--simpan baseline.json] [--bandingkan baseline.json]
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import inspect
+import datetime
+import argparse
+import platform
+import tempfile
+import warnings
+import statistics
+import tracemalloc
+import numpy as np
+import pandas as pd
+import database
+import data_sintetis
+from manajer_wellness import WellnessTracker
+from model import (PengukuranTubuh, AktivitasFisik, AsupanMakanan, AsupanAir, CatatanHarian, BatchAsupanAir,
+                   BatchPengukuranTubuh, PeringatanData, hitung_imt_batch)
+from konfigurasi import RIWAYAT_UKURAN_HALAMAN, KATALOG_DATASET_PATH
+
+def _ukur(fungsi, ulangan: int = 3) -> float:
+    """Waktu terbaik (detik) dari beberapa kali pemanggilan."""
+    terbaik = float('inf')
+    for _ in range(ulangan):
+        mulai = time.perf_counter()
+        fungsi()
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik
+
+def benchmark_imt(jumlah: int = 100_000, ulangan: int = 3) -> dict:
+    """Membandingkan IMT per baris (objek PengukuranTubuh via df.apply) dengan hitung_imt_batch."""
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        'tanggal': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 2000, jumlah), unit='D'),
+        'berat_kg': rng.uniform(40, 120, jumlah).round(1),
+        'tinggi_cm': rng.uniform(140, 200, jumlah).round(0),
+    })
+    df.loc[::1000, 'tinggi_cm'] = 0 # Sebagian data tidak valid agar jalur mask ikut terukur
+
+    def per_baris():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PeringatanData)
+            return df.apply(lambda row: PengukuranTubuh(row['tanggal'], row['berat_kg'], row['tinggi_cm']).hitung_imt(), axis=1)
+
+    def vektor():
+        return hitung_imt_batch(df['berat_kg'], df['tinggi_cm']).filled(0.0)
+
+    if not np.allclose(per_baris().to_numpy(), vektor()):
+        raise AssertionError("Hasil hitung_imt_batch berbeda dengan PengukuranTubuh.hitung_imt")
+    detik_per_baris = _ukur(per_baris, ulangan=1)
+    detik_vektor = _ukur(vektor, ulangan)
+    return {
+        "jumlah": jumlah,
+        "detik_per_baris": detik_per_baris,
+        "detik_vektor": detik_vektor,
+        "percepatan": detik_per_baris / detik_vektor if detik_vektor > 0 else float('inf'),
+    }
+
+def _memori_puncak(fungsi) -> int:
+    """Memori puncak (byte) yang dialokasikan selama fungsi berjalan."""
+    tracemalloc.start()
+    try:
+        fungsi()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def benchmark_memori(jumlah: int = 100_000) -> dict:
+    """Membandingkan memori puncak daftar objek PengukuranTubuh dengan BatchPengukuranTubuh kolumnar
+    (termasuk pembentukan parameter executemany per chunk)."""
+    rng = np.random.default_rng(42)
+    tanggal = np.datetime64('2020-01-01') + rng.integers(0, 2000, jumlah).astype('timedelta64[D]')
+    berat = rng.uniform(40, 120, jumlah).round(1)
+    tinggi = rng.uniform(140, 200, jumlah).round(0)
+
+    def objek():
+        daftar = [PengukuranTubuh(t, b, h) for t, b, h in zip(tanggal.tolist(), berat.tolist(), tinggi.tolist())]
+        params = [(p.tanggal.strftime("%Y-%m-%d"), p.berat_kg, p.tinggi_cm) for p in daftar]
+        return daftar, params
+
+    def kolumnar():
+        batch = BatchPengukuranTubuh(tanggal=tanggal, berat_kg=berat, tinggi_cm=tinggi)
+        for _ in batch.ke_params():
+            pass
+        return batch
+
+    return {"jumlah": jumlah, "byte_objek": _memori_puncak(objek), "byte_kolumnar": _memori_puncak(kolumnar)}
+
+# --- Suite WellnessTracker pada beberapa ukuran data ---
+_BARU = { # Objek baru per jenis data (akhiran nama method tambah_*/hapus_*/get_data_*)
+    "pengukuran": lambda d: PengukuranTubuh(d, 70.0, 170.0),
+    "aktivitas": lambda d: AktivitasFisik(d, "Berlari", 30, 250.0),
+    "makanan": lambda d: AsupanMakanan(d, "Nasi goreng", 450.0, 12.0, 60.0, 15.0),
+    "air": lambda d: AsupanAir(d, 250),
+    "catatan": lambda d: CatatanHarian(d, 4, 3, "Benchmark"),
+}
+
+def _skenario(hari_ini: datetime.date, awal: datetime.date) -> dict:
+    """{nama: (persiapan, aksi)}. persiapan(tracker) tidak diukur dan hasilnya (tuple) menjadi argumen tambahan aksi."""
+    skenario = {}
+    for jenis, baru in _BARU.items():
+        skenario[f"tambah_{jenis}"] = (None, lambda t, j=jenis, b=baru: getattr(t, f"tambah_{j}")(b(hari_ini)))
+        skenario[f"tambah_{jenis}_batch"] = (None, lambda t, j=jenis, b=baru: getattr(t, f"tambah_{j}_batch")([b(hari_ini) for _ in range(100)]))
+        skenario[f"hapus_{jenis}"] = (lambda t, j=jenis, b=baru: (_tambah_untuk_hapus(t, j, b(hari_ini)),), lambda t, id_data, j=jenis: getattr(t, f"hapus_{j}")(id_data))
+        for awalan in ("get_data", "get_riwayat"):
+            skenario[f"{awalan}_{jenis}"] = (None, lambda t, j=jenis, a=awalan: getattr(t, f"{a}_{j}")(start=awal, end=hari_ini, limit=RIWAYAT_UKURAN_HALAMAN))
+    skenario.update({
+        "tambah_batch_rekaman": (None, lambda t: t.tambah_batch_rekaman(BatchAsupanAir(tanggal=np.full(1000, np.datetime64(hari_ini, "D")), jumlah_ml=np.full(1000, 200)))),
+        "kirim_tambah": (None, lambda t: t.kirim_tambah(AsupanAir(hari_ini, 200)).result()),
+        "flush_tulis": (None, lambda t: t.flush_tulis()),
+        "arsipkan": (None, lambda t: t.arsipkan(max((hari_ini - awal).days // 2, 1))), # Ulangan berikutnya: tidak ada yang dipindah
+        "cari_makanan": (None, lambda t: t.cari_makanan("nasi goreng")),
+        "cari_catatan": (None, lambda t: t.cari_catatan("tidur", start=awal, end=hari_ini)),
+        "cari_katalog": (None, lambda t: [t.cari_katalog(teks) for teks in ("n", "na", "nas", "nasi g", "gor")]),
+        "impor_katalog": (None, lambda t: t.impor_katalog(KATALOG_DATASET_PATH)),
+        "cek_konsistensi_ringkasan": (None, lambda t: t.cek_konsistensi_ringkasan()),
+        "rebuild_ringkasan_harian": (None, lambda t: t.rebuild_ringkasan_harian()),
+        "get_analitik_rolling": (None, lambda t: t.get_analitik_rolling()),
+        "get_data_tren_berat_badan": (None, lambda t: [t.get_data_tren_berat_badan(p, maks_titik=500) for p in ("harian", "mingguan", "bulanan")]),
+        "get_data_tren_imt": (None, lambda t: t.get_data_tren_imt(maks_titik=500)),
+        "get_kalori_aktivitas_per_jenis": (None, lambda t: t.get_kalori_aktivitas_per_jenis(awal, hari_ini)),
+        "get_jumlah_entri_per_kategori": (None, lambda t: t.get_jumlah_entri_per_kategori("asupan_makanan", start=awal, end=hari_ini)),
+        "get_latest_imt": (None, lambda t: t.get_latest_imt()),
+        "get_ringkasan_makro": (None, lambda t: t.get_ringkasan_makro(hari_ini)),
+        "get_seri_kalori": (None, lambda t: t.get_seri_kalori(hari_ini - datetime.timedelta(days=30), hari_ini)),
+        "get_snapshot_harian": (None, lambda t: t.get_snapshot_harian(hari_ini)),
+        "hitung_total_air_harian": (None, lambda t: t.hitung_total_air_harian(hari_ini)),
+        "hitung_total_kalori_harian": (None, lambda t: t.hitung_total_kalori_harian(hari_ini)),
+        "invalidasi_cache": (None, lambda t: t.invalidasi_cache()),
+        "statistik_cache": (None, lambda t: t.statistik_cache()),
+        "statistik_query": (None, lambda t: t.statistik_query()),
+        # Alur halaman Streamlit
+        "alur_dashboard": (None, lambda t: (t.get_snapshot_harian(hari_ini), t.get_seri_kalori(hari_ini - datetime.timedelta(days=6), hari_ini))),
+        "alur_riwayat": (None, lambda t: [(getattr(t, f"get_data_{j}")(start=awal, end=hari_ini, limit=RIWAYAT_UKURAN_HALAMAN),
+                                           t.get_jumlah_entri_per_kategori(tabel, start=awal, end=hari_ini))
+                                          for j, tabel in zip(_BARU, ("pengukuran_tubuh", "aktivitas_fisik", "asupan_makanan", "asupan_air", "catatan_harian"))]),
+        "alur_analisis": (None, lambda t: (t.get_data_tren_berat_badan("mingguan", maks_titik=500), t.get_data_tren_imt(maks_titik=500),
+                                            t.get_seri_kalori(hari_ini - datetime.timedelta(days=30), hari_ini), t.get_ringkasan_makro(hari_ini),
+                                            t.get_kalori_aktivitas_per_jenis(hari_ini - datetime.timedelta(days=30), hari_ini))),
+    })
+    return skenario
+
+def _tambah_untuk_hapus(tracker: WellnessTracker, jenis: str, objek) -> int:
+    getattr(tracker, f"tambah_{jenis}")(objek)
+    return objek.id
+
+def metode_publik() -> set[str]:
+    return {nama for nama, fungsi in inspect.getmembers(WellnessTracker, inspect.isfunction) if not nama.startswith("_")}
+
+def benchmark_suite(ukuran: list[tuple[int, int]], ulangan: int = 3) -> dict:
+    """Median waktu (detik, cache baca dikosongkan tiap ulangan) setiap method publik dan alur halaman,
+    untuk setiap ukuran (hari, entri per hari) pada database sementara yang diisi data_sintetis."""
+    hari_ini = datetime.date.today()
+    hasil = {}
+    for hari, entri in ukuran:
+        awal = hari_ini - datetime.timedelta(days=hari - 1)
+        direktori = tempfile.mkdtemp(prefix="benchmark_wellness_")
+        pool = database.PoolKoneksi(os.path.join(direktori, "benchmark.db"))
+        try:
+            tracker = WellnessTracker(db=pool)
+            mulai = time.perf_counter()
+            data_sintetis.isi_tracker(tracker, hari, entri, mulai=awal)
+            waktu = {"isi_data": time.perf_counter() - mulai}
+            for nama, (persiapan, aksi) in _skenario(hari_ini, awal).items():
+                sampel = []
+                for _ in range(ulangan):
+                    tracker.invalidasi_cache()
+                    argumen = persiapan(tracker) if persiapan else ()
+                    mulai = time.perf_counter()
+                    aksi(tracker, *argumen)
+                    sampel.append(time.perf_counter() - mulai)
+                waktu[nama] = statistics.median(sampel)
+            hasil[f"{hari}x{entri}"] = waktu
+        finally:
+            pool.tutup()
+            shutil.rmtree(direktori, ignore_errors=True)
+    return hasil
+
+def bandingkan(baseline: dict, hasil: dict, ambang: float = 1.5, lantai_detik: float = 0.002) -> list[dict]:
+    """Entri yang lebih lambat dari baseline lebih dari `ambang` kali. Selisih di bawah `lantai_detik` diabaikan (noise)."""
+    regresi = []
+    for ukuran, waktu in hasil.items():
+        for nama, detik in waktu.items():
+            lama = baseline.get("hasil", {}).get(ukuran, {}).get(nama)
+            if lama is None or detik - lama < lantai_detik:
+                continue
+            if detik > lama * ambang:
+                regresi.append({"ukuran": ukuran, "metode": nama, "baseline": lama, "sekarang": detik, "rasio": detik / lama if lama else float('inf')})
+    return regresi
+
+def _jalankan_suite(args) -> int:
+    ukuran = [tuple(int(x) for x in u.lower().split("x")) for u in args.ukuran]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", PeringatanData)
+        hasil = benchmark_suite(ukuran, args.ulangan)
+    belum = metode_publik() - set(_skenario(datetime.date.today(), datetime.date.today()))
+    for nama_ukuran, waktu in hasil.items():
+        print(f"== {nama_ukuran} (hari x entri/hari) ==")
+        for nama, detik in sorted(waktu.items(), key=lambda item: -item[1]):
+            print(f"  {nama:<32} {detik * 1000:10.2f} ms")
+    if belum:
+        print(f"Method publik yang belum diukur: {', '.join(sorted(belum))}")
+    if args.simpan:
+        with open(args.simpan, "w", encoding="utf-8") as f:
+            json.dump({"dibuat": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                       "sqlite": sqlite3.sqlite_version, "ulangan": args.ulangan, "hasil": hasil}, f, indent=2)
+        print(f"Baseline disimpan ke {args.simpan}")
+    if args.bandingkan:
+        with open(args.bandingkan, encoding="utf-8") as f:
+            regresi = bandingkan(json.load(f), hasil, args.ambang)
+        for r in regresi:
+            print(f"REGRESI {r['ukuran']} {r['metode']}: {r['baseline'] * 1000:.2f} ms -> {r['sekarang'] * 1000:.2f} ms ({r['rasio']:.1f}x)")
+        print(f"{len(regresi)} regresi melewati ambang {args.ambang}x.")
+        return 1 if regresi else 0
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Wellness Tracker.")
+    parser.add_argument("--jumlah", type=int, default=100_000, help="Jumlah pengukuran untuk benchmark IMT")
+    parser.add_argument("--suite", action="store_true", help="Ukur setiap method WellnessTracker pada beberapa ukuran data")
+    parser.add_argument("--ukuran", nargs="+", default=["30x5", "365x5", "1825x10"], help="Ukuran data HARIxENTRI (entri per hari per tabel)")
+    parser.add_argument("--ulangan", type=int, default=3)
+    parser.add_argument("--simpan", help="Tulis hasil suite ke file JSON baseline")
+    parser.add_argument("--bandingkan", help="Bandingkan hasil suite dengan file JSON baseline (exit 1 jika ada regresi)")
+    parser.add_argument("--ambang", type=float, default=1.5, help="Rasio waktu terhadap baseline yang dianggap regresi")
+    args = parser.parse_args()
+
+    if args.suite:
+        sys.exit(_jalankan_suite(args))
+
+    hasil = benchmark_imt(args.jumlah)
+    print(f"IMT untuk {hasil['jumlah']:,} pengukuran:")
+    print(f"  per baris (df.apply) : {hasil['detik_per_baris']:.3f} detik")
+    print(f"  vektor (NumPy)       : {hasil['detik_vektor'] * 1000:.2f} ms")
+    print(f"  percepatan           : {hasil['percepatan']:,.0f}x")
+
+    memori = benchmark_memori(args.jumlah)
+    print(f"Memori puncak untuk {memori['jumlah']:,} pengukuran:")
+    print(f"  objek per baris      : {memori['byte_objek'] / 2**20:.1f} MiB")
+    print(f"  batch kolumnar       : {memori['byte_kolumnar'] / 2**20:.1f} MiB")
@@ -0,0 +1,140 @@
+# cache_wellness.py
+import copy
+import datetime
+import functools
+import threading
+from collections import OrderedDict, deque
+import pandas as pd
+from database import jumlah_gagal_baca
+from konfigurasi import CACHE_UKURAN_MAKS
+
+class GenerasiTabel:
+    """Generasi per tabel satu database (naik setiap kali tabel ditulis) beserta tanggal terkecil yang ditulis.
+    Dibagi oleh semua CacheBaca untuk file database yang sama di proses ini (lihat generasi_untuk)."""
+
+    def __init__(self):
+        self._generasi: dict[str, int] = {}
+        self._perubahan: dict[str, deque] = {} # (generasi, tanggal terkecil yang ditulis atau None) per tabel
+        self._kunci = threading.Lock()
+
+    def generasi(self, tabel: str) -> int:
+        return self._generasi.get(tabel, 0)
+
+    def naikkan(self, daftar_tabel: tuple[str, ...], tanggal: datetime.date | None = None) -> None:
+        with self._kunci:
+            for tabel in daftar_tabel:
+                self._generasi[tabel] = self._generasi.get(tabel, 0) + 1
+                self._perubahan.setdefault(tabel, deque(maxlen=1024)).append((self._generasi[tabel], tanggal))
+
+    def perubahan_sejak(self, generasi_lama: dict[str, int]) -> tuple[bool, datetime.date | None]:
+        ada, tanggal_min = False, datetime.date.max
+        with self._kunci:
+            for tabel, generasi in generasi_lama.items():
+                if self._generasi.get(tabel, 0) == generasi:
+                    continue
+                ada = True
+                riwayat = [(g, t) for g, t in self._perubahan.get(tabel, ()) if g > generasi]
+                if len(riwayat) < self._generasi.get(tabel, 0) - generasi or any(t is None for _, t in riwayat):
+                    return True, None
+                tanggal_min = min(tanggal_min, *(t for _, t in riwayat))
+        return ada, (tanggal_min if ada else None)
+
+    def salinan(self) -> dict[str, int]:
+        with self._kunci:
+            return dict(self._generasi)
+
+_generasi_per_db: dict[str, GenerasiTabel] = {}
+_kunci_generasi = threading.Lock()
+
+def generasi_untuk(db_path: str) -> GenerasiTabel:
+    """Generasi tabel bersama untuk satu file database: tulis lewat tracker mana pun (mis. WellnessTracker sinkron dan
+    AsyncWellnessTracker) membuat basi cache semua tracker lain di proses yang sama."""
+    with _kunci_generasi:
+        if db_path not in _generasi_per_db:
+            _generasi_per_db[db_path] = GenerasiTabel()
+        return _generasi_per_db[db_path]
+
+class CacheBaca:
+    """Cache LRU untuk hasil method baca. Kunci = nama method + argumen + generasi setiap tabel yang dibaca,
+    sehingga menulis ke satu tabel hanya membuat basi entri yang membaca tabel tersebut."""
+
+    def __init__(self, ukuran_maks: int = CACHE_UKURAN_MAKS, db_path: str | None = None):
+        self.ukuran_maks = ukuran_maks
+        self._data: OrderedDict = OrderedDict()
+        self._tabel = generasi_untuk(db_path) if db_path is not None else GenerasiTabel() # Tanpa db_path: generasi milik cache ini saja
+        self._kunci = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+        self.eviksi = 0
+
+    def generasi(self, tabel: str) -> int:
+        return self._tabel.generasi(tabel)
+
+    def naikkan_generasi(self, *daftar_tabel: str, tanggal: datetime.date | None = None) -> None:
+        """Dipanggil setelah tulis: entri lama untuk tabel ini tidak akan cocok lagi dan tersingkir lewat LRU.
+        `tanggal` = tanggal terkecil yang ditulis (None jika tidak diketahui, mis. hapus berdasarkan id)."""
+        self._tabel.naikkan(daftar_tabel, tanggal)
+
+    def perubahan_sejak(self, generasi_lama: dict[str, int]) -> tuple[bool, datetime.date | None]:
+        """Apakah tabel-tabel pada `generasi_lama` berubah sejak generasi tersebut, dan tanggal terkecil yang berubah
+        (None jika ada perubahan tanpa tanggal atau riwayat perubahannya sudah terpotong)."""
+        return self._tabel.perubahan_sejak(generasi_lama)
+
+    def ambil(self, kunci) -> tuple[bool, object]:
+        with self._kunci:
+            if kunci in self._data:
+                self._data.move_to_end(kunci)
+                self.hit += 1
+                return True, self._data[kunci]
+            self.miss += 1
+            return False, None
+
+    def simpan(self, kunci, nilai) -> None:
+        with self._kunci:
+            self._data[kunci] = nilai
+            self._data.move_to_end(kunci)
+            while len(self._data) > self.ukuran_maks:
+                self._data.popitem(last=False)
+                self.eviksi += 1
+
+    def bersihkan(self) -> None:
+        with self._kunci:
+            self._data.clear()
+
+    def statistik(self) -> dict:
+        total = self.hit + self.miss
+        return {
+            "hit": self.hit,
+            "miss": self.miss,
+            "eviksi": self.eviksi,
+            "rasio_hit": self.hit / total if total else 0.0,
+            "jumlah_entri": len(self._data),
+            "ukuran_maks": self.ukuran_maks,
+            "generasi": self._tabel.salinan(),
+        }
+
+def _salin(nilai):
+    # Pemanggil (mis. halaman Streamlit) boleh mengubah hasil tanpa merusak isi cache
+    if isinstance(nilai, pd.DataFrame):
+        return nilai.copy()
+    if isinstance(nilai, (dict, list)):
+        return copy.copy(nilai)
+    return nilai
+
+def dicache(*daftar_tabel: str):
+    """Dekorator untuk method baca WellnessTracker yang membaca tabel-tabel yang disebutkan.
+    Hasil hanya disimpan jika tidak ada baca yang gagal selama pemanggilan (lihat database.jumlah_gagal_baca)."""
+    def dekorator(fungsi):
+        @functools.wraps(fungsi)
+        def pembungkus(self, *args, **kwargs):
+            cache: CacheBaca = self._cache
+            kunci = (fungsi.__name__, args, tuple(sorted(kwargs.items())), tuple(cache.generasi(t) for t in daftar_tabel))
+            ada, nilai = cache.ambil(kunci)
+            if not ada:
+                gagal_awal = jumlah_gagal_baca()
+                nilai = fungsi(self, *args, **kwargs)
+                if jumlah_gagal_baca() == gagal_awal: # Hasil kosong dari baca yang gagal tidak disimpan
+                    cache.simpan(kunci, nilai)
+            return _salin(nilai)
+        return pembungkus
+    return dekorator
@@ -0,0 +1,64 @@
+# data_sintetis.py
+# Mengisi kelima tabel dengan data sintetis bervolume tertentu (hari x entri per hari x pengguna), untuk benchmark:
+#   python data_sintetis.py --hari 365 --entri 10 [--pengguna 5]
+import time
+import datetime
+import argparse
+import numpy as np
+import database
+from manajer_wellness import WellnessTracker
+from model import BatchPengukuranTubuh, BatchAktivitasFisik, BatchAsupanMakanan, BatchAsupanAir, BatchCatatanHarian
+from konfigurasi import KATEGORI_AKTIVITAS, IMPOR_UKURAN_CHUNK
+
+_MAKANAN = np.array(["Nasi goreng", "Ayam bakar", "Sate ayam", "Gado-gado", "Soto ayam", "Bakso", "Roti gandum",
+                     "Oatmeal", "Pisang", "Apel", "Telur rebus", "Tempe goreng", "Tahu bacem", "Mie ayam", "Salad sayur"], dtype=object)
+_CATATAN = np.array(["Tidur nyenyak", "Sedikit lelah", "Banyak minum air", "Olahraga pagi", "Hari sibuk", None], dtype=object)
+
+def buat_batch(hari: int, entri_per_hari: int, mulai: datetime.date | None = None, seed: int = 0) -> dict:
+    """Batch kolumnar per tabel: `entri_per_hari` baris untuk setiap hari selama `hari` hari yang berakhir hari ini
+    (atau mulai `mulai`). Berat mengikuti random walk agar tren dan analitik bergulir realistis."""
+    rng = np.random.default_rng(seed)
+    mulai = mulai or datetime.date.today() - datetime.timedelta(days=hari - 1)
+    n = hari * entri_per_hari
+    tanggal = np.datetime64(mulai, "D") + np.repeat(np.arange(hari), entri_per_hari).astype("timedelta64[D]")
+    berat = np.clip(70 + np.cumsum(rng.normal(0, 0.05, n)), 40, 150).round(1)
+    return {
+        "pengukuran_tubuh": BatchPengukuranTubuh(tanggal=tanggal, berat_kg=berat, tinggi_cm=np.full(n, rng.uniform(150, 190)).round(0)),
+        "aktivitas_fisik": BatchAktivitasFisik(tanggal=tanggal, jenis_aktivitas=rng.choice(np.array(KATEGORI_AKTIVITAS, dtype=object), n),
+                                               durasi_menit=rng.integers(10, 120, n), kalori_terbakar=rng.uniform(50, 600, n).round(0)),
+        "asupan_makanan": BatchAsupanMakanan(tanggal=tanggal, deskripsi_makanan=rng.choice(_MAKANAN, n), kalori=rng.uniform(50, 800, n).round(0),
+                                             protein_g=rng.uniform(0, 40, n).round(1), karbo_g=rng.uniform(0, 100, n).round(1), lemak_g=rng.uniform(0, 30, n).round(1)),
+        "asupan_air": BatchAsupanAir(tanggal=tanggal, jumlah_ml=rng.integers(1, 10, n) * 50),
+        "catatan_harian": BatchCatatanHarian(tanggal=tanggal, suasana_hati_skala=rng.integers(1, 6, n), tingkat_energi_skala=rng.integers(1, 6, n),
+                                             catatan_tambahan=rng.choice(_CATATAN, n)),
+    }
+
+def isi_tracker(tracker: WellnessTracker, hari: int, entri_per_hari: int, mulai: datetime.date | None = None, seed: int = 0,
+                ukuran_chunk: int = IMPOR_UKURAN_CHUNK) -> dict:
+    """Mengisi database milik tracker; mengembalikan jumlah baris tersimpan per tabel."""
+    return {tabel: tracker.tambah_batch_rekaman(batch, ukuran_chunk)["berhasil"]
+            for tabel, batch in buat_batch(hari, entri_per_hari, mulai, seed).items()}
+
+def isi_pengguna(jumlah_pengguna: int, hari: int, entri_per_hari: int, router: database.RouterShard | None = None, seed: int = 0) -> dict:
+    """Mengisi shard `pengguna_0` .. `pengguna_{n-1}` (mode multi-pengguna); setiap pengguna mendapat data berbeda."""
+    return {f"pengguna_{i}": isi_tracker(WellnessTracker(pengguna=f"pengguna_{i}", router=router), hari, entri_per_hari, seed=seed + i)
+            for i in range(jumlah_pengguna)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mengisi database Wellness Tracker dengan data sintetis.")
+    parser.add_argument("--hari", type=int, default=365, help="Jumlah hari data")
+    parser.add_argument("--entri", type=int, default=5, help="Entri per hari untuk setiap tabel")
+    parser.add_argument("--pengguna", type=int, default=0, help="Jumlah pengguna (0 = database tunggal DB_PATH)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mulai = time.perf_counter()
+    if args.pengguna:
+        hasil = isi_pengguna(args.pengguna, args.hari, args.entri, seed=args.seed)
+        total = sum(sum(jumlah.values()) for jumlah in hasil.values())
+    else:
+        hasil = isi_tracker(WellnessTracker(), args.hari, args.entri, seed=args.seed)
+        total = sum(hasil.values())
+    durasi = time.perf_counter() - mulai
+    print(hasil)
+    print(f"{total:,} baris dalam {durasi:.2f} detik ({total / durasi:,.0f} baris/detik).")
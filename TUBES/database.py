@@ -1,145 +1,629 @@
 # database.py
+import os
+import re
+import zlib
+import time
 import sqlite3
+import threading
+import queue
+import atexit
+import contextlib
+from collections import OrderedDict
+from concurrent.futures import Future
 import pandas as pd
-from konfigurasi import DB_PATH
+import migrasi
+from instrumentasi import CatatanQuery, get_instrumentasi, metode_pemanggil, template_query
+from konfigurasi import (DB_PATH, DB_TIMEOUT, DB_POOL_MAKS, DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_SHARD_DIR,
+                         DB_ROUTER_MAKS_POOL, DB_WRITE_JENDELA_MS, DB_WRITE_BATCH_MAKS, ARSIP_AKHIRAN_FILE, ARSIP_VACUUM_HALAMAN)
 
-def get_db_connection() -> sqlite3.Connection | None:
-    """Membuka dan mengembalikan koneksi baru ke database SQLite."""
+def _konfigurasi_koneksi(conn: sqlite3.Connection) -> None:
+    """Menerapkan PRAGMA performa satu kali saat koneksi dibuka."""
+    conn.row_factory = sqlite3.Row # Akses kolom by name
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL") # Hanya berlaku untuk file baru; file lama dikonversi saat reklamasi_ruang()
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+def get_db_connection(db_path: str = DB_PATH) -> sqlite3.Connection | None:
+    """Membuka dan mengembalikan koneksi baru ke database SQLite (di luar pool)."""
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=10, detect_types=sqlite3.PARSE_DECLTYPES)
-        conn.row_factory = sqlite3.Row # Akses kolom by name
+        conn = sqlite3.connect(db_path, timeout=DB_TIMEOUT, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False,
+                               uri=db_path.startswith("file:")) # URI untuk database memori bersama (mis. hasil baca arsip)
+        _konfigurasi_koneksi(conn)
         return conn
     except sqlite3.Error as e:
         print(f"ERROR [database.py] Koneksi DB gagal: {e}");
         return None
 
+def path_arsip(db_path: str) -> str | None:
+    """Path database arsip (tier dingin) untuk sebuah database file; None untuk database memori/URI."""
+    if db_path.startswith("file:") or db_path == ":memory:":
+        return None
+    dasar, ekstensi = os.path.splitext(db_path)
+    return f"{dasar}{ARSIP_AKHIRAN_FILE}{ekstensi or '.db'}"
+
+class PoolPenuh(TimeoutError):
+    """Tidak ada koneksi pool yang bebas dalam DB_TIMEOUT detik. Bukan sqlite3.Error, sehingga tidak tertelan penanganan
+    error query dan sampai ke pemanggil (halaman menampilkan error, bukan "belum ada data")."""
+
+class PoolDitutup(RuntimeError):
+    """Koneksi dipinjam dari pool yang sudah ditutup (mis. disingkirkan RouterShard). Ambil pool lagi lewat router."""
+
+_baca_lokal = threading.local()
+
+def _catat_gagal_baca() -> None:
+    _baca_lokal.gagal = getattr(_baca_lokal, 'gagal', 0) + 1
+
+def jumlah_gagal_baca() -> int:
+    """Jumlah baca (fetch_query/get_dataframe, semua pool) di thread ini yang gagal dan mengembalikan hasil kosong/None,
+    termasuk query yang di-interrupt. Dipakai dicache agar hasil dari baca yang gagal tidak disimpan."""
+    return getattr(_baca_lokal, 'gagal', 0)
+
+class PoolKoneksi:
+    """Pool koneksi SQLite berumur panjang yang dipakai ulang antar query dan antar rerun Streamlit."""
+
+    def __init__(self, db_path: str = DB_PATH, ukuran_maks: int = DB_POOL_MAKS):
+        self.db_path = db_path
+        self.arsip_path = path_arsip(db_path)
+        self._arsip_dipakai = False # True setelah file arsip ada (dibuat pool ini atau proses lain)
+        self._arsip_terpasang: set[int] = set() # id() koneksi yang sudah meng-ATTACH arsip
+        self._status_arsip: dict[int, tuple] = {} # id() koneksi -> (data_version arsip, total_changes, batas) yang terakhir dibaca
+        self.ukuran_maks = ukuran_maks
+        self._bebas = queue.LifoQueue() # Koneksi menganggur, yang terakhir dipakai diambil duluan (cache hangat)
+        self._slot = threading.BoundedSemaphore(ukuran_maks)
+        self._lokal = threading.local() # Koneksi yang sedang dipinjam oleh thread ini
+        self._kunci = threading.Lock()
+        self._semua: list[sqlite3.Connection] = []
+        self._dipinjam = 0
+        self._ditutup = False # Setelah tutup(), koneksi yang dikembalikan langsung ditutup
+        self._penulis: PenulisLatar | None = None
+
+    @property
+    def arsip_aktif(self) -> bool:
+        """True jika database arsip ter-ATTACH sebagai `arsip` pada koneksi yang dipakai thread ini."""
+        with self.koneksi() as conn:
+            self._segarkan_arsip(conn)
+            return id(conn) in self._arsip_terpasang
+
+    @property
+    def arsip_batas(self) -> str | None:
+        """'YYYY-MM-DD': baris sebelum tanggal ini mungkin sudah dipindah ke arsip (None = belum pernah diarsipkan).
+        Dibaca ulang setiap kali arsip diubah, juga oleh proses lain (mis. setup_db_wellness.py --arsipkan)."""
+        with self.koneksi() as conn:
+            self._segarkan_arsip(conn)
+            status = self._status_arsip.get(id(conn))
+            return status[2] if status else None
+
+    def aktifkan_arsip(self) -> None:
+        """Membuat/membuka database arsip; setiap koneksi pool meng-ATTACH-nya saat dipinjam berikutnya."""
+        if self.arsip_path is None:
+            raise sqlite3.OperationalError(f"Database {self.db_path} tidak mendukung arsip")
+        self._arsip_dipakai = True
+        with self.koneksi() as conn:
+            self._segarkan_arsip(conn)
+            if id(conn) not in self._arsip_terpasang:
+                raise sqlite3.OperationalError("Arsip tidak dapat di-ATTACH di dalam transaksi yang sedang berjalan")
+
+    def _segarkan_arsip(self, conn: sqlite3.Connection) -> None:
+        """Meng-ATTACH arsip (beserta trigger TEMP-nya) pada koneksi yang belum memasangnya, termasuk koneksi yang
+        sudah terbuka sebelum arsip dibuat proses lain, lalu membaca ulang batas jika arsip berubah sejak dibaca terakhir
+        (PRAGMA data_version: commit koneksi lain; total_changes: tulis koneksi ini sendiri)."""
+        if not self._arsip_dipakai:
+            if self.arsip_path is None or not os.path.exists(self.arsip_path):
+                return
+            self._arsip_dipakai = True
+        if id(conn) not in self._arsip_terpasang:
+            if conn.in_transaction: # ATTACH tidak boleh di dalam transaksi: dipasang saat koneksi dipinjam berikutnya
+                return
+            self._pasang_arsip(conn)
+        versi = (conn.execute("PRAGMA arsip.data_version").fetchone()[0], conn.total_changes)
+        status = self._status_arsip.get(id(conn))
+        if status is None or status[:2] != versi:
+            batas = conn.execute("SELECT nilai FROM arsip.arsip_info WHERE kunci = 'batas'").fetchone()
+            self._status_arsip[id(conn)] = (*versi, batas[0] if batas else None)
+
+    def _pasang_arsip(self, conn: sqlite3.Connection) -> None:
+        conn.execute("ATTACH DATABASE ? AS arsip", (self.arsip_path,))
+        conn.execute("PRAGMA arsip.journal_mode=WAL")
+        conn.execute("PRAGMA arsip.synchronous=NORMAL")
+        for sql in migrasi.skema_arsip("arsip"): # Tabel, indeks & FTS (IF NOT EXISTS) serta trigger TEMP ringkasan per koneksi
+            if callable(sql):
+                sql(conn)
+            else:
+                conn.execute(sql)
+        if conn.in_transaction:
+            conn.commit()
+        self._arsip_terpasang.add(id(conn))
+
+    @property
+    def sibuk(self) -> bool:
+        return self._dipinjam > 0
+
+    @property
+    def dalam_transaksi(self) -> bool:
+        """True jika thread ini sedang memegang koneksi pool dengan transaksi terbuka."""
+        conn = getattr(self._lokal, 'conn', None)
+        return conn is not None and conn.in_transaction
+
+    def penulis_latar(self) -> "PenulisLatar":
+        """Penulis write-behind untuk pool ini (thread dibuat saat pertama kali dipakai)."""
+        with self._kunci:
+            if self._ditutup:
+                raise PoolDitutup(f"Pool {self.db_path} sudah ditutup")
+            if self._penulis is None:
+                self._penulis = PenulisLatar(self)
+            return self._penulis
+
+    def flush_penulis(self, timeout: float | None = None) -> bool:
+        """Menunggu antrian penulis latar ter-commit. Tidak membuat penulis (thread) baru jika belum pernah dipakai."""
+        penulis = self._penulis
+        return penulis.flush(timeout) if penulis is not None else True
+
+    def _ambil(self) -> sqlite3.Connection:
+        if not self._slot.acquire(timeout=DB_TIMEOUT):
+            raise PoolPenuh(f"Pool koneksi penuh ({self.ukuran_maks} koneksi sedang dipakai)")
+        with self._kunci:
+            if self._ditutup: # Pool yang sudah ditutup tidak dihidupkan lagi lewat referensi lama
+                self._slot.release()
+                raise PoolDitutup(f"Pool {self.db_path} sudah ditutup")
+            self._dipinjam += 1
+        try:
+            conn = self._bebas.get_nowait()
+        except queue.Empty:
+            conn = get_db_connection(self.db_path)
+            if conn is None:
+                with self._kunci:
+                    self._dipinjam -= 1
+                self._slot.release()
+                raise sqlite3.OperationalError(f"Tidak dapat membuka koneksi ke {self.db_path}")
+            with self._kunci:
+                self._semua.append(conn)
+        try:
+            self._segarkan_arsip(conn)
+        except sqlite3.Error:
+            self._kembalikan(conn)
+            raise
+        return conn
+
+    def _kembalikan(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction: # Transaksi yang tertinggal tidak boleh terbawa ke peminjam berikutnya
+            conn.rollback()
+        with self._kunci:
+            self._dipinjam -= 1
+            if self._ditutup:
+                self._semua.remove(conn)
+                self._arsip_terpasang.discard(id(conn))
+                self._status_arsip.pop(id(conn), None)
+                conn.close()
+            else:
+                self._bebas.put(conn)
+        self._slot.release()
+
+    @contextlib.contextmanager
+    def koneksi(self):
+        """Meminjam satu koneksi dari pool. Pemanggilan bersarang di thread yang sama memakai koneksi yang sama."""
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._ambil()
+        self._lokal.conn = conn
+        try:
+            yield conn
+        finally:
+            self._lokal.conn = None
+            self._kembalikan(conn)
+
+    @contextlib.contextmanager
+    def transaksi(self, mode: str = "IMMEDIATE"):
+        """Menjalankan beberapa statement dalam satu transaksi: commit di akhir, rollback jika terjadi error."""
+        with self.koneksi() as conn:
+            if conn.in_transaction: # Bersarang: ikut transaksi terluar
+                yield conn
+                return
+            conn.execute(f"BEGIN {mode}")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    @contextlib.contextmanager
+    def _terukur(self, query: str, params: tuple | None = None, dengan_transaksi: bool = False):
+        """koneksi()/transaksi() yang mencatat durasi, jumlah baris (diisi pemanggil di ukuran["baris"]), waktu tunggu
+        koneksi dan method pemanggil ke instrumentasi. Query yang melewati ambang lambat dicatat dengan EXPLAIN QUERY PLAN."""
+        instrumen = get_instrumentasi()
+        ukuran = {"baris": 0}
+        if not instrumen.aktif:
+            with (self.transaksi() if dengan_transaksi else self.koneksi()) as conn:
+                yield conn, ukuran
+            return
+        mulai = time.perf_counter()
+        mulai_query = None
+        error = None
+        try:
+            with (self.transaksi() if dengan_transaksi else self.koneksi()) as conn:
+                mulai_query = time.perf_counter()
+                yield conn, ukuran
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            selesai = time.perf_counter()
+            catatan = CatatanQuery(template_query(query), (selesai - (mulai_query or selesai)) * 1000, ukuran["baris"],
+                                   ((mulai_query or selesai) - mulai) * 1000, metode_pemanggil(), self.db_path, error)
+            if error is None and instrumen.lambat(catatan.durasi_ms):
+                catatan.rencana = self._rencana_query(query, params)
+            instrumen.catat(catatan)
+
+    def _rencana_query(self, query: str, params: tuple | None) -> list[str]:
+        try:
+            with self.koneksi() as conn:
+                return [baris["detail"] for baris in conn.execute("EXPLAIN QUERY PLAN " + query, params or ())]
+        except sqlite3.Error as e:
+            return [f"(EXPLAIN gagal: {e})"]
+
+    def execute_query(self, query: str, params: tuple | None = None) -> int | None:
+        """Menjalankan query non-SELECT. Mengembalikan lastrowid jika INSERT."""
+        try:
+            with self._terukur(query, params) as (conn, ukuran):
+                dalam_transaksi = conn.in_transaction
+                try:
+                    cursor = conn.cursor()
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    if not dalam_transaksi:
+                        conn.commit()
+                    ukuran["baris"] = max(cursor.rowcount, 0)
+                    return cursor.lastrowid
+                except sqlite3.Error:
+                    if not dalam_transaksi:
+                        conn.rollback()
+                    raise
+        except sqlite3.Error as e:
+            print(f"ERROR [database.py] Query gagal: {e} | Query: {query[:100]}");
+            return None
+
+    def execute_many(self, query: str, daftar_params: list[tuple]) -> tuple[list[int | None], list[tuple[int, str]]]:
+        """Menjalankan satu INSERT untuk banyak baris dalam satu transaksi.
+        Mengembalikan id baru per baris (None jika gagal) dan daftar (indeks, pesan error)."""
+        jumlah = len(daftar_params)
+        ids: list[int | None] = [None] * jumlah
+        gagal: list[tuple[int, str]] = []
+        if jumlah == 0:
+            return ids, gagal
+        try:
+            with self._terukur(query, daftar_params[0], dengan_transaksi=True) as (conn, ukuran):
+                ukuran["baris"] = jumlah
+                cursor = conn.cursor()
+                cursor.execute("SAVEPOINT batch_insert")
+                try:
+                    cursor.executemany(query, daftar_params)
+                    # Lock tulis dipegang transaksi ini, jadi rowid yang dibuat berurutan
+                    id_akhir = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    ids = list(range(id_akhir - jumlah + 1, id_akhir + 1))
+                    cursor.execute("RELEASE batch_insert")
+                except sqlite3.Error:
+                    # Ada baris yang ditolak: ulangi per baris agar baris lain tetap tersimpan
+                    cursor.execute("ROLLBACK TO batch_insert")
+                    cursor.execute("RELEASE batch_insert")
+                    for i, params in enumerate(daftar_params):
+                        try:
+                            cursor.execute(query, params)
+                            ids[i] = cursor.lastrowid
+                        except sqlite3.Error as e:
+                            gagal.append((i, str(e)))
+        except sqlite3.Error as e:
+            print(f"ERROR [database.py] Batch gagal: {e} | Query: {query[:100]}");
+            return [None] * jumlah, [(i, str(e)) for i in range(jumlah)]
+        return ids, gagal
+
+    def fetch_query(self, query: str, params: tuple | None = None, fetch_all: bool = True) -> list | sqlite3.Row | None:
+        """Menjalankan query SELECT dan mengembalikan hasil."""
+        try:
+            with self._terukur(query, params) as (conn, ukuran):
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                hasil = cursor.fetchall() if fetch_all else cursor.fetchone()
+                ukuran["baris"] = len(hasil) if fetch_all else int(hasil is not None)
+                return hasil
+        except sqlite3.Error as e:
+            _catat_gagal_baca()
+            print(f"ERROR [database.py] Fetch gagal: {e} | Query: {query[:100]}");
+            return None
+
+    def get_dataframe(self, query: str, params: tuple | None = None) -> pd.DataFrame:
+        """Menjalankan query SELECT dan mengembalikan DataFrame Pandas."""
+        try:
+            with self._terukur(query, params) as (conn, ukuran):
+                df = pd.read_sql_query(query, conn, params=params)
+                ukuran["baris"] = len(df)
+                return df
+        except (sqlite3.Error, pd.errors.DatabaseError) as e: # pandas membungkus error sqlite3 sebagai DatabaseError
+            _catat_gagal_baca()
+            print(f"ERROR [database.py] Gagal baca ke DataFrame: {e} | Query: {query[:100]}");
+            return pd.DataFrame()
+
+    def reklamasi_ruang(self, halaman: int | None = ARSIP_VACUUM_HALAMAN) -> dict:
+        """Mengembalikan halaman bebas file utama ke sistem berkas dengan incremental_vacuum (mis. setelah arsipkan),
+        lalu checkpoint WAL agar file benar-benar mengecil. File lama tanpa auto_vacuum dikonversi sekali dengan VACUUM."""
+        try:
+            with self.koneksi() as conn:
+                bebas = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+                halaman_awal = conn.execute("PRAGMA main.page_count").fetchone()[0]
+                if conn.execute("PRAGMA main.auto_vacuum").fetchone()[0] != 2:
+                    conn.execute("PRAGMA main.auto_vacuum=INCREMENTAL")
+                    conn.execute("VACUUM main")
+                else:
+                    # executescript menjalankan pragma sampai selesai (execute() hanya satu langkah = satu halaman)
+                    conn.executescript(f"PRAGMA main.incremental_vacuum({int(halaman)})" if halaman else "PRAGMA main.incremental_vacuum")
+                for skema in ("main", "arsip") if id(conn) in self._arsip_terpasang else ("main",):
+                    conn.execute(f"PRAGMA {skema}.wal_checkpoint(TRUNCATE)").fetchall()
+                halaman_akhir = conn.execute("PRAGMA main.page_count").fetchone()[0]
+            return {"halaman_bebas": bebas, "halaman_sebelum": halaman_awal, "halaman_sesudah": halaman_akhir}
+        except sqlite3.Error as e:
+            print(f"ERROR [database.py] Reklamasi ruang gagal: {e}");
+            return {}
+
+    def tutup(self) -> None:
+        """Menutup semua koneksi menganggur; koneksi yang masih dipinjam ditutup saat dikembalikan.
+        Antrian penulis latar dikosongkan (commit) lebih dulu. Peminjaman berikutnya gagal dengan PoolDitutup."""
+        penulis, self._penulis = self._penulis, None
+        if penulis is not None:
+            penulis.tutup()
+        with self._kunci:
+            self._ditutup = True
+            while True:
+                try:
+                    conn = self._bebas.get_nowait()
+                except queue.Empty:
+                    break
+                self._semua.remove(conn)
+                self._arsip_terpasang.discard(id(conn))
+                self._status_arsip.pop(id(conn), None)
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+
+class PenulisLatar:
+    """Write-behind: satu thread penulis mengosongkan antrian INSERT/DELETE dan menggabungkannya ke satu
+    transaksi per jendela waktu (DB_WRITE_JENDELA_MS) atau per DB_WRITE_BATCH_MAKS operasi.
+    Setiap operasi mendapat Future yang berisi lastrowid setelah transaksinya di-commit."""
+
+    def __init__(self, pool: PoolKoneksi, jendela_ms: int = DB_WRITE_JENDELA_MS, ukuran_maks: int = DB_WRITE_BATCH_MAKS):
+        self.pool = pool
+        self.jendela_detik = jendela_ms / 1000
+        self.ukuran_maks = ukuran_maks
+        self.jumlah_operasi = 0
+        self.jumlah_transaksi = 0
+        self._antrian: queue.Queue = queue.Queue()
+        self._ditutup = False
+        self._thread = threading.Thread(target=self._jalan, name=f"penulis-{os.path.basename(pool.db_path)}", daemon=True)
+        self._thread.start()
+        atexit.register(self.tutup)
+
+    def kirim(self, query: str, params: tuple | None = None) -> Future:
+        """Mengantrikan satu statement tulis. Future gagal dengan sqlite3.Error jika statement ditolak."""
+        if self._ditutup:
+            raise RuntimeError("Penulis latar sudah ditutup")
+        future = Future()
+        self._antrian.put((query, params, future))
+        return future
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Menunggu semua operasi yang sudah dikirim sebelum pemanggilan ini di-commit."""
+        selesai = threading.Event()
+        self._antrian.put(selesai)
+        return selesai.wait(timeout)
+
+    def tutup(self, timeout: float | None = None) -> None:
+        """Commit sisa antrian lalu hentikan thread penulis (aman dipanggil berulang, juga dari atexit)."""
+        if self._ditutup:
+            return
+        self._ditutup = True
+        atexit.unregister(self.tutup)
+        self._antrian.put(None)
+        self._thread.join(timeout)
+
+    def statistik(self) -> dict:
+        return {
+            "operasi": self.jumlah_operasi,
+            "transaksi": self.jumlah_transaksi,
+            "operasi_per_transaksi": self.jumlah_operasi / self.jumlah_transaksi if self.jumlah_transaksi else 0.0,
+            "antrian": self._antrian.qsize(),
+        }
+
+    def _kumpulkan(self, item) -> tuple[list, list, bool]:
+        """Mengambil operasi sampai jendela waktu habis, batch penuh, ada permintaan flush, atau sinyal berhenti."""
+        operasi, penanda = [], []
+        batas = time.monotonic() + self.jendela_detik
+        while True:
+            if item is None:
+                return operasi, penanda, True
+            if isinstance(item, threading.Event): # flush(): commit sekarang tanpa menunggu jendela
+                penanda.append(item)
+                return operasi, penanda, False
+            operasi.append(item)
+            sisa = batas - time.monotonic()
+            if len(operasi) >= self.ukuran_maks or sisa <= 0:
+                return operasi, penanda, False
+            try:
+                item = self._antrian.get(timeout=sisa)
+            except queue.Empty:
+                return operasi, penanda, False
+
+    def _jalan(self) -> None:
+        berhenti = False
+        while not berhenti:
+            operasi, penanda, berhenti = self._kumpulkan(self._antrian.get())
+            try:
+                if operasi:
+                    self._tulis(operasi)
+            finally: # flush() tidak boleh menunggu selamanya, apa pun hasil batch ini
+                for selesai in penanda:
+                    selesai.set()
+        while True: # Operasi yang masuk bersamaan dengan tutup()
+            try:
+                item = self._antrian.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not None:
+                item[2].set_exception(RuntimeError("Penulis latar sudah ditutup"))
+
+    def _tulis(self, operasi: list) -> None:
+        operasi = [op for op in operasi if op[2].set_running_or_notify_cancel()]
+        hasil = []
+        try:
+            with self.pool.transaksi() as conn:
+                cursor = conn.cursor()
+                for query, params, future in operasi:
+                    # Savepoint per operasi: satu statement yang ditolak tidak membatalkan operasi lain dalam grup
+                    cursor.execute("SAVEPOINT operasi")
+                    try:
+                        cursor.execute(query, params or ())
+                        hasil.append((future, cursor.lastrowid, None))
+                        cursor.execute("RELEASE operasi")
+                    except sqlite3.Error as e:
+                        cursor.execute("ROLLBACK TO operasi")
+                        cursor.execute("RELEASE operasi")
+                        hasil.append((future, None, e))
+        except Exception as e: # Termasuk PoolPenuh/PoolDitutup: batch ini gagal, thread penulis tetap hidup
+            print(f"ERROR [database.py] Transaksi penulis latar gagal: {e}");
+            for _, _, future in operasi:
+                future.set_exception(e)
+            return
+        self.jumlah_operasi += len(operasi)
+        self.jumlah_transaksi += 1
+        for future, id_baru, error in hasil: # Diselesaikan setelah commit: id yang diterima pemanggil sudah tahan lama
+            if error is None:
+                future.set_result(id_baru)
+            else:
+                future.set_exception(error)
+
+_pool_default: PoolKoneksi | None = None
+_kunci_pool = threading.Lock()
+
+def get_pool() -> PoolKoneksi:
+    """Mengembalikan pool koneksi bersama untuk DB_PATH (dibuat saat pertama kali dipakai)."""
+    global _pool_default
+    if _pool_default is None:
+        with _kunci_pool:
+            if _pool_default is None:
+                _pool_default = PoolKoneksi(DB_PATH)
+                atexit.register(_pool_default.tutup)
+    return _pool_default
+
+class RouterShard:
+    """Memetakan setiap pengguna ke file database sendiri, sehingga penulis untuk pengguna berbeda tidak berebut
+    lock tulis yang sama. Tabel tidak menyimpan kolom pengguna, jadi satu file tidak boleh dipakai bersama.
+    Pool per file disimpan dalam LRU; pool menganggur yang paling lama tidak dipakai ditutup."""
+
+    def __init__(self, direktori: str = DB_SHARD_DIR, maks_pool: int = DB_ROUTER_MAKS_POOL):
+        self.direktori = direktori
+        self.maks_pool = maks_pool
+        self._pool: OrderedDict[str, PoolKoneksi] = OrderedDict()
+        self._siap: set[str] = set() # Path yang skemanya sudah dicek
+        self._kunci = threading.Lock()
+
+    def path_untuk(self, pengguna: str) -> str:
+        """Path file database untuk pengguna. Hash crc32 stabil antar proses (berbeda dengan hash() bawaan)."""
+        kode = zlib.crc32(str(pengguna).encode("utf-8"))
+        aman = re.sub(r"[^A-Za-z0-9_-]", "_", str(pengguna))[:40]
+        nama = f"pengguna_{aman}_{kode:08x}.db" # Hash mencegah tabrakan nama setelah karakter diganti
+        return os.path.join(self.direktori, nama)
+
+    def pool_untuk(self, pengguna: str) -> PoolKoneksi:
+        path = self.path_untuk(pengguna)
+        with self._kunci:
+            pool = self._pool.get(path)
+            if pool is not None:
+                self._pool.move_to_end(path)
+                return pool
+            os.makedirs(self.direktori, exist_ok=True)
+            pool = PoolKoneksi(path)
+            self._pool[path] = pool
+            self._singkirkan()
+        if path not in self._siap and setup_database_initial(pool): # File baru: terapkan migrasi
+            self._siap.add(path)
+        return pool
+
+    def _singkirkan(self) -> None:
+        # Pool yang sedang meminjamkan koneksi dilewati agar transaksi yang berjalan tidak terputus
+        for path in list(self._pool):
+            if len(self._pool) <= self.maks_pool:
+                break
+            if not self._pool[path].sibuk:
+                self._pool.pop(path).tutup()
+
+    def tutup(self) -> None:
+        with self._kunci:
+            for pool in self._pool.values():
+                pool.tutup()
+            self._pool.clear()
+
+    def statistik(self) -> dict:
+        with self._kunci:
+            return {"pool_terbuka": len(self._pool), "maks_pool": self.maks_pool, "path": list(self._pool)}
+
+_router_default: RouterShard | None = None
+
+def get_router() -> RouterShard:
+    """Mengembalikan router shard bersama untuk mode multi-pengguna (dibuat saat pertama kali dipakai)."""
+    global _router_default
+    if _router_default is None:
+        with _kunci_pool:
+            if _router_default is None:
+                _router_default = RouterShard()
+                atexit.register(_router_default.tutup)
+    return _router_default
+
+def koneksi():
+    """Context manager untuk berbagi satu koneksi pool di beberapa statement."""
+    return get_pool().koneksi()
+
+def transaksi(mode: str = "IMMEDIATE"):
+    """Context manager transaksi pada pool bersama."""
+    return get_pool().transaksi(mode)
+
 def execute_query(query: str, params: tuple | None = None) -> int | None:
     """Menjalankan query non-SELECT. Mengembalikan lastrowid jika INSERT."""
-    conn = get_db_connection()
-    if not conn: return None
+    return get_pool().execute_query(query, params)
 
-    last_id = None
-    try:
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        conn.commit()
-        last_id = cursor.lastrowid
-        return last_id
-    except sqlite3.Error as e:
-        print(f"ERROR [database.py] Query gagal: {e} | Query: {query[:100]}");
-        conn.rollback()
-        return None
-    finally:
-        if conn: conn.close()
+def execute_many(query: str, daftar_params: list[tuple]) -> tuple[list[int | None], list[tuple[int, str]]]:
+    """Menjalankan satu INSERT untuk banyak baris dalam satu transaksi."""
+    return get_pool().execute_many(query, daftar_params)
 
 def fetch_query(query: str, params: tuple | None = None, fetch_all: bool = True) -> list | sqlite3.Row | None:
     """Menjalankan query SELECT dan mengembalikan hasil."""
-    conn = get_db_connection()
-    if not conn: return None
-
-    try:
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        result = cursor.fetchall() if fetch_all else cursor.fetchone()
-        return result
-    except sqlite3.Error as e:
-        print(f"ERROR [database.py] Fetch gagal: {e} | Query: {query[:100]}");
-        return None
-    finally:
-        if conn: conn.close()
+    return get_pool().fetch_query(query, params, fetch_all)
 
 def get_dataframe(query: str, params: tuple | None = None) -> pd.DataFrame:
     """Menjalankan query SELECT dan mengembalikan DataFrame Pandas."""
-    conn = get_db_connection()
-    if not conn: return pd.DataFrame()
-
-    try:
-        df = pd.read_sql_query(query, conn, params=params)
-        return df
-    except Exception as e:
-        print(f"ERROR [database.py] Gagal baca ke DataFrame: {e} | Query: {query[:100]}");
-        return pd.DataFrame()
-    finally:
-        if conn: conn.close()
-
-def setup_database_initial() -> bool:
-    """Memastikan semua tabel ada di database."""
-    print(f"Memeriksa/membuat tabel di database (via database.py): {DB_PATH}")
-    conn = get_db_connection()
-    if not conn: return False
+    return get_pool().get_dataframe(query, params)
 
+def setup_database_initial(pool: PoolKoneksi | None = None) -> bool:
+    """Memastikan skema database berada pada versi terbaru (lihat migrasi.py)."""
+    pool = pool or get_pool()
     try:
-        cursor = conn.cursor()
-
-        # Table: pengukuran_tubuh
-        sql_create_pengukuran = """
-        CREATE TABLE IF NOT EXISTS pengukuran_tubuh (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tanggal DATE NOT NULL,
-            berat_kg REAL NOT NULL CHECK(berat_kg > 0),
-            tinggi_cm REAL NOT NULL CHECK(tinggi_cm > 0)
-        );"""
-        cursor.execute(sql_create_pengukuran)
-        print(" -> Tabel 'pengukuran_tubuh' siap.")
-
-        # Table: aktivitas_fisik
-        sql_create_aktivitas = """
-        CREATE TABLE IF NOT EXISTS aktivitas_fisik (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tanggal DATE NOT NULL,
-            jenis_aktivitas TEXT NOT NULL,
-            durasi_menit INTEGER NOT NULL CHECK(durasi_menit > 0),
-            kalori_terbakar REAL
-        );"""
-        cursor.execute(sql_create_aktivitas)
-        print(" -> Tabel 'aktivitas_fisik' siap.")
-
-        # Table: asupan_makanan
-        sql_create_makanan = """
-        CREATE TABLE IF NOT EXISTS asupan_makanan (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tanggal DATE NOT NULL,
-            deskripsi_makanan TEXT NOT NULL,
-            kalori REAL NOT NULL CHECK(kalori >= 0),
-            protein_g REAL,
-            karbo_g REAL,
-            lemak_g REAL
-        );"""
-        cursor.execute(sql_create_makanan)
-        print(" -> Tabel 'asupan_makanan' siap.")
-
-        # Table: asupan_air
-        sql_create_air = """
-        CREATE TABLE IF NOT EXISTS asupan_air (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tanggal DATE NOT NULL,
-            jumlah_ml INTEGER NOT NULL CHECK(jumlah_ml > 0)
-        );"""
-        cursor.execute(sql_create_air)
-        print(" -> Tabel 'asupan_air' siap.")
-
-        # Table: catatan_harian
-        sql_create_catatan = """
-        CREATE TABLE IF NOT EXISTS catatan_harian (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tanggal DATE NOT NULL,
-            suasana_hati_skala INTEGER CHECK(suasana_hati_skala >= 1 AND suasana_hati_skala <= 5),
-            tingkat_energi_skala INTEGER CHECK(tingkat_energi_skala >= 1 AND tingkat_energi_skala <= 5),
-            catatan_tambahan TEXT
-        );"""
-        cursor.execute(sql_create_catatan)
-        print(" -> Tabel 'catatan_harian' siap.")
-
-        conn.commit()
+        with pool.koneksi() as conn:
+            if migrasi.versi_skema(conn) >= migrasi.VERSI_TERBARU: # Skema sudah terkini: tanpa DDL
+                return True
+            print(f"Memigrasi skema database (via database.py): {pool.db_path}")
+            versi = migrasi.jalankan_migrasi(conn)
+            print(f" -> Skema database pada versi {versi}.")
         return True
     except sqlite3.Error as e:
         print(f"Error SQLite saat setup tabel: {e}");
         return False
-    finally:
-        if conn: conn.close()
\ No newline at end of file
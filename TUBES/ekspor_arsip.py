@@ -0,0 +1,200 @@
+# ekspor_arsip.py
+# Ekspor tabel riwayat ke file Parquet/Arrow yang dipartisi per bulan, dan pembaca yang menjalankan analitik
+# WellnessTracker langsung atas file tersebut (tanpa menyentuh database aktif):
+#   python ekspor_arsip.py ekspor [--tujuan DIR] [--format parquet|arrow] [--pengguna NAMA]
+#   python ekspor_arsip.py info [--tujuan DIR]
+# Struktur: <tujuan>/<tabel>/bulan=YYYY-MM/data.parquet (partisi gaya Hive).
+import os
+import shutil
+import sqlite3
+import argparse
+import datetime
+import itertools
+import database
+import migrasi
+from manajer_wellness import WellnessTracker, TABEL_RIWAYAT
+from konfigurasi import EKSPOR_DIR, EKSPOR_UKURAN_CHUNK
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError: # Opsional: hanya dibutuhkan untuk ekspor/baca arsip
+    pa = None
+
+# Skema Arrow eksplisit per tabel (urutan kolom = urutan SELECT); jenis_aktivitas berulang sehingga disimpan sebagai dictionary
+def _skema() -> dict:
+    teks, kategori = pa.string(), pa.dictionary(pa.int32(), pa.string())
+    return {
+        "pengukuran_tubuh": [("id", pa.int64()), ("tanggal", pa.date32()), ("berat_kg", pa.float64()), ("tinggi_cm", pa.float64())],
+        "aktivitas_fisik": [("id", pa.int64()), ("tanggal", pa.date32()), ("jenis_aktivitas", kategori), ("durasi_menit", pa.int64()),
+                            ("kalori_terbakar", pa.float64())],
+        "asupan_makanan": [("id", pa.int64()), ("tanggal", pa.date32()), ("deskripsi_makanan", teks), ("kalori", pa.float64()),
+                           ("protein_g", pa.float64()), ("karbo_g", pa.float64()), ("lemak_g", pa.float64())],
+        "asupan_air": [("id", pa.int64()), ("tanggal", pa.date32()), ("jumlah_ml", pa.int64())],
+        "catatan_harian": [("id", pa.int64()), ("tanggal", pa.date32()), ("suasana_hati_skala", pa.int64()),
+                           ("tingkat_energi_skala", pa.int64()), ("catatan_tambahan", teks)],
+    }
+
+_EKSTENSI = {"parquet": "parquet", "arrow": "arrow"}
+
+def _butuh_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Ekspor/baca arsip membutuhkan pyarrow (pip install pyarrow).")
+
+class _PenulisPartisi:
+    """Satu file per partisi bulan; file ditutup saat tanggal berpindah ke bulan berikutnya (baris urut tanggal)."""
+
+    def __init__(self, direktori: str, skema, format: str):
+        self.direktori = direktori
+        self.skema = skema
+        self.format = format
+        self.bulan: str | None = None
+        self._penulis = None
+        self.jumlah_file = 0
+
+    def tulis(self, bulan: str, batch) -> None:
+        if bulan != self.bulan:
+            self.tutup()
+            folder = os.path.join(self.direktori, f"bulan={bulan}")
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, f"data.{_EKSTENSI[self.format]}")
+            if self.format == "parquet":
+                self._penulis = pq.ParquetWriter(path, self.skema, compression="zstd")
+            else:
+                self._penulis = pa_ipc.new_file(path, self.skema)
+            self.bulan = bulan
+            self.jumlah_file += 1
+        self._penulis.write_batch(batch)
+
+    def tutup(self) -> None:
+        if self._penulis is not None:
+            self._penulis.close()
+            self._penulis = None
+
+def _ekspor_tabel(conn: sqlite3.Connection, tabel: str, sumber: str, tujuan: str, format: str, ukuran_chunk: int) -> dict:
+    kolom = _skema()[tabel]
+    skema = pa.schema(kolom)
+    sementara = os.path.join(tujuan, f".{tabel}.tmp")
+    shutil.rmtree(sementara, ignore_errors=True)
+    os.makedirs(sementara)
+    penulis = _PenulisPartisi(sementara, skema, format)
+    jumlah = 0
+    # tanggal dibaca sebagai teks 'YYYY-MM-DD' (tanpa konversi date per baris); kunci partisi = 7 karakter pertama
+    daftar_kolom = ", ".join("CAST(tanggal AS TEXT) AS tgl" if nama == "tanggal" else nama for nama, _ in kolom)
+    cursor = conn.execute(f"SELECT {daftar_kolom} FROM {sumber} ORDER BY tanggal, id")
+    try:
+        while baris := cursor.fetchmany(ukuran_chunk):
+            for bulan, kelompok in itertools.groupby(baris, key=lambda r: r[1][:7]):
+                nilai = list(zip(*kelompok))
+                array = [pa.array(v, type=pa.string()).cast(pa.date32()) if nama == "tanggal"
+                         else pa.array(v, type=tipe) for (nama, tipe), v in zip(kolom, nilai)]
+                penulis.tulis(bulan, pa.RecordBatch.from_arrays(array, schema=skema))
+            jumlah += len(baris)
+    finally:
+        penulis.tutup()
+    final = os.path.join(tujuan, tabel)
+    shutil.rmtree(final, ignore_errors=True) # Arsip lama tabel ini diganti utuh, tabel lain tidak disentuh
+    os.replace(sementara, final)
+    return {"baris": jumlah, "file": penulis.jumlah_file}
+
+def ekspor(tujuan: str = EKSPOR_DIR, tabel: tuple[str, ...] = TABEL_RIWAYAT, format: str = "parquet",
+           ukuran_chunk: int = EKSPOR_UKURAN_CHUNK, db: database.PoolKoneksi | None = None) -> dict:
+    """Mengalirkan setiap tabel (tier panas & arsip) per `ukuran_chunk` baris ke file per bulan. Semua tabel dibaca
+    dari satu snapshot (satu transaksi baca) sehingga arsip konsisten. Mengembalikan {tabel: {"baris": n, "file": n}}."""
+    _butuh_pyarrow()
+    if format not in _EKSTENSI:
+        raise ValueError(f"Format ekspor tidak dikenal: {format} (pilih {', '.join(_EKSTENSI)}).")
+    db = db or database.get_pool()
+    os.makedirs(tujuan, exist_ok=True)
+    with db.transaksi("DEFERRED") as conn:
+        return {nama: _ekspor_tabel(conn, nama, migrasi.sumber_gabungan(nama) if db.arsip_aktif else nama, tujuan, format, ukuran_chunk)
+                for nama in tabel}
+
+def _dataset(direktori: str, tabel: str):
+    path = os.path.join(direktori, tabel)
+    if not os.path.isdir(path):
+        return None
+    format = "ipc" if any(nama.endswith(".arrow") for _, _, isi in os.walk(path) for nama in isi) else "parquet"
+    partisi = ds.partitioning(pa.schema([("bulan", pa.string())]), flavor="hive")
+    return ds.dataset(path, format=format, partitioning=partisi, schema=pa.schema(_skema()[tabel] + [("bulan", pa.string())]))
+
+def _filter(start: datetime.date | None, end: datetime.date | None):
+    """Filter bulan (memangkas partisi/file) ditambah filter tanggal (memangkas row group lewat statistik Parquet)."""
+    syarat = None
+    if start is not None:
+        syarat = (ds.field("bulan") >= start.strftime("%Y-%m")) & (ds.field("tanggal") >= pa.scalar(start, pa.date32()))
+    if end is not None:
+        akhir = (ds.field("bulan") <= end.strftime("%Y-%m")) & (ds.field("tanggal") <= pa.scalar(end, pa.date32()))
+        syarat = akhir if syarat is None else syarat & akhir
+    return syarat
+
+def _kolom_baca(pool: database.PoolKoneksi, tabel: str, diminta: list[str] | None) -> tuple[list[str], dict[str, str]]:
+    """(kolom yang dibaca dari file, {kolom wajib yang dipangkas: literal SQL pengganti})."""
+    info = pool.fetch_query(f"PRAGMA table_info({tabel})")
+    if diminta is None:
+        return [r["name"] for r in info], {}
+    dibaca, konstanta = [], {}
+    for r in info:
+        if r["name"] in ("id", "tanggal") or r["name"] in diminta:
+            dibaca.append(r["name"])
+        elif r["notnull"] and r["type"] == "TEXT":
+            konstanta[r["name"]] = "''"
+        elif r["notnull"]:
+            dibaca.append(r["name"])
+    return dibaca, konstanta
+
+_arsip_ke = itertools.count(1)
+
+def baca_arsip(direktori: str = EKSPOR_DIR, start: datetime.date | None = None, end: datetime.date | None = None,
+               tabel: tuple[str, ...] = TABEL_RIWAYAT, kolom: dict[str, list[str]] | None = None,
+               ukuran_chunk: int = EKSPOR_UKURAN_CHUNK) -> WellnessTracker:
+    """WellnessTracker di atas arsip: hanya partisi bulan dalam [start, end] dan kolom yang diminta (`kolom` per tabel;
+    default semua) yang dibaca, lalu dimuat ke database SQLite di memori sehingga seluruh method analitik (ringkasan,
+    tren, analitik bergulir) berjalan tanpa menyentuh database aktif. Kolom wajib yang dipangkas diisi '' (teks) atau
+    tetap dibaca (numerik). Tutup dengan `tracker.db.tutup()` untuk membebaskan memori."""
+    _butuh_pyarrow()
+    pool = database.PoolKoneksi(f"file:arsip_{os.getpid()}_{next(_arsip_ke)}?mode=memory&cache=shared")
+    tracker = WellnessTracker(db=pool)
+    syarat = _filter(start, end)
+    for nama in tabel:
+        dataset = _dataset(direktori, nama)
+        if dataset is None:
+            print(f"ERROR [ekspor_arsip.py] Arsip tabel {nama} tidak ditemukan di {direktori}")
+            continue
+        dibaca, konstanta = _kolom_baca(pool, nama, (kolom or {}).get(nama))
+        sql = (f"INSERT INTO {nama} ({', '.join(dibaca + list(konstanta))}) "
+               f"VALUES ({', '.join(['?'] * len(dibaca) + list(konstanta.values()))})")
+        for batch in dataset.to_batches(columns=dibaca, filter=syarat, batch_size=ukuran_chunk):
+            if batch.num_rows:
+                pool.execute_many(sql, list(zip(*(batch.column(k).to_pylist() for k in dibaca))))
+    tracker.invalidasi_cache()
+    return tracker
+
+def info_arsip(direktori: str = EKSPOR_DIR) -> dict:
+    """Jumlah baris & partisi bulan per tabel (dari metadata file, tanpa membaca data)."""
+    _butuh_pyarrow()
+    hasil = {}
+    for nama in TABEL_RIWAYAT:
+        dataset = _dataset(direktori, nama)
+        if dataset is not None:
+            hasil[nama] = {"baris": dataset.count_rows(), "file": len(dataset.files)}
+    return hasil
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekspor/inspeksi arsip Parquet/Arrow Wellness Tracker.")
+    parser.add_argument("perintah", choices=["ekspor", "info"])
+    parser.add_argument("--tujuan", default=EKSPOR_DIR, help="Direktori arsip")
+    parser.add_argument("--format", default="parquet", choices=list(_EKSTENSI))
+    parser.add_argument("--pengguna", default=None, help="Ekspor shard pengguna ini (mode multi-pengguna)")
+    parser.add_argument("--chunk", type=int, default=EKSPOR_UKURAN_CHUNK)
+    args = parser.parse_args()
+
+    if args.perintah == "ekspor":
+        pool = database.get_router().pool_untuk(args.pengguna) if args.pengguna else None
+        for nama, hasil in ekspor(args.tujuan, format=args.format, ukuran_chunk=args.chunk, db=pool).items():
+            print(f"{nama}: {hasil['baris']:,} baris, {hasil['file']} file")
+    else:
+        for nama, hasil in info_arsip(args.tujuan).items():
+            print(f"{nama}: {hasil['baris']:,} baris, {hasil['file']} file")
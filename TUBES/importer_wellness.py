@@ -0,0 +1,153 @@
+# importer_wellness.py
+import os
+import csv
+import json
+import time
+import datetime
+import argparse
+from typing import Iterator
+from model import PengukuranTubuh, AktivitasFisik, AsupanMakanan, AsupanAir, CatatanHarian
+from manajer_wellness import WellnessTracker
+from konfigurasi import IMPOR_UKURAN_CHUNK
+
+MAKS_CONTOH_DITOLAK = 20 # Hanya sebagian baris ditolak yang disimpan agar memori tetap datar
+
+def _tanggal(nilai) -> datetime.date:
+    if isinstance(nilai, datetime.date):
+        return nilai
+    return datetime.datetime.strptime(str(nilai).strip()[:10], "%Y-%m-%d").date()
+
+def _opsional(nilai, tipe):
+    if nilai is None or (isinstance(nilai, str) and nilai.strip() == ""):
+        return None
+    return tipe(nilai)
+
+# Jenis data: (kolom pengenal sesuai to_dict(), fungsi pembuat objek model, nama method batch di WellnessTracker)
+JENIS_DATA = {
+    "pengukuran": (
+        ("tanggal", "berat_kg", "tinggi_cm"),
+        lambda b: PengukuranTubuh(_tanggal(b["tanggal"]), float(b["berat_kg"]), float(b["tinggi_cm"])),
+        "tambah_pengukuran_batch"
+    ),
+    "aktivitas": (
+        ("tanggal", "jenis_aktivitas", "durasi_menit"),
+        lambda b: AktivitasFisik(_tanggal(b["tanggal"]), b["jenis_aktivitas"], int(float(b["durasi_menit"])),
+                                 _opsional(b.get("kalori_terbakar_perkiraan"), float), _opsional(b.get("catatan"), str)),
+        "tambah_aktivitas_batch"
+    ),
+    "makanan": (
+        ("tanggal", "deskripsi_makanan", "kalori"),
+        lambda b: AsupanMakanan(_tanggal(b["tanggal"]), str(b["deskripsi_makanan"]).strip(), float(b["kalori"]),
+                                _opsional(b.get("protein_g"), float), _opsional(b.get("karbo_g"), float), _opsional(b.get("lemak_g"), float)),
+        "tambah_makanan_batch"
+    ),
+    "air": (
+        ("tanggal", "jumlah_ml"),
+        lambda b: AsupanAir(_tanggal(b["tanggal"]), int(float(b["jumlah_ml"]))),
+        "tambah_air_batch"
+    ),
+    "catatan": (
+        ("tanggal", "suasana_hati_skala", "tingkat_energi_skala", "catatan_tambahan"),
+        lambda b: CatatanHarian(_tanggal(b["tanggal"]), _opsional(b.get("suasana_hati_skala"), lambda x: int(float(x))),
+                                _opsional(b.get("tingkat_energi_skala"), lambda x: int(float(x))), _opsional(b.get("catatan_tambahan"), str)),
+        "tambah_catatan_batch"
+    ),
+}
+
+def deteksi_jenis(kolom) -> str | None:
+    """Menebak jenis data dari nama kolom. Jenis dengan kolom pengenal terbanyak yang cocok dipilih."""
+    kolom = set(kolom)
+    cocok = [(len(pengenal), jenis) for jenis, (pengenal, _, _) in JENIS_DATA.items() if set(pengenal) <= kolom]
+    return max(cocok)[1] if cocok else None
+
+def baca_baris(path: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Membaca file CSV atau JSON-lines secara lazy. Menghasilkan (nomor_baris, data, pesan_error)."""
+    ekstensi = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if ekstensi == ".csv":
+            reader = csv.DictReader(f)
+            for baris in reader:
+                yield reader.line_num, baris, None
+        elif ekstensi in (".jsonl", ".ndjson", ".json"):
+            for nomor, teks in enumerate(f, start=1):
+                if not teks.strip():
+                    continue
+                try:
+                    data = json.loads(teks)
+                except json.JSONDecodeError as e:
+                    yield nomor, None, f"JSON tidak valid: {e}"
+                    continue
+                if isinstance(data, dict):
+                    yield nomor, data, None
+                else:
+                    yield nomor, None, "Baris JSON harus berupa objek"
+        else:
+            raise ValueError(f"Format file '{ekstensi}' tidak didukung (gunakan .csv atau .jsonl)")
+
+def impor_file(path: str, jenis: str | None = None, ukuran_chunk: int = IMPOR_UKURAN_CHUNK, tracker: WellnessTracker | None = None) -> dict:
+    """Mengimpor satu file ke tabel yang sesuai, commit per chunk berukuran tetap."""
+    tracker = tracker or WellnessTracker()
+    hasil = {"jenis": jenis, "total": 0, "berhasil": 0, "ditolak": 0, "contoh_ditolak": [], "durasi_detik": 0.0, "baris_per_detik": 0.0}
+
+    def tolak(nomor: int, pesan: str):
+        hasil["ditolak"] += 1
+        if len(hasil["contoh_ditolak"]) < MAKS_CONTOH_DITOLAK:
+            hasil["contoh_ditolak"].append((nomor, pesan))
+
+    def simpan(chunk: list, nomor_chunk: list):
+        laporan = getattr(tracker, JENIS_DATA[hasil["jenis"]][2])(chunk)
+        hasil["berhasil"] += laporan["berhasil"]
+        for indeks, pesan in laporan["gagal"]:
+            tolak(nomor_chunk[indeks], pesan)
+
+    mulai = time.perf_counter()
+    chunk, nomor_chunk = [], []
+    for nomor, baris, error in baca_baris(path):
+        hasil["total"] += 1
+        if error:
+            tolak(nomor, error)
+            continue
+        if hasil["jenis"] is None:
+            hasil["jenis"] = deteksi_jenis(baris.keys())
+            if hasil["jenis"] is None:
+                raise ValueError(f"Tidak dapat mengenali jenis data dari kolom: {list(baris.keys())}")
+        try:
+            chunk.append(JENIS_DATA[hasil["jenis"]][1](baris))
+            nomor_chunk.append(nomor)
+        except KeyError as e:
+            tolak(nomor, f"Kolom {e} tidak ada")
+            continue
+        except (ValueError, TypeError) as e:
+            tolak(nomor, str(e))
+            continue
+        if len(chunk) >= ukuran_chunk:
+            simpan(chunk, nomor_chunk)
+            chunk, nomor_chunk = [], []
+    if chunk:
+        simpan(chunk, nomor_chunk)
+
+    hasil["durasi_detik"] = time.perf_counter() - mulai
+    if hasil["durasi_detik"] > 0:
+        hasil["baris_per_detik"] = hasil["total"] / hasil["durasi_detik"]
+    return hasil
+
+def main():
+    parser = argparse.ArgumentParser(description="Impor riwayat dari CSV/JSON-lines ke database Wellness Tracker.")
+    parser.add_argument("file", nargs="+", help="File .csv atau .jsonl dengan kolom sesuai to_dict() model")
+    parser.add_argument("--jenis", choices=list(JENIS_DATA.keys()), help="Jenis data (default: dideteksi dari kolom)")
+    parser.add_argument("--chunk", type=int, default=IMPOR_UKURAN_CHUNK, help="Jumlah baris per commit")
+    args = parser.parse_args()
+
+    tracker = WellnessTracker()
+    for path in args.file:
+        hasil = impor_file(path, args.jenis, args.chunk, tracker)
+        print(f"\n[{path}] jenis={hasil['jenis']}")
+        print(f"  Total baris : {hasil['total']}")
+        print(f"  Berhasil    : {hasil['berhasil']}")
+        print(f"  Ditolak     : {hasil['ditolak']}")
+        print(f"  Throughput  : {hasil['baris_per_detik']:,.0f} baris/detik ({hasil['durasi_detik']:.2f} detik)")
+        for nomor, pesan in hasil["contoh_ditolak"]:
+            print(f"    - baris {nomor}: {pesan}")
+
+if __name__ == "__main__":
+    main()
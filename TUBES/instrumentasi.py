@@ -0,0 +1,135 @@
+# instrumentasi.py
+# Pencatatan performa query database.py: durasi, jumlah baris, waktu tunggu koneksi pool dan method WellnessTracker
+# yang memanggilnya. Hook tambahan dapat dipasang dengan tambah_hook(fungsi) (mis. untuk dikirim ke sistem metrik).
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from collections import deque, Counter
+import numpy as np
+import pandas as pd
+from konfigurasi import INSTRUMEN_AKTIF, INSTRUMEN_AMBANG_LAMBAT_MS, INSTRUMEN_SAMPEL_MAKS
+
+logger = logging.getLogger("wellness.query")
+
+_FILE_TRACKER = "manajer_wellness.py"
+
+class CatatanQuery:
+    """Satu eksekusi query yang tercatat."""
+    __slots__ = ("waktu", "template", "durasi_ms", "baris", "tunggu_koneksi_ms", "metode", "db_path", "error", "rencana")
+
+    def __init__(self, template: str, durasi_ms: float, baris: int, tunggu_koneksi_ms: float, metode: str | None,
+                 db_path: str, error: str | None = None):
+        self.waktu = time.time()
+        self.template = template
+        self.durasi_ms = durasi_ms
+        self.baris = baris
+        self.tunggu_koneksi_ms = tunggu_koneksi_ms
+        self.metode = metode
+        self.db_path = db_path
+        self.error = error
+        self.rencana: list[str] | None = None # EXPLAIN QUERY PLAN, hanya untuk query lambat
+
+def template_query(query: str) -> str:
+    """Menyeragamkan teks SQL (spasi, daftar '?' pada IN) agar query yang sama dikelompokkan bersama."""
+    teks = " ".join(query.split())
+    return re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?, ...)", teks)
+
+def metode_pemanggil() -> str | None:
+    """Method publik WellnessTracker terdekat di call stack (mis. 'get_data_air'), atau None jika dipanggil dari luar tracker."""
+    frame = sys._getframe(2)
+    privat = None
+    while frame is not None:
+        kode = frame.f_code
+        if os.path.basename(kode.co_filename) == _FILE_TRACKER:
+            if not kode.co_name.startswith("_"):
+                return kode.co_name
+            privat = privat or kode.co_name
+        frame = frame.f_back
+    return privat
+
+class Instrumentasi:
+    """Mengumpulkan CatatanQuery per template: jumlah, sampel durasi terakhir (untuk p50/p95), baris dan waktu tunggu."""
+
+    def __init__(self, ambang_lambat_ms: float = INSTRUMEN_AMBANG_LAMBAT_MS, sampel_maks: int = INSTRUMEN_SAMPEL_MAKS):
+        self.aktif = INSTRUMEN_AKTIF
+        self.ambang_lambat_ms = ambang_lambat_ms
+        self.sampel_maks = sampel_maks
+        self._hook = []
+        self._kunci = threading.Lock()
+        self._per_template: dict[str, dict] = {}
+        self._lambat: deque = deque(maxlen=50)
+
+    def tambah_hook(self, fungsi) -> None:
+        """fungsi(CatatanQuery) dipanggil untuk setiap query yang tercatat."""
+        self._hook.append(fungsi)
+
+    def hapus_hook(self, fungsi) -> None:
+        self._hook.remove(fungsi)
+
+    def lambat(self, durasi_ms: float) -> bool:
+        return durasi_ms >= self.ambang_lambat_ms
+
+    def catat(self, catatan: CatatanQuery) -> None:
+        with self._kunci:
+            data = self._per_template.get(catatan.template)
+            if data is None:
+                data = self._per_template[catatan.template] = {
+                    "jumlah": 0, "error": 0, "total_ms": 0.0, "total_baris": 0, "total_tunggu_ms": 0.0,
+                    "sampel": deque(maxlen=self.sampel_maks), "metode": Counter()}
+            data["jumlah"] += 1
+            data["error"] += catatan.error is not None
+            data["total_ms"] += catatan.durasi_ms
+            data["total_baris"] += catatan.baris
+            data["total_tunggu_ms"] += catatan.tunggu_koneksi_ms
+            data["sampel"].append(catatan.durasi_ms)
+            data["metode"][catatan.metode or "-"] += 1
+            if catatan.rencana is not None:
+                self._lambat.append(catatan)
+        if catatan.rencana is not None:
+            logger.warning("Query lambat %.1f ms (%s, %d baris): %s\n  Rencana: %s", catatan.durasi_ms, catatan.metode or "-",
+                           catatan.baris, catatan.template[:200], " | ".join(catatan.rencana))
+        for hook in self._hook:
+            try:
+                hook(catatan)
+            except Exception as e: # Hook yang rusak tidak boleh menggagalkan query
+                print(f"ERROR [instrumentasi.py] Hook gagal: {e}")
+
+    def statistik(self) -> pd.DataFrame:
+        """Ringkasan per template query, urut total waktu terbesar (kontributor latensi utama di atas)."""
+        with self._kunci:
+            baris = []
+            for template, data in self._per_template.items():
+                sampel = np.fromiter(data["sampel"], dtype=np.float64)
+                baris.append({
+                    "template": template,
+                    "metode": ", ".join(nama for nama, _ in data["metode"].most_common(3)),
+                    "jumlah": data["jumlah"],
+                    "error": data["error"],
+                    "p50_ms": float(np.percentile(sampel, 50)),
+                    "p95_ms": float(np.percentile(sampel, 95)),
+                    "maks_ms": float(sampel.max()),
+                    "total_ms": data["total_ms"],
+                    "rata_baris": data["total_baris"] / data["jumlah"],
+                    "rata_tunggu_koneksi_ms": data["total_tunggu_ms"] / data["jumlah"],
+                })
+        kolom = ["template", "metode", "jumlah", "error", "p50_ms", "p95_ms", "maks_ms", "total_ms", "rata_baris", "rata_tunggu_koneksi_ms"]
+        return pd.DataFrame(baris, columns=kolom).sort_values("total_ms", ascending=False, ignore_index=True)
+
+    def query_lambat(self) -> list[CatatanQuery]:
+        """Query lambat terakhir beserta EXPLAIN QUERY PLAN-nya (terbaru di depan)."""
+        with self._kunci:
+            return list(reversed(self._lambat))
+
+    def reset(self) -> None:
+        with self._kunci:
+            self._per_template.clear()
+            self._lambat.clear()
+
+_instrumentasi = Instrumentasi()
+
+def get_instrumentasi() -> Instrumentasi:
+    """Instrumentasi bersama yang dipakai semua pool koneksi."""
+    return _instrumentasi
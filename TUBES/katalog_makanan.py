@@ -0,0 +1,119 @@
+# katalog_makanan.py
+# Indeks prefix di memori atas tabel katalog_makanan untuk autocomplete form asupan makanan.
+# Satu list terurut berisi (kunci, id) dicari dengan bisect; hasil pencarian disimpan di LRU kecil.
+import bisect
+import threading
+from collections import OrderedDict
+from konfigurasi import KATALOG_BATAS_SARAN, KATALOG_MAKS_KANDIDAT, KATALOG_CACHE_KUERI
+
+def normalisasi(teks: str) -> str:
+    """Huruf kecil (casefold) dan spasi diseragamkan, dipakai untuk kunci indeks maupun teks yang diketik pengguna."""
+    return " ".join(str(teks or "").casefold().split())
+
+_KOLOM_ITEM = ("id", "nama", "kalori", "protein_g", "karbo_g", "lemak_g", "sumber", "jumlah_pakai")
+
+class ItemKatalog:
+    __slots__ = (*_KOLOM_ITEM, "kunci_nama", "peringkat")
+
+    def __init__(self, id: int, nama: str, kalori: float, protein_g: float | None, karbo_g: float | None, lemak_g: float | None,
+                 sumber: str, jumlah_pakai: int):
+        self.id = id
+        self.nama = nama
+        self.kalori = kalori
+        self.protein_g = protein_g
+        self.karbo_g = karbo_g
+        self.lemak_g = lemak_g
+        self.sumber = sumber
+        self.jumlah_pakai = jumlah_pakai
+        self.kunci_nama = normalisasi(nama)
+        self.peringkat = (sumber != "riwayat", -jumlah_pakai) # Riwayat pengguna dulu, lalu yang paling sering dicatat
+
+    def ke_dict(self) -> dict:
+        return {nama: getattr(self, nama) for nama in _KOLOM_ITEM}
+
+def _kunci_untuk(kunci_nama: str) -> list[str]:
+    """Nama utuh + akhiran mulai setiap kata, agar "gor" juga menemukan "Nasi goreng"."""
+    kata = kunci_nama.split()
+    return [" ".join(kata[i:]) for i in range(len(kata))]
+
+class IndeksKatalog:
+    """Indeks prefix katalog makanan. cari() memeringkat paling banyak `maks_kandidat` kunci berawalan sama (urut abjad):
+    makanan dari riwayat pengguna dulu, lalu yang paling sering dicatat, lalu yang namanya diawali teks yang diketik."""
+
+    def __init__(self, maks_kandidat: int = KATALOG_MAKS_KANDIDAT, ukuran_cache: int = KATALOG_CACHE_KUERI):
+        self.maks_kandidat = maks_kandidat
+        self.ukuran_cache = ukuran_cache
+        self.versi = 0 # versi katalog_makanan terbesar yang sudah dimuat
+        self._item: dict[int, ItemKatalog] = {}
+        self._entri: list[tuple[str, int]] = [] # (kunci, id) terurut
+        self._cache: OrderedDict = OrderedDict()
+        self._kunci = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+
+    def __len__(self) -> int:
+        return len(self._item)
+
+    def muat(self, baris) -> None:
+        """Membangun ulang indeks dari baris katalog (id, nama, kalori, protein_g, karbo_g, lemak_g, sumber, jumlah_pakai, versi)."""
+        item = {r[0]: ItemKatalog(*r[:8]) for r in baris}
+        entri = sorted((kunci, id_item) for id_item, it in item.items() for kunci in _kunci_untuk(it.kunci_nama))
+        with self._kunci:
+            self._item, self._entri = item, entri
+            self.versi = max((r[8] for r in baris), default=self.versi)
+            self._cache.clear()
+
+    def perbarui(self, baris) -> None:
+        """Menambah/memperbarui item yang berubah (baris dengan versi > self.versi) tanpa membangun ulang seluruh indeks."""
+        if not baris:
+            return
+        with self._kunci:
+            hapus, tambah = set(), []
+            for r in baris:
+                baru, lama = ItemKatalog(*r[:8]), self._item.get(r[0])
+                if lama is None or lama.kunci_nama != baru.kunci_nama:
+                    if lama is not None:
+                        hapus.update((kunci, lama.id) for kunci in _kunci_untuk(lama.kunci_nama))
+                    tambah.extend((kunci, baru.id) for kunci in _kunci_untuk(baru.kunci_nama))
+                self._item[baru.id] = baru
+                self.versi = max(self.versi, r[8])
+            if len(hapus) + len(tambah) <= 64: # Sedikit perubahan (satu asupan baru): sisip/hapus dengan bisect
+                for e in hapus:
+                    posisi = bisect.bisect_left(self._entri, e)
+                    if posisi < len(self._entri) and self._entri[posisi] == e:
+                        del self._entri[posisi]
+                for e in tambah:
+                    bisect.insort(self._entri, e)
+            else: # Impor besar: gabung lalu urutkan (timsort memanfaatkan bagian yang sudah terurut)
+                self._entri = sorted([e for e in self._entri if e not in hapus] + tambah)
+            self._cache.clear()
+
+    def cari(self, teks: str, batas: int = KATALOG_BATAS_SARAN) -> list[dict]:
+        """Item (dict berisi nama & nilai gizi) yang nama atau salah satu katanya berawalan `teks`."""
+        awalan = normalisasi(teks)
+        if not awalan:
+            return []
+        with self._kunci:
+            hasil = self._cache.get((awalan, batas))
+            if hasil is not None:
+                self._cache.move_to_end((awalan, batas))
+                self.hit += 1
+                return [dict(d) for d in hasil]
+            self.miss += 1
+            kandidat = {}
+            posisi = bisect.bisect_left(self._entri, (awalan,))
+            while posisi < len(self._entri) and len(kandidat) < self.maks_kandidat:
+                kunci, id_item = self._entri[posisi]
+                if not kunci.startswith(awalan):
+                    break
+                kandidat.setdefault(id_item, self._item[id_item])
+                posisi += 1
+            terpilih = sorted(kandidat.values(), key=lambda it: (it.peringkat, not it.kunci_nama.startswith(awalan), it.kunci_nama))[:batas]
+            hasil = [it.ke_dict() for it in terpilih]
+            self._cache[(awalan, batas)] = hasil
+            if len(self._cache) > self.ukuran_cache:
+                self._cache.popitem(last=False)
+            return [dict(d) for d in hasil]
+
+    def statistik(self) -> dict:
+        return {"item": len(self._item), "kunci": len(self._entri), "versi": self.versi, "cache": len(self._cache), "hit": self.hit, "miss": self.miss}
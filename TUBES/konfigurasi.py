@@ -7,4 +7,69 @@ NAMA_DB = 'wellness_tracker.db'
 DB_PATH = os.path.join(BASE_DIR, NAMA_DB)
 
 KATEGORI_AKTIVITAS = ["Kardio", "Angkat Beban", "Yoga", "Berjalan", "Berlari", "Berenang", "Lainnya"]
-SKALA_SUASANA_ENERGI = [1, 2, 3, 4, 5] # 1: Sangat Buruk/Rendah, 5: Sangat Baik/Tinggi
\ No newline at end of file
+SKALA_SUASANA_ENERGI = [1, 2, 3, 4, 5] # 1: Sangat Buruk/Rendah, 5: Sangat Baik/Tinggi
+
+# Pengaturan koneksi SQLite (dipakai oleh pool koneksi di database.py)
+DB_TIMEOUT = 10 # detik menunggu lock tulis (juga batas menunggu koneksi pool yang bebas)
+DB_CACHE_SIZE_KB = 16384 # PRAGMA cache_size per koneksi (16 MB)
+DB_MMAP_SIZE = 128 * 1024 * 1024 # PRAGMA mmap_size per koneksi (128 MB)
+
+# Impor massal (importer_wellness.py)
+IMPOR_UKURAN_CHUNK = 1000 # baris per transaksi/commit
+
+# Cache baca WellnessTracker (cache_wellness.py)
+CACHE_UKURAN_MAKS = 256 # jumlah entri maksimum sebelum LRU menyingkirkan entri terlama
+
+# Jumlah baris per halaman pada tabel riwayat (keyset pagination)
+RIWAYAT_UKURAN_HALAMAN = 50
+
+# Facade asyncio (async_wellness.py): jumlah thread/koneksi DB yang bekerja bersamaan
+ASYNC_MAKS_KONKUREN = 4
+
+# Jumlah query halaman Riwayat & Analisis yang dimuat paralel (satu thread pool bersama untuk semua sesi)
+RIWAYAT_MAKS_PARALEL = 4
+
+# Ukuran pool koneksi: setiap thread executor riwayat dan setiap sesi Streamlit yang aktif bersamaan memegang satu koneksi
+DB_SESI_BERSAMAAN = 8 # sesi (thread skrip) yang diperkirakan membaca bersamaan
+DB_POOL_MAKS = RIWAYAT_MAKS_PARALEL + DB_SESI_BERSAMAAN # jumlah koneksi maksimum yang dibuka bersamaan
+
+# Mode multi-pengguna: setiap pengguna memakai file database sendiri (router shard di database.py)
+DB_SHARD_DIR = os.path.join(BASE_DIR, 'data_pengguna')
+DB_ROUTER_MAKS_POOL = 32 # jumlah pool (file database) yang dibiarkan terbuka bersamaan
+DB_MULTI_PENGGUNA = False # True = aplikasi Streamlit meminta login (st.login: streamlit[auth] + OIDC di .streamlit/secrets.toml) dan memakai shard pengguna tersebut
+STREAMLIT_TTL_TRACKER_DETIK = 3600 # tracker pengguna yang tidak dipakai selama ini dibuang dari cache Streamlit
+
+# Write-behind (PenulisLatar di database.py): insert/hapus dari WellnessTracker dikirim ke satu thread penulis
+DB_WRITE_BEHIND = False # True = gabungkan tulis dari banyak sesi ke satu transaksi (group commit)
+DB_WRITE_JENDELA_MS = 20 # lama maksimum operasi menunggu operasi lain sebelum di-commit
+DB_WRITE_BATCH_MAKS = 200 # jumlah operasi maksimum per transaksi
+
+# Analitik bergulir (analitik.py)
+ANALITIK_JENDELA_HARI = (7, 30) # rata-rata bergulir dalam hari kalender
+ANALITIK_EWM_SPAN = 7 # span rata-rata eksponensial (dalam jumlah hari data)
+
+# Jumlah titik maksimum per seri pada grafik tren (downsampling LTTB di analitik.py)
+TREN_MAKS_TITIK = 500
+
+# Instrumentasi query (instrumentasi.py)
+INSTRUMEN_AKTIF = True
+INSTRUMEN_AMBANG_LAMBAT_MS = 100 # query selama ini atau lebih dicatat dengan EXPLAIN QUERY PLAN
+INSTRUMEN_SAMPEL_MAKS = 1000 # sampel durasi terakhir per template untuk menghitung p50/p95
+
+# Ekspor arsip Parquet/Arrow (ekspor_arsip.py)
+EKSPOR_DIR = os.path.join(BASE_DIR, 'arsip_ekspor')
+EKSPOR_UKURAN_CHUNK = 50_000 # baris yang dibaca dari SQLite per batch saat ekspor
+
+# Arsip panas/dingin: baris lebih tua dari horizon dipindah ke <nama_db>_arsip.db yang di-ATTACH sebagai `arsip`
+ARSIP_HORIZON_HARI = 365
+ARSIP_AKHIRAN_FILE = '_arsip'
+ARSIP_VACUUM_HALAMAN = None # Halaman bebas yang dikembalikan per incremental_vacuum (None = semua)
+
+# Pencarian teks penuh (FTS5) deskripsi makanan & catatan
+CARI_BATAS_HASIL = 50
+
+# Katalog makanan untuk autocomplete form asupan (katalog_makanan.py)
+KATALOG_DATASET_PATH = os.path.join(BASE_DIR, 'data', 'katalog_makanan.csv') # Dataset bawaan: nama,kalori,protein_g,karbo_g,lemak_g
+KATALOG_BATAS_SARAN = 8 # saran yang ditampilkan per ketikan
+KATALOG_MAKS_KANDIDAT = 200 # kandidat prefix (urut abjad) yang diperingkat per pencarian, membatasi biaya awalan sangat pendek
+KATALOG_CACHE_KUERI = 2048 # hasil pencarian prefix yang disimpan (LRU)
@@ -1,286 +1,702 @@
 # manajer_wellness.py
+import re
 import datetime
+import sqlite3
+import threading
+from concurrent.futures import Future
+import numpy as np
 import pandas as pd
 import database
-from model import PengukuranTubuh, AktivitasFisik, AsupanMakanan, AsupanAir, CatatanHarian
+import migrasi
+import presentasi
+import instrumentasi
+from cache_wellness import CacheBaca, dicache
+from analitik import RollingInkremental, turunkan_sampel
+from katalog_makanan import IndeksKatalog
+from model import PengukuranTubuh, AktivitasFisik, AsupanMakanan, AsupanAir, CatatanHarian, SnapshotHarian, BatchRekaman, hitung_imt_batch
+from konfigurasi import IMPOR_UKURAN_CHUNK, DB_TIMEOUT, DB_WRITE_BEHIND, DB_WRITE_JENDELA_MS, ARSIP_HORIZON_HARI, CARI_BATAS_HASIL, KATALOG_BATAS_SARAN
+
+# Batas tunggu commit write-behind: pinjam koneksi + busy_timeout + satu jendela penulis
+_BATAS_TUNGGU_TULIS = 2 * DB_TIMEOUT + DB_WRITE_JENDELA_MS / 1000
+
+TABEL_RIWAYAT = ("pengukuran_tubuh", "aktivitas_fisik", "asupan_makanan", "asupan_air", "catatan_harian")
+
+# Spesifikasi INSERT per model: (tabel, query, validasi, fungsi pembentuk parameter)
+_SPEK_INSERT = {
+    PengukuranTubuh: (
+        "pengukuran_tubuh",
+        "INSERT INTO pengukuran_tubuh (tanggal, berat_kg, tinggi_cm) VALUES (?, ?, ?)",
+        lambda p: p.berat_kg > 0 and p.tinggi_cm > 0,
+        lambda p: (p.tanggal.strftime("%Y-%m-%d"), p.berat_kg, p.tinggi_cm)
+    ),
+    AktivitasFisik: (
+        "aktivitas_fisik",
+        "INSERT INTO aktivitas_fisik (tanggal, jenis_aktivitas, durasi_menit, kalori_terbakar) VALUES (?, ?, ?, ?)",
+        lambda a: a.durasi_menit > 0,
+        lambda a: (a.tanggal.strftime("%Y-%m-%d"), a.jenis_aktivitas, a.durasi_menit, a.kalori_terbakar_perkiraan)
+    ),
+    AsupanMakanan: (
+        "asupan_makanan",
+        "INSERT INTO asupan_makanan (tanggal, deskripsi_makanan, kalori, protein_g, karbo_g, lemak_g) VALUES (?, ?, ?, ?, ?, ?)",
+        lambda m: bool(m.deskripsi_makanan) and m.kalori >= 0,
+        lambda m: (m.tanggal.strftime("%Y-%m-%d"), m.deskripsi_makanan, m.kalori, m.protein_g, m.karbo_g, m.lemak_g)
+    ),
+    AsupanAir: (
+        "asupan_air",
+        "INSERT INTO asupan_air (tanggal, jumlah_ml) VALUES (?, ?)",
+        lambda a: a.jumlah_ml > 0,
+        lambda a: (a.tanggal.strftime("%Y-%m-%d"), a.jumlah_ml)
+    ),
+    CatatanHarian: (
+        "catatan_harian",
+        "INSERT INTO catatan_harian (tanggal, suasana_hati_skala, tingkat_energi_skala, catatan_tambahan) VALUES (?, ?, ?, ?)",
+        lambda c: True,
+        lambda c: (c.tanggal.strftime("%Y-%m-%d"), c.suasana_hati_skala, c.tingkat_energi_skala, c.catatan_tambahan)
+    ),
+}
+
+def _params_valid(objek, kelas: type) -> tuple | None:
+    """Parameter INSERT untuk objek yang lolos validasi, atau None jika bukan `kelas`, tanggal bukan date, atau nilainya
+    tidak valid (termasuk atribut bertipe salah, mis. tanggal berupa teks dari importer)."""
+    _, _, valid, ke_params = _SPEK_INSERT[kelas]
+    if not isinstance(objek, kelas) or not isinstance(objek.tanggal, datetime.date):
+        return None
+    try:
+        return ke_params(objek) if valid(objek) else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+def _klausa_tanggal(filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, sambung: str = " WHERE ") -> tuple[str, tuple | None]:
+    """Membentuk filter tanggal SQL untuk satu hari (filter_tanggal) atau rentang (start/end, inklusif)."""
+    if filter_tanggal:
+        return sambung + "tanggal = ?", (filter_tanggal.strftime("%Y-%m-%d"),)
+    if start and end:
+        return sambung + "tanggal BETWEEN ? AND ?", (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+    if start:
+        return sambung + "tanggal >= ?", (start.strftime("%Y-%m-%d"),)
+    if end:
+        return sambung + "tanggal <= ?", (end.strftime("%Y-%m-%d"),)
+    return "", None
+
+def _klausa_riwayat(filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None,
+                    after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> tuple[str, tuple | None]:
+    """Filter tanggal + keyset pagination: baris setelah kursor `after` = (tanggal, id) dalam urutan tanggal DESC, id DESC."""
+    where, params = _klausa_tanggal(filter_tanggal, start, end)
+    params = list(params or ())
+    if after:
+        where += (" AND " if where else " WHERE ") + "(tanggal, id) < (?, ?)"
+        params += [after[0].strftime("%Y-%m-%d"), int(after[1])]
+    where += " ORDER BY tanggal DESC, id DESC"
+    if limit:
+        where += " LIMIT ?"
+        params.append(int(limit))
+    return where, tuple(params) or None
+
+def _kueri_fts(teks: str) -> str | None:
+    """Teks bebas pengguna -> kueri FTS5 aman: setiap kata jadi prefix ("nas"* "gor"*), semua kata harus cocok."""
+    kata = re.findall(r"\w+", teks or "")
+    return " ".join(f'"{k}"*' for k in kata) or None
+
+def _sebagai_tanggal(nilai) -> datetime.date:
+    return nilai.date() if isinstance(nilai, datetime.datetime) else nilai
+
+def _seri_harian(df: pd.DataFrame, kolom: list[str]) -> pd.DataFrame:
+    """Hasil query per hari -> DataFrame float64 berindeks tanggal (DatetimeIndex)."""
+    df = df.reindex(columns=['tanggal', *kolom])
+    return df.set_index(pd.DatetimeIndex(pd.to_datetime(df['tanggal']), name='tanggal'))[kolom].astype('float64')
+
+def _ketik_kolom(df: pd.DataFrame, tipe: dict) -> pd.DataFrame:
+    """Menyeragamkan kolom & dtype hasil query riwayat: id int64, tanggal datetime64, sisanya sesuai `tipe`."""
+    df = df.reindex(columns=['id', 'tanggal', *tipe])
+    df['tanggal'] = pd.to_datetime(df['tanggal'])
+    return df.astype({'id': 'int64', **tipe})
 
 class WellnessTracker:
-    _db_setup_done = False # Flag untuk memastikan setup DB hanya dicek sekali per sesi
+    _db_setup_done: set[str] = set() # Path DB yang sudah dicek setup-nya per sesi
 
-    def __init__(self):
-        if not WellnessTracker._db_setup_done:
+    def __init__(self, db: database.PoolKoneksi | None = None, pengguna: str | None = None, router: database.RouterShard | None = None):
+        """Tanpa `pengguna`: satu database bersama (DB_PATH atau pool `db`).
+        Dengan `pengguna`: data pengguna tersebut disimpan di shard-nya sendiri yang dipilih `router`."""
+        self.pengguna = pengguna
+        self._router = (router or database.get_router()) if pengguna is not None and db is None else None
+        self._db = db if db is not None or self._router is not None else database.get_pool()
+        self._cache = CacheBaca(db_path=self.db.db_path) # Generasi tabel dibagi dengan tracker lain untuk file yang sama
+        self._rolling: dict[str, tuple[RollingInkremental, dict]] = {} # Status analitik bergulir per sumber + generasi tabel yang sudah dihitung
+        self._katalog: IndeksKatalog | None = None # Indeks prefix katalog makanan, dibangun saat autocomplete pertama
+        self._katalog_generasi: tuple[int, int] | None = None
+        self._kunci_katalog = threading.Lock()
+        if self.db.db_path not in WellnessTracker._db_setup_done:
             print("[WellnessTracker] Melakukan pengecekan/setup database awal...")
-            if database.setup_database_initial():
-                WellnessTracker._db_setup_done = True
+            if database.setup_database_initial(self.db):
+                WellnessTracker._db_setup_done.add(self.db.db_path)
+                self._pulihkan_arsip()
                 print("[WellnessTracker] Database siap.")
             else:
                 print("[WellnessTracker] KRITICAL: Setup database awal GAGAL!")
 
-    # --- Pengukuran Tubuh ---
-    def tambah_pengukuran(self, pengukuran: PengukuranTubuh) -> bool:
-        if not isinstance(pengukuran, PengukuranTubuh) or pengukuran.berat_kg <= 0 or pengukuran.tinggi_cm <= 0:
+    @property
+    def db(self) -> database.PoolKoneksi:
+        """Pool koneksi untuk data tracker ini; dalam mode multi-pengguna diambil dari LRU router setiap kali dipakai."""
+        if self._router is not None:
+            return self._router.pool_untuk(self.pengguna)
+        return self._db
+
+    # --- Insert Generik (tunggal & batch) ---
+    def _tulis(self, sql: str, params: tuple) -> int | None:
+        """INSERT/DELETE tunggal: langsung, atau lewat penulis latar (menunggu commit grupnya) jika DB_WRITE_BEHIND aktif."""
+        db = self.db
+        if not DB_WRITE_BEHIND or db.dalam_transaksi: # Di dalam transaksi thread ini, penulis latar akan menunggu lock kita
+            return db.execute_query(sql, params)
+        future = None
+        try:
+            future = db.penulis_latar().kirim(sql, params)
+            return future.result(timeout=_BATAS_TUNGGU_TULIS)
+        except (sqlite3.Error, TimeoutError, RuntimeError) as e: # Termasuk PoolPenuh/PoolDitutup dan batas waktu tunggu habis
+            if future is not None and not future.done() and not future.cancel(): # Sudah di transaksi penulis: commit menyusul
+                future.add_done_callback(lambda _: self.invalidasi_cache())
+            print(f"ERROR [manajer_wellness.py] Tulis gagal: {str(e) or 'batas waktu tunggu habis'} | Query: {sql[:100]}");
+            return None
+
+    def _tambah(self, objek, kelas: type) -> bool:
+        tabel, sql, _, _ = _SPEK_INSERT[kelas]
+        params = _params_valid(objek, kelas)
+        if params is None:
             return False
-        sql = "INSERT INTO pengukuran_tubuh (tanggal, berat_kg, tinggi_cm) VALUES (?, ?, ?)"
-        params = (pengukuran.tanggal.strftime("%Y-%m-%d"), pengukuran.berat_kg, pengukuran.tinggi_cm)
-        last_id = database.execute_query(sql, params)
+        last_id = self._tulis(sql, params)
+        self._cache.naikkan_generasi(tabel, tanggal=_sebagai_tanggal(objek.tanggal))
         if last_id is not None:
-            pengukuran.id = last_id
+            objek.id = last_id
             return True
         return False
 
-    def get_riwayat_pengukuran(self, filter_tanggal: datetime.date | None = None) -> pd.DataFrame:
-        query = "SELECT id, tanggal, berat_kg, tinggi_cm FROM pengukuran_tubuh"
-        params = None
-        if filter_tanggal:
-            query += " WHERE tanggal = ?"
-            params = (filter_tanggal.strftime("%Y-%m-%d"),)
-        query += " ORDER BY tanggal DESC, id DESC"
-        df = database.get_dataframe(query, params=params)
-        if not df.empty:
-            df['IMT'] = df.apply(lambda row: PengukuranTubuh(row['tanggal'], row['berat_kg'], row['tinggi_cm']).hitung_imt(), axis=1)
-            df['Tanggal'] = pd.to_datetime(df['tanggal']).dt.strftime('%d-%m-%Y')
-            df['Berat (kg)'] = df['berat_kg'].map('{:.1f}'.format)
-            df['Tinggi (cm)'] = df['tinggi_cm'].map('{:.0f}'.format)
-            df['IMT'] = df['IMT'].map('{:.2f}'.format)
-            df = df[['id', 'Tanggal', 'Berat (kg)', 'Tinggi (cm)', 'IMT']]
+    def kirim_tambah(self, objek) -> Future:
+        """Write-behind tanpa menunggu: mengantrikan insert dan langsung mengembalikan Future berisi id baru.
+        objek.id diisi dan cache diinvalidasi setelah commit; gunakan flush_tulis() sebelum membaca data yang baru dikirim."""
+        tabel, sql, _, _ = _SPEK_INSERT[type(objek)]
+        params = _params_valid(objek, type(objek))
+        if params is None:
+            raise ValueError(f"Data {type(objek).__name__} tidak valid")
+        future = self.db.penulis_latar().kirim(sql, params)
+
+        def selesai(f: Future):
+            self._cache.naikkan_generasi(tabel, tanggal=_sebagai_tanggal(objek.tanggal))
+            if not f.cancelled() and f.exception() is None:
+                objek.id = f.result()
+        future.add_done_callback(selesai)
+        return future
+
+    def flush_tulis(self, timeout: float | None = None) -> bool:
+        """Menunggu semua tulis write-behind yang sudah dikirim ter-commit (tanpa penulis latar: langsung True)."""
+        return self.db.flush_penulis(timeout)
+
+    def _tambah_batch(self, daftar: list, kelas: type) -> dict:
+        """Validasi seluruh daftar lalu insert semua baris valid dalam satu transaksi.
+        Baris yang gagal dilaporkan per indeks tanpa membatalkan baris lainnya."""
+        tabel, sql, _, _ = _SPEK_INSERT[kelas]
+        gagal = []
+        indeks_valid = []
+        daftar_params = []
+        for i, objek in enumerate(daftar):
+            params = _params_valid(objek, kelas)
+            if params is not None:
+                indeks_valid.append(i)
+                daftar_params.append(params)
+            else:
+                gagal.append((i, f"Data {kelas.__name__} tidak valid"))
+        ids, gagal_db = self.db.execute_many(sql, daftar_params)
+        if indeks_valid:
+            self._cache.naikkan_generasi(tabel, tanggal=min(_sebagai_tanggal(daftar[i].tanggal) for i in indeks_valid))
+        for j, id_baru in enumerate(ids):
+            if id_baru is not None:
+                daftar[indeks_valid[j]].id = id_baru
+        gagal.extend((indeks_valid[j], pesan) for j, pesan in gagal_db)
+        gagal.sort()
+        return {"berhasil": len(indeks_valid) - len(gagal_db), "gagal": gagal}
+
+    def tambah_batch_rekaman(self, batch: BatchRekaman, ukuran_chunk: int = IMPOR_UKURAN_CHUNK) -> dict:
+        """Insert batch kolumnar (lihat model.BatchRekaman) per chunk tanpa membuat objek model per baris.
+        Id baru ditulis ke batch.id; hasil sama dengan _tambah_batch."""
+        tabel, sql, _, _ = _SPEK_INSERT[batch.MODEL]
+        mask_valid = batch.valid()
+        indeks_valid = np.flatnonzero(mask_valid)
+        gagal = [(int(i), f"Data {batch.MODEL.__name__} tidak valid") for i in np.flatnonzero(~mask_valid)]
+        berhasil = 0
+        for mulai, params in batch.saring(mask_valid).ke_params(ukuran_chunk):
+            ids, gagal_db = self.db.execute_many(sql, params)
+            indeks = indeks_valid[mulai:mulai + len(params)]
+            batch.id[indeks] = [id_baru or 0 for id_baru in ids]
+            gagal.extend((int(indeks[j]), pesan) for j, pesan in gagal_db)
+            berhasil += len(params) - len(gagal_db)
+        if len(indeks_valid):
+            self._cache.naikkan_generasi(tabel, tanggal=batch["tanggal"][indeks_valid].min().astype(datetime.date))
+        gagal.sort()
+        return {"berhasil": berhasil, "gagal": gagal}
+
+    def _hapus(self, tabel: str, id_data: int) -> bool:
+        hasil = self._tulis(f"DELETE FROM {tabel} WHERE id = ?", (id_data,)) is not None
+        if hasil and self.db.arsip_batas is not None: # Baris lama mungkin sudah dipindah ke arsip (id tetap sama)
+            hasil = self._tulis(f"DELETE FROM arsip.{tabel} WHERE id = ?", (id_data,)) is not None
+        self._cache.naikkan_generasi(tabel)
+        return hasil
+
+    # --- Arsip Panas/Dingin ---
+    def _sumber(self, tabel: str, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None) -> str:
+        """Sumber FROM untuk tabel riwayat: tier panas saja jika rentang dimulai pada/setelah batas arsip,
+        gabungan tier panas & arsip jika rentang (atau seluruh riwayat) menjangkau data yang sudah diarsipkan."""
+        batas = self.db.arsip_batas
+        awal = filter_tanggal or start
+        if batas is None or (awal is not None and awal.strftime("%Y-%m-%d") >= batas):
+            return tabel
+        return migrasi.sumber_gabungan(tabel)
+
+    def arsipkan(self, horizon_hari: int = ARSIP_HORIZON_HARI, reklamasi: bool = True) -> dict:
+        """Memindahkan baris yang lebih tua dari `horizon_hari` hari ke database arsip, lalu mengembalikan ruang file
+        utama dengan incremental vacuum. Dua transaksi yang masing-masing hanya menulis satu file (SQLite hanya menjamin
+        commit atomik per file WAL): salin ke arsip & majukan batas, lalu _selesaikan_arsip(). Jika terhenti di antara
+        keduanya tidak ada baris yang hilang; pemanggilan berikutnya (atau tracker baru) menyelesaikannya."""
+        db = self.db
+        batas = (datetime.date.today() - datetime.timedelta(days=horizon_hari)).strftime("%Y-%m-%d")
+        self.flush_tulis()
+        try:
+            db.aktifkan_arsip()
+            with db.transaksi() as conn: # Hanya menulis arsip: tabel arsip tidak punya trigger INSERT ke ringkasan_harian
+                for tabel in TABEL_RIWAYAT:
+                    conn.execute(f"INSERT OR IGNORE INTO arsip.{tabel} SELECT * FROM main.{tabel} WHERE tanggal < ?", (batas,))
+                conn.execute("INSERT INTO arsip.arsip_info (kunci, nilai) VALUES ('batas', ?) "
+                             "ON CONFLICT(kunci) DO UPDATE SET nilai = MAX(nilai, excluded.nilai)", (batas,))
+            dipindah = self._selesaikan_arsip()
+        except sqlite3.Error as e:
+            print(f"ERROR [manajer_wellness.py] Arsipkan gagal: {e}")
+            return {}
+        self.invalidasi_cache()
+        hasil = {"batas": db.arsip_batas, "dipindah": dipindah}
+        if reklamasi and any(dipindah.values()):
+            hasil["ruang"] = db.reklamasi_ruang()
+        return hasil
+
+    def _selesaikan_arsip(self) -> dict[str, int]:
+        """Langkah kedua arsipkan(), dalam satu transaksi yang hanya menulis database utama: hapus dari tier panas baris
+        di bawah batas yang sudah tersalin ke arsip (id sama), lalu hitung ulang ringkasan_harian untuk rentang tanggal
+        tersebut dari gabungan kedua tier. Aman diulang. Mengembalikan jumlah baris yang dihapus per tabel."""
+        db = self.db
+        dipindah = {}
+        with db.transaksi() as conn:
+            batas = db.arsip_batas
+            if batas is None:
+                return {tabel: 0 for tabel in TABEL_RIWAYAT}
+            dari = batas
+            for tabel in TABEL_RIWAYAT:
+                terlama = conn.execute(f"SELECT MIN(tanggal) FROM main.{tabel} WHERE tanggal < ? AND id IN (SELECT id FROM arsip.{tabel})",
+                                       (batas,)).fetchone()[0]
+                if terlama is not None:
+                    dari = min(dari, str(terlama))
+                dipindah[tabel] = conn.execute(f"DELETE FROM main.{tabel} WHERE tanggal < ? AND id IN (SELECT id FROM arsip.{tabel})",
+                                               (batas,)).rowcount
+            if dari < batas: # Trigger DELETE tier panas mengurangi ringkasan; baris yang sama kini dihitung dari arsip
+                for sql in migrasi.sql_rebuild_ringkasan(dengan_arsip=True, rentang=True):
+                    conn.execute(sql, {"dari": dari, "sampai": batas})
+        return dipindah
+
+    def _pulihkan_arsip(self) -> None:
+        """Menyelesaikan arsipkan() yang terhenti setelah salinan ke arsip ter-commit (baris ada di kedua tier)."""
+        try:
+            batas = self.db.arsip_batas
+            if batas is None:
+                return
+            sisa = [tabel for tabel in TABEL_RIWAYAT if self.db.fetch_query(
+                f"SELECT 1 FROM main.{tabel} WHERE tanggal < ? AND id IN (SELECT id FROM arsip.{tabel}) LIMIT 1", (batas,), fetch_all=False)]
+            if sisa:
+                print(f"[WellnessTracker] Menyelesaikan pengarsipan yang terhenti ({', '.join(sisa)})...")
+                self._selesaikan_arsip()
+                self.invalidasi_cache()
+        except sqlite3.Error as e:
+            print(f"ERROR [manajer_wellness.py] Pemulihan arsip gagal: {e}")
+
+    # --- Cache Baca ---
+    def statistik_cache(self) -> dict:
+        return self._cache.statistik()
+
+    def statistik_query(self) -> pd.DataFrame:
+        """p50/p95, jumlah, baris dan waktu tunggu koneksi per template query (lihat instrumentasi.py)."""
+        return instrumentasi.get_instrumentasi().statistik()
+
+    def invalidasi_cache(self, *daftar_tabel: str) -> None:
+        """Membuang cache untuk tabel tertentu (atau semua jika kosong), mis. setelah DB diubah di luar tracker."""
+        if daftar_tabel:
+            self._cache.naikkan_generasi(*daftar_tabel)
+        else:
+            self._cache.naikkan_generasi(*TABEL_RIWAYAT, "katalog_makanan") # Tracker lain untuk file yang sama ikut membuang cache
+            self._cache.bersihkan()
+            self._rolling.clear() # Analitik bergulir dihitung penuh lagi pada pemanggilan berikutnya
+
+    # --- Pengukuran Tubuh ---
+    def tambah_pengukuran(self, pengukuran: PengukuranTubuh) -> bool:
+        return self._tambah(pengukuran, PengukuranTubuh)
+
+    def tambah_pengukuran_batch(self, daftar_pengukuran: list[PengukuranTubuh]) -> dict:
+        return self._tambah_batch(daftar_pengukuran, PengukuranTubuh)
+
+    @dicache("pengukuran_tubuh")
+    def get_data_pengukuran(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        query = "SELECT id, tanggal, berat_kg, tinggi_cm FROM " + self._sumber("pengukuran_tubuh", filter_tanggal, start)
+        klausa, params = _klausa_riwayat(filter_tanggal, start, end, after, limit)
+        df = _ketik_kolom(self.db.get_dataframe(query + klausa, params=params), {'berat_kg': 'float64', 'tinggi_cm': 'float64'})
+        df['imt'] = hitung_imt_batch(df['berat_kg'], df['tinggi_cm']).filled(np.nan)
         return df
 
+    def get_riwayat_pengukuran(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        return presentasi.format_pengukuran(self.get_data_pengukuran(filter_tanggal, start, end, after, limit))
+
     def hapus_pengukuran(self, id_pengukuran: int) -> bool:
-        sql = "DELETE FROM pengukuran_tubuh WHERE id = ?"
-        return database.execute_query(sql, (id_pengukuran,)) is not None
+        return self._hapus("pengukuran_tubuh", id_pengukuran)
 
     # --- Aktivitas Fisik ---
     def tambah_aktivitas(self, aktivitas: AktivitasFisik) -> bool:
-        if not isinstance(aktivitas, AktivitasFisik) or aktivitas.durasi_menit <= 0:
-            return False
-        sql = "INSERT INTO aktivitas_fisik (tanggal, jenis_aktivitas, durasi_menit, kalori_terbakar) VALUES (?, ?, ?, ?)"
-        params = (aktivitas.tanggal.strftime("%Y-%m-%d"), aktivitas.jenis_aktivitas, aktivitas.durasi_menit, aktivitas.kalori_terbakar_perkiraan)
-        last_id = database.execute_query(sql, params)
-        if last_id is not None:
-            aktivitas.id = last_id
-            return True
-        return False
+        return self._tambah(aktivitas, AktivitasFisik)
 
-    def get_riwayat_aktivitas(self, filter_tanggal: datetime.date | None = None) -> pd.DataFrame:
-        query = "SELECT id, tanggal, jenis_aktivitas, durasi_menit, kalori_terbakar FROM aktivitas_fisik"
-        params = None
-        if filter_tanggal:
-            query += " WHERE tanggal = ?"
-            params = (filter_tanggal.strftime("%Y-%m-%d"),)
-        query += " ORDER BY tanggal DESC, id DESC"
-        df = database.get_dataframe(query, params=params)
-        if not df.empty:
-            df['Tanggal'] = pd.to_datetime(df['tanggal']).dt.strftime('%d-%m-%Y')
-            df['Durasi (menit)'] = df['durasi_menit']
-            df['Kalori Terbakar'] = df['kalori_terbakar'].fillna(0).map('{:.0f}'.format)
-            df = df[['id', 'Tanggal', 'jenis_aktivitas', 'Durasi (menit)', 'Kalori Terbakar']]
-            df.rename(columns={'jenis_aktivitas': 'Jenis Aktivitas'}, inplace=True)
-        return df
+    def tambah_aktivitas_batch(self, daftar_aktivitas: list[AktivitasFisik]) -> dict:
+        return self._tambah_batch(daftar_aktivitas, AktivitasFisik)
+
+    @dicache("aktivitas_fisik")
+    def get_data_aktivitas(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        query = "SELECT id, tanggal, jenis_aktivitas, durasi_menit, kalori_terbakar FROM " + self._sumber("aktivitas_fisik", filter_tanggal, start)
+        klausa, params = _klausa_riwayat(filter_tanggal, start, end, after, limit)
+        return _ketik_kolom(self.db.get_dataframe(query + klausa, params=params), {'jenis_aktivitas': 'category', 'durasi_menit': 'int64', 'kalori_terbakar': 'float64'})
+
+    def get_riwayat_aktivitas(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        return presentasi.format_aktivitas(self.get_data_aktivitas(filter_tanggal, start, end, after, limit))
 
     def hapus_aktivitas(self, id_aktivitas: int) -> bool:
-        sql = "DELETE FROM aktivitas_fisik WHERE id = ?"
-        return database.execute_query(sql, (id_aktivitas,)) is not None
+        return self._hapus("aktivitas_fisik", id_aktivitas)
 
     # --- Asupan Makanan ---
     def tambah_makanan(self, makanan: AsupanMakanan) -> bool:
-        if not isinstance(makanan, AsupanMakanan) or not makanan.deskripsi_makanan or makanan.kalori < 0:
-            return False
-        sql = "INSERT INTO asupan_makanan (tanggal, deskripsi_makanan, kalori, protein_g, karbo_g, lemak_g) VALUES (?, ?, ?, ?, ?, ?)"
-        params = (makanan.tanggal.strftime("%Y-%m-%d"), makanan.deskripsi_makanan, makanan.kalori, makanan.protein_g, makanan.karbo_g, makanan.lemak_g)
-        last_id = database.execute_query(sql, params)
-        if last_id is not None:
-            makanan.id = last_id
-            return True
-        return False
+        return self._tambah(makanan, AsupanMakanan)
 
-    def get_riwayat_makanan(self, filter_tanggal: datetime.date | None = None) -> pd.DataFrame:
-        query = "SELECT id, tanggal, deskripsi_makanan, kalori, protein_g, karbo_g, lemak_g FROM asupan_makanan"
-        params = None
-        if filter_tanggal:
-            query += " WHERE tanggal = ?"
-            params = (filter_tanggal.strftime("%Y-%m-%d"),)
-        query += " ORDER BY tanggal DESC, id DESC"
-        df = database.get_dataframe(query, params=params)
-        if not df.empty:
-            df['Tanggal'] = pd.to_datetime(df['tanggal']).dt.strftime('%d-%m-%Y')
-            df['Kalori'] = df['kalori'].map('{:.0f}'.format)
-            df['Protein (g)'] = df['protein_g'].fillna(0).map('{:.1f}'.format)
-            df['Karbo (g)'] = df['karbo_g'].fillna(0).map('{:.1f}'.format)
-            df['Lemak (g)'] = df['lemak_g'].fillna(0).map('{:.1f}'.format)
-            df = df[['id', 'Tanggal', 'deskripsi_makanan', 'Kalori', 'Protein (g)', 'Karbo (g)', 'Lemak (g)']]
-            df.rename(columns={'deskripsi_makanan': 'Deskripsi Makanan'}, inplace=True)
-        return df
+    def tambah_makanan_batch(self, daftar_makanan: list[AsupanMakanan]) -> dict:
+        return self._tambah_batch(daftar_makanan, AsupanMakanan)
+
+    @dicache("asupan_makanan")
+    def get_data_makanan(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        query = "SELECT id, tanggal, deskripsi_makanan, kalori, protein_g, karbo_g, lemak_g FROM " + self._sumber("asupan_makanan", filter_tanggal, start)
+        klausa, params = _klausa_riwayat(filter_tanggal, start, end, after, limit)
+        return _ketik_kolom(self.db.get_dataframe(query + klausa, params=params), {'deskripsi_makanan': 'string', 'kalori': 'float64', 'protein_g': 'float64', 'karbo_g': 'float64', 'lemak_g': 'float64'})
+
+    def get_riwayat_makanan(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        return presentasi.format_makanan(self.get_data_makanan(filter_tanggal, start, end, after, limit))
 
     def hapus_makanan(self, id_makanan: int) -> bool:
-        sql = "DELETE FROM asupan_makanan WHERE id = ?"
-        return database.execute_query(sql, (id_makanan,)) is not None
+        return self._hapus("asupan_makanan", id_makanan)
 
     # --- Asupan Air ---
     def tambah_air(self, air: AsupanAir) -> bool:
-        if not isinstance(air, AsupanAir) or air.jumlah_ml <= 0:
-            return False
-        sql = "INSERT INTO asupan_air (tanggal, jumlah_ml) VALUES (?, ?)"
-        params = (air.tanggal.strftime("%Y-%m-%d"), air.jumlah_ml)
-        last_id = database.execute_query(sql, params)
-        if last_id is not None:
-            air.id = last_id
-            return True
-        return False
+        return self._tambah(air, AsupanAir)
 
-    def get_riwayat_air(self, filter_tanggal: datetime.date | None = None) -> pd.DataFrame:
-        query = "SELECT id, tanggal, jumlah_ml FROM asupan_air"
-        params = None
-        if filter_tanggal:
-            query += " WHERE tanggal = ?"
-            params = (filter_tanggal.strftime("%Y-%m-%d"),)
-        query += " ORDER BY tanggal DESC, id DESC"
-        df = database.get_dataframe(query, params=params)
-        if not df.empty:
-            df['Tanggal'] = pd.to_datetime(df['tanggal']).dt.strftime('%d-%m-%Y')
-            df['Jumlah (ml)'] = df['jumlah_ml']
-            df = df[['id', 'Tanggal', 'Jumlah (ml)']]
-        return df
+    def tambah_air_batch(self, daftar_air: list[AsupanAir]) -> dict:
+        return self._tambah_batch(daftar_air, AsupanAir)
+
+    @dicache("asupan_air")
+    def get_data_air(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        query = "SELECT id, tanggal, jumlah_ml FROM " + self._sumber("asupan_air", filter_tanggal, start)
+        klausa, params = _klausa_riwayat(filter_tanggal, start, end, after, limit)
+        return _ketik_kolom(self.db.get_dataframe(query + klausa, params=params), {'jumlah_ml': 'int64'})
+
+    def get_riwayat_air(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        return presentasi.format_air(self.get_data_air(filter_tanggal, start, end, after, limit))
 
     def hapus_air(self, id_air: int) -> bool:
-        sql = "DELETE FROM asupan_air WHERE id = ?"
-        return database.execute_query(sql, (id_air,)) is not None
+        return self._hapus("asupan_air", id_air)
 
     # --- Catatan Harian ---
     def tambah_catatan(self, catatan: CatatanHarian) -> bool:
-        if not isinstance(catatan, CatatanHarian):
-            return False
-        sql = "INSERT INTO catatan_harian (tanggal, suasana_hati_skala, tingkat_energi_skala, catatan_tambahan) VALUES (?, ?, ?, ?)"
-        params = (catatan.tanggal.strftime("%Y-%m-%d"), catatan.suasana_hati_skala, catatan.tingkat_energi_skala, catatan.catatan_tambahan)
-        last_id = database.execute_query(sql, params)
-        if last_id is not None:
-            catatan.id = last_id
-            return True
-        return False
+        return self._tambah(catatan, CatatanHarian)
 
-    def get_riwayat_catatan(self, filter_tanggal: datetime.date | None = None) -> pd.DataFrame:
-        query = "SELECT id, tanggal, suasana_hati_skala, tingkat_energi_skala, catatan_tambahan FROM catatan_harian"
-        params = None
-        if filter_tanggal:
-            query += " WHERE tanggal = ?"
-            params = (filter_tanggal.strftime("%Y-%m-%d"),)
-        query += " ORDER BY tanggal DESC, id DESC"
-        df = database.get_dataframe(query, params=params)
-        if not df.empty:
-            df['Tanggal'] = pd.to_datetime(df['tanggal']).dt.strftime('%d-%m-%Y')
-            df['Suasana Hati (1-5)'] = df['suasana_hati_skala'].fillna('N/A').astype(str)
-            df['Tingkat Energi (1-5)'] = df['tingkat_energi_skala'].fillna('N/A').astype(str)
-            df.rename(columns={'catatan_tambahan': 'Catatan Tambahan'}, inplace=True)
-            df = df[['id', 'Tanggal', 'Suasana Hati (1-5)', 'Tingkat Energi (1-5)', 'Catatan Tambahan']]
-        return df
+    def tambah_catatan_batch(self, daftar_catatan: list[CatatanHarian]) -> dict:
+        return self._tambah_batch(daftar_catatan, CatatanHarian)
+
+    @dicache("catatan_harian")
+    def get_data_catatan(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        query = "SELECT id, tanggal, suasana_hati_skala, tingkat_energi_skala, catatan_tambahan FROM " + self._sumber("catatan_harian", filter_tanggal, start)
+        klausa, params = _klausa_riwayat(filter_tanggal, start, end, after, limit)
+        return _ketik_kolom(self.db.get_dataframe(query + klausa, params=params), {'suasana_hati_skala': 'Int64', 'tingkat_energi_skala': 'Int64', 'catatan_tambahan': 'string'})
+
+    def get_riwayat_catatan(self, filter_tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None, after: tuple[datetime.date, int] | None = None, limit: int | None = None) -> pd.DataFrame:
+        return presentasi.format_catatan(self.get_data_catatan(filter_tanggal, start, end, after, limit))
 
     def hapus_catatan(self, id_catatan: int) -> bool:
-        sql = "DELETE FROM catatan_harian WHERE id = ?"
-        return database.execute_query(sql, (id_catatan,)) is not None
+        return self._hapus("catatan_harian", id_catatan)
+
+    # --- Pencarian Teks Penuh (FTS5) ---
+    def _cari(self, tabel: str, tipe: dict, query: str, start: datetime.date | None, end: datetime.date | None, limit: int) -> pd.DataFrame:
+        """Baris `tabel` yang cocok dengan `query` lewat indeks {tabel}_fts, urut bm25 (skor kecil = paling relevan).
+        Hanya baris yang cocok yang di-join dan difilter tanggal; tier arsip ikut dicari jika rentang menjangkaunya."""
+        kueri = _kueri_fts(query)
+        if kueri is None:
+            return _ketik_kolom(pd.DataFrame(), tipe).assign(skor=pd.Series(dtype='float64'))
+        where, params = _klausa_tanggal(start=start, end=end, sambung=" AND ")
+        fts = f"{tabel}_fts"
+        pilih = ", ".join(f"t.{k}" for k in ["id", "tanggal", *tipe])
+
+        def cabang(skema: str) -> str:
+            return f"SELECT {pilih}, f.rank AS skor FROM {skema}{fts} AS f JOIN {skema}{tabel} AS t ON t.id = f.rowid WHERE f.{fts} MATCH ?" + where
+
+        params = (kueri, *(params or ()))
+        if self._sumber(tabel, start=start) == tabel:
+            sql = cabang("")
+        else: # bm25 dihitung per indeks (statistik korpus masing-masing tier), lalu digabung
+            sql, params = f"SELECT * FROM ({cabang('main.')} UNION ALL {cabang('arsip.')})", params * 2
+        df = self.db.get_dataframe(sql + " ORDER BY skor, tanggal DESC, id DESC LIMIT ?", (*params, int(limit))) # Skor sama: terbaru dulu
+        skor = df['skor'] if 'skor' in df else pd.Series(dtype='float64')
+        return _ketik_kolom(df, tipe).assign(skor=skor.astype('float64'))
+
+    @dicache("asupan_makanan")
+    def cari_makanan(self, query: str, start: datetime.date | None = None, end: datetime.date | None = None, limit: int = CARI_BATAS_HASIL) -> pd.DataFrame:
+        """Asupan makanan yang deskripsinya cocok dengan `query` (mis. "nasi goreng"), paling relevan di atas."""
+        return self._cari("asupan_makanan", {'deskripsi_makanan': 'string', 'kalori': 'float64', 'protein_g': 'float64', 'karbo_g': 'float64', 'lemak_g': 'float64'},
+                          query, start, end, limit)
+
+    @dicache("catatan_harian")
+    def cari_catatan(self, query: str, start: datetime.date | None = None, end: datetime.date | None = None, limit: int = CARI_BATAS_HASIL) -> pd.DataFrame:
+        """Catatan harian yang catatan tambahannya cocok dengan `query` (mis. "sakit kepala"), paling relevan di atas."""
+        return self._cari("catatan_harian", {'suasana_hati_skala': 'Int64', 'tingkat_energi_skala': 'Int64', 'catatan_tambahan': 'string'},
+                          query, start, end, limit)
+
+    # --- Katalog Makanan (autocomplete form asupan) ---
+    def _indeks_katalog(self) -> IndeksKatalog:
+        """Indeks katalog di memori; setelah tulis ke asupan_makanan/katalog_makanan hanya baris dengan versi baru yang dibaca."""
+        kolom = "id, nama, kalori, protein_g, karbo_g, lemak_g, sumber, jumlah_pakai, versi"
+        with self._kunci_katalog:
+            generasi = (self._cache.generasi("asupan_makanan"), self._cache.generasi("katalog_makanan")) # Dibaca sebelum query
+            if self._katalog is None:
+                indeks = IndeksKatalog()
+                indeks.muat([tuple(r) for r in self.db.fetch_query(f"SELECT {kolom} FROM katalog_makanan") or []])
+                self._katalog = indeks
+            elif generasi != self._katalog_generasi:
+                baris = self.db.fetch_query(f"SELECT {kolom} FROM katalog_makanan WHERE versi > ? ORDER BY versi", (self._katalog.versi,))
+                self._katalog.perbarui([tuple(r) for r in baris or []])
+            self._katalog_generasi = generasi
+            return self._katalog
+
+    def cari_katalog(self, teks: str, batas: int = KATALOG_BATAS_SARAN) -> list[dict]:
+        """Saran makanan (nama, kalori, protein_g, karbo_g, lemak_g, sumber, jumlah_pakai) yang nama atau salah satu
+        katanya berawalan `teks`; makanan dari riwayat pengguna dan yang paling sering dicatat di atas."""
+        return self._indeks_katalog().cari(teks, batas)
+
+    def impor_katalog(self, path: str) -> int | None:
+        """Menambah item katalog dari CSV (nama,kalori,protein_g,karbo_g,lemak_g); nama yang sudah ada tidak ditimpa."""
+        try:
+            with self.db.transaksi() as conn:
+                jumlah = migrasi.isi_katalog_dari_csv(conn, path)
+        except sqlite3.Error as e:
+            print(f"ERROR [manajer_wellness.py] Impor katalog gagal: {e}")
+            return None
+        self._cache.naikkan_generasi("katalog_makanan")
+        return jumlah
 
     # --- Ringkasan & Analisis ---
-    def hitung_total_kalori_harian(self, tanggal: datetime.date) -> tuple[float, float]:
-        sql_makanan = "SELECT SUM(kalori) FROM asupan_makanan WHERE tanggal = ?"
-        kalori_makanan = database.fetch_query(sql_makanan, (tanggal.strftime("%Y-%m-%d"),), fetch_all=False)
-        total_kalori_makanan = float(kalori_makanan[0]) if kalori_makanan and kalori_makanan[0] is not None else 0.0
+    @dicache("asupan_makanan", "aktivitas_fisik", "asupan_air")
+    def _get_ringkasan_harian(self, tanggal: datetime.date) -> sqlite3.Row | None:
+        sql = "SELECT * FROM ringkasan_harian WHERE tanggal = ?"
+        return self.db.fetch_query(sql, (tanggal.strftime("%Y-%m-%d"),), fetch_all=False)
 
-        sql_aktivitas = "SELECT SUM(kalori_terbakar) FROM aktivitas_fisik WHERE tanggal = ?"
-        kalori_aktivitas = database.fetch_query(sql_aktivitas, (tanggal.strftime("%Y-%m-%d"),), fetch_all=False)
-        total_kalori_terbakar = float(kalori_aktivitas[0]) if kalori_aktivitas and kalori_aktivitas[0] is not None else 0.0
+    def hitung_total_kalori_harian(self, tanggal: datetime.date) -> tuple[float, float]:
+        ringkasan = self._get_ringkasan_harian(tanggal)
+        if ringkasan:
+            return float(ringkasan['kalori_masuk']), float(ringkasan['kalori_keluar'])
+        return 0.0, 0.0
 
-        return total_kalori_makanan, total_kalori_terbakar
+    @dicache("asupan_makanan", "aktivitas_fisik")
+    def get_seri_kalori(self, start: datetime.date, end: datetime.date) -> pd.DataFrame:
+        """Kalori masuk & keluar per hari dalam rentang [start, end] dengan satu query; hari kosong bernilai 0."""
+        sql = "SELECT tanggal, kalori_masuk, kalori_keluar FROM ringkasan_harian WHERE tanggal BETWEEN ? AND ?"
+        df = self.db.get_dataframe(sql, (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")))
+        semua_hari = pd.date_range(start, end, freq="D")
+        if df.empty:
+            df = pd.DataFrame({'kalori_masuk': 0.0, 'kalori_keluar': 0.0}, index=semua_hari)
+        else:
+            df.index = pd.to_datetime(df['tanggal'])
+            df = df[['kalori_masuk', 'kalori_keluar']].astype(float).reindex(semua_hari, fill_value=0.0)
+        df.index = df.index.strftime('%Y-%m-%d')
+        df.index.name = 'Tanggal'
+        return df.rename(columns={'kalori_masuk': 'Kalori Masuk', 'kalori_keluar': 'Kalori Keluar'}).reset_index()
 
     def hitung_total_air_harian(self, tanggal: datetime.date) -> float:
-        sql_air = "SELECT SUM(jumlah_ml) FROM asupan_air WHERE tanggal = ?"
-        air_masuk = database.fetch_query(sql_air, (tanggal.strftime("%Y-%m-%d"),), fetch_all=False)
-        return float(air_masuk[0]) if air_masuk and air_masuk[0] is not None else 0.0
+        ringkasan = self._get_ringkasan_harian(tanggal)
+        return float(ringkasan['air_ml']) if ringkasan else 0.0
 
+    @dicache("pengukuran_tubuh")
     def get_latest_imt(self) -> tuple[float, datetime.date] | None:
-        query = "SELECT tanggal, berat_kg, tinggi_cm FROM pengukuran_tubuh ORDER BY tanggal DESC, id DESC LIMIT 1"
-        latest_data = database.fetch_query(query, fetch_all=False)
+        query = "SELECT tanggal, berat_kg, tinggi_cm FROM {} ORDER BY tanggal DESC, id DESC LIMIT 1"
+        latest_data = self.db.fetch_query(query.format("pengukuran_tubuh"), fetch_all=False)
+        batas = self.db.arsip_batas
+        if batas is not None and (latest_data is None or str(latest_data['tanggal']) < batas): # Terbaru mungkin ada di arsip
+            latest_data = self.db.fetch_query(query.format(migrasi.sumber_gabungan("pengukuran_tubuh")), fetch_all=False)
         if latest_data:
             pengukuran = PengukuranTubuh(latest_data['tanggal'], latest_data['berat_kg'], latest_data['tinggi_cm'])
             return pengukuran.hitung_imt(), pengukuran.tanggal
         return None
 
     def get_ringkasan_makro(self, tanggal: datetime.date) -> dict:
-        query = """
-        SELECT SUM(protein_g) as total_protein,
-               SUM(karbo_g) as total_karbo,
-               SUM(lemak_g) as total_lemak
-        FROM asupan_makanan
-        WHERE tanggal = ?
-        """
-        result = database.fetch_query(query, (tanggal.strftime("%Y-%m-%d"),), fetch_all=False)
-        if result:
+        ringkasan = self._get_ringkasan_harian(tanggal)
+        if ringkasan:
             return {
-                "protein": float(result['total_protein']) if result['total_protein'] is not None else 0.0,
-                "karbo": float(result['total_karbo']) if result['total_karbo'] is not None else 0.0,
-                "lemak": float(result['total_lemak']) if result['total_lemak'] is not None else 0.0
+                "protein": float(ringkasan['protein_g']),
+                "karbo": float(ringkasan['karbo_g']),
+                "lemak": float(ringkasan['lemak_g'])
             }
         return {"protein": 0.0, "karbo": 0.0, "lemak": 0.0}
 
-    def get_data_tren_berat_badan(self, periode: str = "mingguan") -> pd.DataFrame:
+    def get_snapshot_harian(self, tanggal: datetime.date) -> SnapshotHarian:
+        """Membaca semua data dashboard untuk satu tanggal dalam satu transaksi baca pada satu koneksi."""
+        with self.db.transaksi("DEFERRED"):
+            ringkasan = self._get_ringkasan_harian(tanggal)
+            makro = {"protein": 0.0, "karbo": 0.0, "lemak": 0.0}
+            if ringkasan:
+                makro = {"protein": float(ringkasan['protein_g']), "karbo": float(ringkasan['karbo_g']), "lemak": float(ringkasan['lemak_g'])}
+            return SnapshotHarian(
+                tanggal=tanggal,
+                kalori_masuk=float(ringkasan['kalori_masuk']) if ringkasan else 0.0,
+                kalori_keluar=float(ringkasan['kalori_keluar']) if ringkasan else 0.0,
+                air_ml=float(ringkasan['air_ml']) if ringkasan else 0.0,
+                makro=makro,
+                imt_terbaru=self.get_latest_imt(),
+                df_makanan=self.get_riwayat_makanan(tanggal),
+                df_aktivitas=self.get_riwayat_aktivitas(tanggal),
+                df_catatan=self.get_riwayat_catatan(tanggal)
+            )
+
+    def rebuild_ringkasan_harian(self) -> bool:
+        """Menghitung ulang seluruh ringkasan_harian dari tabel mentah."""
+        try:
+            with self.db.transaksi() as conn:
+                for sql in migrasi.sql_rebuild_ringkasan(self.db.arsip_aktif):
+                    conn.execute(sql)
+            self._cache.naikkan_generasi("asupan_makanan", "aktivitas_fisik", "asupan_air")
+            return True
+        except sqlite3.Error as e:
+            print(f"ERROR [manajer_wellness.py] Rebuild ringkasan_harian gagal: {e}")
+            return False
+
+    def cek_konsistensi_ringkasan(self, toleransi: float = 1e-6) -> pd.DataFrame:
+        """Membandingkan ringkasan_harian dengan hasil hitung ulang; mengembalikan hari yang berbeda."""
+        with self.db.transaksi("DEFERRED"):
+            tersimpan = self.db.get_dataframe("SELECT * FROM ringkasan_harian")
+            dihitung = self.db.get_dataframe(migrasi.sql_hitung_ringkasan(self.db.arsip_aktif))
+        for df in (tersimpan, dihitung):
+            if df.empty:
+                df['tanggal'] = pd.Series(dtype=str)
+            df['tanggal'] = df['tanggal'].astype(str)
+        gabung = tersimpan.merge(dihitung, on='tanggal', how='outer', suffixes=('_tersimpan', '_dihitung')).fillna(0)
+        beda = pd.Series(False, index=gabung.index)
+        for kolom in migrasi.KOLOM_RINGKASAN:
+            beda |= (gabung[f'{kolom}_tersimpan'].astype(float) - gabung[f'{kolom}_dihitung'].astype(float)).abs() > toleransi
+        return gabung[beda].reset_index(drop=True)
+
+    @dicache("pengukuran_tubuh")
+    def get_data_tren_berat_badan(self, periode: str = "mingguan", maks_titik: int | None = None) -> pd.DataFrame:
+        """Tren berat harian (per pengukuran) atau rata-rata mingguan/bulanan. `maks_titik` membatasi jumlah titik
+        untuk grafik (downsampling LTTB)."""
+        sumber = self._sumber("pengukuran_tubuh")
         if periode == "mingguan":
-            sql = """
+            sql = f"""
             SELECT
                 strftime('%Y-%W', tanggal) as periode,
                 AVG(berat_kg) as avg_berat_kg
-            FROM pengukuran_tubuh
+            FROM {sumber}
             GROUP BY periode
             ORDER BY periode ASC
             """
         elif periode == "bulanan":
-            sql = """
+            sql = f"""
             SELECT
                 strftime('%Y-%m', tanggal) as periode,
                 AVG(berat_kg) as avg_berat_kg
-            FROM pengukuran_tubuh
+            FROM {sumber}
             GROUP BY periode
             ORDER BY periode ASC
             """
         else: # Harian
-            sql = """
+            sql = f"""
             SELECT
                 tanggal as periode,
                 berat_kg
-            FROM pengukuran_tubuh
+            FROM {sumber}
             ORDER BY tanggal ASC
             """
-        df = database.get_dataframe(sql)
+        df = self.db.get_dataframe(sql)
         if not df.empty:
             if periode == "harian":
                 df['periode'] = pd.to_datetime(df['periode'])
                 df.rename(columns={'berat_kg': 'Berat Badan (kg)'}, inplace=True)
             else:
-                df['periode'] = df['periode'].apply(lambda x: f"Pekan {x.split('-')[1]}-{x.split('-')[0]}" if periode == "mingguan" else f"Bulan {x.split('-')[1]}-{x.split('-')[0]}")
+                # 'YYYY-WW' / 'YYYY-MM' -> 'Pekan WW-YYYY' / 'Bulan MM-YYYY' dengan operasi string vektor
+                awalan = "Pekan " if periode == "mingguan" else "Bulan "
+                df['periode'] = awalan + df['periode'].str.slice(5) + "-" + df['periode'].str.slice(0, 4)
                 df.rename(columns={'avg_berat_kg': 'Berat Badan Rata-rata (kg)'}, inplace=True)
+            if maks_titik:
+                df = turunkan_sampel(df, df.columns[1], maks_titik, kolom_x='periode' if periode == "harian" else None)
         return df
 
+    @dicache("pengukuran_tubuh")
+    def get_data_tren_imt(self, start: datetime.date | None = None, end: datetime.date | None = None, maks_titik: int | None = None) -> pd.DataFrame:
+        """Seri IMT per pengukuran (urut tanggal naik), dihitung vektor; pengukuran tidak valid dibuang.
+        `maks_titik` membatasi jumlah titik untuk grafik (downsampling LTTB)."""
+        where, params = _klausa_tanggal(start=start, end=end)
+        sql = "SELECT tanggal, berat_kg, tinggi_cm FROM " + self._sumber("pengukuran_tubuh", start=start) + where + " ORDER BY tanggal ASC, id ASC"
+        df = self.db.get_dataframe(sql, params)
+        if df.empty:
+            return pd.DataFrame(columns=['Tanggal', 'IMT'])
+        imt = hitung_imt_batch(df['berat_kg'], df['tinggi_cm'])
+        df = pd.DataFrame({'Tanggal': pd.to_datetime(df['tanggal']), 'IMT': imt.filled(np.nan)}).dropna(subset=['IMT']).reset_index(drop=True)
+        return turunkan_sampel(df, 'IMT', maks_titik, kolom_x='Tanggal') if maks_titik else df
+
+    # --- Analitik Bergulir (rata-rata 7/30 hari, EWM, delta harian) ---
+    def _muat_harian_pengukuran(self, mulai: datetime.date | None) -> pd.DataFrame:
+        where, params = _klausa_tanggal(start=mulai)
+        sql = ("SELECT tanggal, AVG(berat_kg) AS berat, AVG(berat_kg / ((tinggi_cm / 100.0) * (tinggi_cm / 100.0))) AS imt "
+               "FROM " + self._sumber("pengukuran_tubuh", start=mulai) + where + " GROUP BY tanggal ORDER BY tanggal")
+        return _seri_harian(self.db.get_dataframe(sql, params), ['berat', 'imt'])
+
+    def _muat_harian_ringkasan(self, mulai: datetime.date | None) -> pd.DataFrame:
+        where, params = _klausa_tanggal(start=mulai)
+        sql = "SELECT tanggal, kalori_masuk - kalori_keluar AS kalori_bersih, air_ml AS air FROM ringkasan_harian" + where + " ORDER BY tanggal"
+        return _seri_harian(self.db.get_dataframe(sql, params), ['kalori_bersih', 'air'])
+
+    def _hasil_rolling(self, nama: str, tabel: tuple[str, ...], muat_harian, isi_nol: bool) -> pd.DataFrame:
+        if nama not in self._rolling:
+            self._rolling[nama] = (RollingInkremental(muat_harian, isi_nol=isi_nol), {t: -1 for t in tabel})
+        status, generasi_lama = self._rolling[nama]
+        generasi_baru = {t: self._cache.generasi(t) for t in tabel} # Dibaca sebelum query: tulis selama query ikut dihitung lagi nanti
+        hasil = status.ambil(self._cache.perubahan_sejak(generasi_lama))
+        self._rolling[nama] = (status, generasi_baru)
+        return hasil
+
+    def get_analitik_rolling(self, start: datetime.date | None = None, end: datetime.date | None = None) -> pd.DataFrame:
+        """Per tanggal: berat, imt, kalori_bersih, air beserta kolom _rata7, _rata30, _ewm dan _delta masing-masing.
+        Berat/IMT hanya pada hari pengukuran; kalori & air dihitung untuk setiap hari (hari kosong = 0).
+        Setelah tulis baru hanya ekor deret sejak tanggal terkecil yang berubah yang dihitung ulang."""
+        df = self._hasil_rolling("pengukuran", ("pengukuran_tubuh",), self._muat_harian_pengukuran, False).join(
+            self._hasil_rolling("ringkasan", ("asupan_makanan", "aktivitas_fisik", "asupan_air"), self._muat_harian_ringkasan, True), how='outer')
+        if start:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end:
+            df = df[df.index <= pd.Timestamp(end)]
+        return df.reset_index()
+
+    @dicache("aktivitas_fisik")
     def get_kalori_aktivitas_per_jenis(self, filter_tanggal_awal: datetime.date | None = None, filter_tanggal_akhir: datetime.date | None = None) -> pd.DataFrame:
-        query = "SELECT jenis_aktivitas, SUM(kalori_terbakar) as total_kalori FROM aktivitas_fisik WHERE kalori_terbakar IS NOT NULL"
-        params = []
-        if filter_tanggal_awal and filter_tanggal_akhir:
-            query += " AND tanggal BETWEEN ? AND ?"
-            params.append(filter_tanggal_awal.strftime("%Y-%m-%d"))
-            params.append(filter_tanggal_akhir.strftime("%Y-%m-%d"))
-        elif filter_tanggal_awal:
-            query += " AND tanggal >= ?"
-            params.append(filter_tanggal_awal.strftime("%Y-%m-%d"))
-        elif filter_tanggal_akhir:
-            query += " AND tanggal <= ?"
-            params.append(filter_tanggal_akhir.strftime("%Y-%m-%d"))
-
-        query += " GROUP BY jenis_aktivitas ORDER BY total_kalori DESC"
-        df = database.get_dataframe(query, tuple(params) if params else None)
+        query = ("SELECT jenis_aktivitas, SUM(kalori_terbakar) as total_kalori FROM " + self._sumber("aktivitas_fisik", start=filter_tanggal_awal) +
+                 " WHERE kalori_terbakar IS NOT NULL")
+        where, params = _klausa_tanggal(start=filter_tanggal_awal, end=filter_tanggal_akhir, sambung=" AND ")
+        query += where + " GROUP BY jenis_aktivitas ORDER BY total_kalori DESC"
+        df = self.db.get_dataframe(query, params)
         if not df.empty:
             df.rename(columns={'jenis_aktivitas': 'Jenis Aktivitas', 'total_kalori': 'Total Kalori Terbakar'}, inplace=True)
         return df
 
-    def get_jumlah_entri_per_kategori(self, tabel_nama: str, tanggal: datetime.date | None = None) -> pd.DataFrame:
-        query = f"SELECT COUNT(*) as jumlah FROM {tabel_nama}"
-        params = None
-        if tanggal:
-            query += " WHERE tanggal = ?"
-            params = (tanggal.strftime("%Y-%m-%d"),)
-        df = database.get_dataframe(query, params)
-        return df.iloc[0]['jumlah'] if not df.empty else 0
\ No newline at end of file
+    def get_jumlah_entri_per_kategori(self, tabel_nama: str, tanggal: datetime.date | None = None, start: datetime.date | None = None, end: datetime.date | None = None) -> int:
+        if tabel_nama not in TABEL_RIWAYAT:
+            raise ValueError(f"Tabel '{tabel_nama}' tidak dikenal")
+        where, params = _klausa_tanggal(tanggal, start, end)
+        result = self.db.fetch_query(f"SELECT COUNT(*) FROM {self._sumber(tabel_nama, tanggal, start)}" + where, params, fetch_all=False) # Dihitung dari indeks (tanggal, id)
+        return int(result[0]) if result else 0
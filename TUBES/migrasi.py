@@ -0,0 +1,284 @@
+# migrasi.py
+import csv
+import sqlite3
+from konfigurasi import KATALOG_DATASET_PATH
+
+# Kontribusi setiap tabel sumber ke kolom ringkasan_harian; {r} diganti NEW/OLD di trigger
+_KONTRIBUSI_RINGKASAN = {
+    "asupan_makanan": {
+        "kalori_masuk": "{r}.kalori",
+        "protein_g": "IFNULL({r}.protein_g, 0)",
+        "karbo_g": "IFNULL({r}.karbo_g, 0)",
+        "lemak_g": "IFNULL({r}.lemak_g, 0)",
+    },
+    "aktivitas_fisik": {
+        "kalori_keluar": "IFNULL({r}.kalori_terbakar, 0)",
+    },
+    "asupan_air": {
+        "air_ml": "{r}.jumlah_ml",
+    },
+}
+
+KOLOM_RINGKASAN = ["kalori_masuk", "kalori_keluar", "air_ml", "protein_g", "karbo_g", "lemak_g"]
+
+# Ringkasan per hari yang dihitung ulang dari tabel mentah (untuk pengisian awal & cek konsistensi).
+# {asupan_makanan} dst. = sumber tabel: nama tabel, atau gabungan tier panas & arsip (lihat sumber_gabungan);
+# {saring} = filter tanggal opsional per cabang (lihat sql_hitung_ringkasan)
+_SQL_HITUNG_RINGKASAN = """
+SELECT tanggal, SUM(kalori_masuk) AS kalori_masuk, SUM(kalori_keluar) AS kalori_keluar, SUM(air_ml) AS air_ml,
+       SUM(protein_g) AS protein_g, SUM(karbo_g) AS karbo_g, SUM(lemak_g) AS lemak_g
+FROM (
+    SELECT tanggal, SUM(kalori) AS kalori_masuk, 0 AS kalori_keluar, 0 AS air_ml,
+           IFNULL(SUM(protein_g), 0) AS protein_g, IFNULL(SUM(karbo_g), 0) AS karbo_g, IFNULL(SUM(lemak_g), 0) AS lemak_g
+    FROM {asupan_makanan}{saring} GROUP BY tanggal
+    UNION ALL
+    SELECT tanggal, 0, IFNULL(SUM(kalori_terbakar), 0), 0, 0, 0, 0 FROM {aktivitas_fisik}{saring} GROUP BY tanggal
+    UNION ALL
+    SELECT tanggal, 0, 0, SUM(jumlah_ml), 0, 0, 0 FROM {asupan_air}{saring} GROUP BY tanggal
+)
+GROUP BY tanggal
+"""
+
+# Filter rentang [:dari, :sampai) untuk hitung ulang sebagian (parameter bernama)
+_SARING_RENTANG = " WHERE tanggal >= :dari AND tanggal < :sampai"
+
+def sql_hitung_ringkasan(dengan_arsip: bool = False, rentang: bool = False) -> str:
+    """SQL_HITUNG_RINGKASAN, atau versinya atas gabungan tier panas & arsip; `rentang` membatasi ke [:dari, :sampai)."""
+    sumber = sumber_gabungan if dengan_arsip else str
+    return _SQL_HITUNG_RINGKASAN.format(saring=_SARING_RENTANG if rentang else "", **{t: sumber(t) for t in _KONTRIBUSI_RINGKASAN})
+
+def sumber_gabungan(tabel: str) -> str:
+    """Sumber FROM yang menggabungkan tier panas (main) dan arsip; filter WHERE luar didorong SQLite ke kedua cabang."""
+    return f"(SELECT * FROM main.{tabel} UNION ALL SELECT * FROM arsip.{tabel}) AS {tabel}"
+
+SQL_HITUNG_RINGKASAN = sql_hitung_ringkasan()
+
+def sql_rebuild_ringkasan(dengan_arsip: bool = False, rentang: bool = False) -> list[str]:
+    """Hitung ulang seluruh ringkasan_harian, atau hanya tanggal dalam [:dari, :sampai) jika `rentang`."""
+    return [
+        "DELETE FROM ringkasan_harian" + (_SARING_RENTANG if rentang else ""),
+        f"INSERT INTO ringkasan_harian (tanggal, {', '.join(KOLOM_RINGKASAN)}) {sql_hitung_ringkasan(dengan_arsip, rentang)}",
+    ]
+
+SQL_REBUILD_RINGKASAN = sql_rebuild_ringkasan()
+
+def _trigger_ringkasan(tabel: str, skema: str | None = None) -> list[str]:
+    """Membuat trigger INSERT/DELETE/UPDATE yang menerapkan delta ke ringkasan_harian.
+    Dengan `skema` (mis. 'arsip'): trigger TEMP DELETE/UPDATE atas tabel di database ter-ATTACH tersebut. Tanpa trigger
+    INSERT: arsip hanya diisi arsipkan(), yang menyalin tanpa menulis database utama lalu menghitung ulang ringkasan."""
+    kontribusi = _KONTRIBUSI_RINGKASAN[tabel]
+    kolom = ", ".join(kontribusi)
+    nilai_baru = ", ".join(e.format(r="NEW") for e in kontribusi.values())
+    set_tambah = ", ".join(f"{k} = {k} + excluded.{k}" for k in kontribusi)
+    set_kurang = ", ".join(f"{k} = {k} - " + e.format(r="OLD") for k, e in kontribusi.items())
+    tambah = f"""
+        INSERT INTO ringkasan_harian (tanggal, {kolom}) VALUES (NEW.tanggal, {nilai_baru})
+        ON CONFLICT(tanggal) DO UPDATE SET {set_tambah};"""
+    kurang = f"""
+        UPDATE ringkasan_harian SET {set_kurang} WHERE tanggal = OLD.tanggal;"""
+    buat, nama, target = ("CREATE TEMP TRIGGER", f"trg_{skema}_{tabel}", f"{skema}.{tabel}") if skema else ("CREATE TRIGGER", f"trg_{tabel}", tabel)
+    return [
+        *([] if skema else [f"{buat} IF NOT EXISTS {nama}_ringkasan_insert AFTER INSERT ON {target} BEGIN {tambah}\n    END"]),
+        f"{buat} IF NOT EXISTS {nama}_ringkasan_delete AFTER DELETE ON {target} BEGIN {kurang}\n    END",
+        f"{buat} IF NOT EXISTS {nama}_ringkasan_update AFTER UPDATE ON {target} BEGIN {kurang}{tambah}\n    END",
+    ]
+
+# Kolom teks bebas yang diindeks FTS5 (tabel {tabel}_fts, external content: teks tidak disimpan dua kali)
+KOLOM_FTS = {
+    "asupan_makanan": "deskripsi_makanan",
+    "catatan_harian": "catatan_tambahan",
+}
+
+def _fts(tabel: str, skema: str | None = None) -> list[str]:
+    """Tabel virtual FTS5 untuk KOLOM_FTS[tabel] + trigger sinkronisasi + pengisian awal ('rebuild').
+    Dengan `skema`: dibuat di database ter-ATTACH tersebut (trigger non-TEMP hanya melihat skemanya sendiri)."""
+    kolom = KOLOM_FTS[tabel]
+    awalan = f"{skema}." if skema else ""
+    fts = f"{tabel}_fts"
+    tambah = f"INSERT INTO {fts} (rowid, {kolom}) VALUES (NEW.id, NEW.{kolom});"
+    hapus = f"INSERT INTO {fts} ({fts}, rowid, {kolom}) VALUES ('delete', OLD.id, OLD.{kolom});"
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {awalan}{fts} USING fts5(
+            {kolom}, content='{tabel}', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+        f"CREATE TRIGGER IF NOT EXISTS {awalan}trg_{fts}_insert AFTER INSERT ON {tabel} BEGIN {tambah} END",
+        f"CREATE TRIGGER IF NOT EXISTS {awalan}trg_{fts}_delete AFTER DELETE ON {tabel} BEGIN {hapus} END",
+        f"CREATE TRIGGER IF NOT EXISTS {awalan}trg_{fts}_update AFTER UPDATE OF {kolom} ON {tabel} BEGIN {hapus} {tambah} END",
+        f"INSERT INTO {awalan}{fts} ({fts}) VALUES ('rebuild')",
+    ]
+
+# Katalog makanan: entri dari riwayat pengguna memakai nilai gizi asupan terakhirnya dan menimpa data bawaan.
+# versi naik setiap baris berubah sehingga indeks di memori cukup membaca baris dengan versi > versi terakhirnya.
+_VERSI_KATALOG_BARU = "(SELECT IFNULL(MAX(versi), 0) + 1 FROM katalog_makanan)"
+
+def isi_katalog_dari_csv(conn: sqlite3.Connection, path: str = KATALOG_DATASET_PATH) -> int | None:
+    """Memuat dataset katalog (CSV nama,kalori,protein_g,karbo_g,lemak_g); nama yang sudah ada (mis. dari riwayat)
+    tidak ditimpa. Mengembalikan jumlah item baru, atau None jika file tidak dapat dibaca."""
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            baris = [(r["nama"].strip(), r["nama"].strip().lower(), float(r["kalori"]), float(r["protein_g"] or 0), float(r["karbo_g"] or 0),
+                      float(r["lemak_g"] or 0)) for r in csv.DictReader(f) if r["nama"].strip()]
+    except (OSError, KeyError, ValueError) as e:
+        print(f"ERROR [migrasi.py] Dataset katalog makanan tidak dapat dibaca: {e}")
+        return None
+    return conn.executemany(f"""
+        INSERT OR IGNORE INTO katalog_makanan (nama, nama_kunci, kalori, protein_g, karbo_g, lemak_g, sumber, versi)
+        VALUES (?, ?, ?, ?, ?, ?, 'bawaan', {_VERSI_KATALOG_BARU})""", baris).rowcount
+
+# Daftar migrasi skema secara berurutan: nomor versi = posisi dalam daftar (1, 2, ...),
+# disimpan di PRAGMA user_version. Tambahkan migrasi baru di akhir daftar dan jangan
+# mengubah migrasi yang sudah pernah dirilis. Setiap langkah berupa string SQL atau
+# fungsi yang menerima koneksi.
+MIGRASI = [
+    ("Tabel awal", [
+        """
+        CREATE TABLE IF NOT EXISTS pengukuran_tubuh (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tanggal DATE NOT NULL,
+            berat_kg REAL NOT NULL CHECK(berat_kg > 0),
+            tinggi_cm REAL NOT NULL CHECK(tinggi_cm > 0)
+        );""",
+        """
+        CREATE TABLE IF NOT EXISTS aktivitas_fisik (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tanggal DATE NOT NULL,
+            jenis_aktivitas TEXT NOT NULL,
+            durasi_menit INTEGER NOT NULL CHECK(durasi_menit > 0),
+            kalori_terbakar REAL
+        );""",
+        """
+        CREATE TABLE IF NOT EXISTS asupan_makanan (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tanggal DATE NOT NULL,
+            deskripsi_makanan TEXT NOT NULL,
+            kalori REAL NOT NULL CHECK(kalori >= 0),
+            protein_g REAL,
+            karbo_g REAL,
+            lemak_g REAL
+        );""",
+        """
+        CREATE TABLE IF NOT EXISTS asupan_air (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tanggal DATE NOT NULL,
+            jumlah_ml INTEGER NOT NULL CHECK(jumlah_ml > 0)
+        );""",
+        """
+        CREATE TABLE IF NOT EXISTS catatan_harian (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tanggal DATE NOT NULL,
+            suasana_hati_skala INTEGER CHECK(suasana_hati_skala >= 1 AND suasana_hati_skala <= 5),
+            tingkat_energi_skala INTEGER CHECK(tingkat_energi_skala >= 1 AND tingkat_energi_skala <= 5),
+            catatan_tambahan TEXT
+        );""",
+    ]),
+    ("Indeks (tanggal, id) untuk filter & urutan riwayat", [
+        "CREATE INDEX IF NOT EXISTS idx_pengukuran_tubuh_tanggal ON pengukuran_tubuh (tanggal, id)",
+        "CREATE INDEX IF NOT EXISTS idx_aktivitas_fisik_tanggal ON aktivitas_fisik (tanggal, id)",
+        "CREATE INDEX IF NOT EXISTS idx_asupan_makanan_tanggal ON asupan_makanan (tanggal, id)",
+        "CREATE INDEX IF NOT EXISTS idx_asupan_air_tanggal ON asupan_air (tanggal, id)",
+        "CREATE INDEX IF NOT EXISTS idx_catatan_harian_tanggal ON catatan_harian (tanggal, id)",
+        "ANALYZE",
+    ]),
+    ("Tabel ringkasan_harian yang dijaga trigger", [
+        """
+        CREATE TABLE IF NOT EXISTS ringkasan_harian (
+            tanggal DATE PRIMARY KEY,
+            kalori_masuk REAL NOT NULL DEFAULT 0,
+            kalori_keluar REAL NOT NULL DEFAULT 0,
+            air_ml INTEGER NOT NULL DEFAULT 0,
+            protein_g REAL NOT NULL DEFAULT 0,
+            karbo_g REAL NOT NULL DEFAULT 0,
+            lemak_g REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;""",
+        *_trigger_ringkasan("asupan_makanan"),
+        *_trigger_ringkasan("aktivitas_fisik"),
+        *_trigger_ringkasan("asupan_air"),
+        *SQL_REBUILD_RINGKASAN,
+    ]),
+    ("Indeks teks penuh FTS5 untuk deskripsi makanan & catatan", [
+        *_fts("asupan_makanan"),
+        *_fts("catatan_harian"),
+    ]),
+    ("Katalog makanan (dataset bawaan + riwayat) untuk autocomplete", [
+        """
+        CREATE TABLE IF NOT EXISTS katalog_makanan (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama TEXT NOT NULL,
+            nama_kunci TEXT NOT NULL UNIQUE,
+            kalori REAL NOT NULL CHECK(kalori >= 0),
+            protein_g REAL,
+            karbo_g REAL,
+            lemak_g REAL,
+            sumber TEXT NOT NULL DEFAULT 'bawaan',
+            jumlah_pakai INTEGER NOT NULL DEFAULT 0,
+            versi INTEGER NOT NULL DEFAULT 0
+        );""",
+        "CREATE INDEX IF NOT EXISTS idx_katalog_makanan_versi ON katalog_makanan (versi)",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_asupan_makanan_katalog AFTER INSERT ON asupan_makanan
+        WHEN trim(NEW.deskripsi_makanan) <> '' BEGIN
+            INSERT INTO katalog_makanan (nama, nama_kunci, kalori, protein_g, karbo_g, lemak_g, sumber, jumlah_pakai, versi)
+            VALUES (trim(NEW.deskripsi_makanan), lower(trim(NEW.deskripsi_makanan)), NEW.kalori, NEW.protein_g, NEW.karbo_g, NEW.lemak_g,
+                    'riwayat', 1, {_VERSI_KATALOG_BARU})
+            ON CONFLICT(nama_kunci) DO UPDATE SET nama = excluded.nama, kalori = excluded.kalori, protein_g = excluded.protein_g,
+                karbo_g = excluded.karbo_g, lemak_g = excluded.lemak_g, sumber = 'riwayat', jumlah_pakai = jumlah_pakai + 1,
+                versi = excluded.versi;
+        END""",
+        """
+        INSERT INTO katalog_makanan (nama, nama_kunci, kalori, protein_g, karbo_g, lemak_g, sumber, jumlah_pakai, versi)
+        SELECT trim(a.deskripsi_makanan), r.kunci, a.kalori, a.protein_g, a.karbo_g, a.lemak_g, 'riwayat', r.jumlah, 1
+        FROM (SELECT lower(trim(deskripsi_makanan)) AS kunci, MAX(id) AS id_terakhir, COUNT(*) AS jumlah
+              FROM asupan_makanan GROUP BY kunci) AS r
+        JOIN asupan_makanan AS a ON a.id = r.id_terakhir
+        WHERE r.kunci <> ''""",
+        isi_katalog_dari_csv,
+    ]),
+]
+
+VERSI_TERBARU = len(MIGRASI)
+
+def skema_arsip(nama: str = "arsip") -> list[str]:
+    """DDL database arsip (tier dingin) yang di-ATTACH sebagai `nama`: tabel riwayat dengan kolom sama (id dipertahankan
+    dari tier panas), indeks (tanggal, id) dan arsip_info['batas'] = semua baris sebelum tanggal ini sudah diarsipkan."""
+    langkah = []
+    for sql in MIGRASI[0][1]:
+        sql = sql.replace("CREATE TABLE IF NOT EXISTS ", f"CREATE TABLE IF NOT EXISTS {nama}.").replace(" AUTOINCREMENT", "")
+        langkah.append(sql)
+    langkah += [sql.replace("CREATE INDEX IF NOT EXISTS ", f"CREATE INDEX IF NOT EXISTS {nama}.") for sql in MIGRASI[1][1] if sql != "ANALYZE"]
+    langkah.append(f"CREATE TABLE IF NOT EXISTS {nama}.arsip_info (kunci TEXT PRIMARY KEY, nilai TEXT NOT NULL)")
+    langkah += [sql for tabel in _KONTRIBUSI_RINGKASAN for sql in _trigger_ringkasan(tabel, nama)]
+
+    def fts_arsip(conn: sqlite3.Connection) -> None: # Dibuat (dan diisi ulang) hanya jika belum ada
+        for tabel in KOLOM_FTS:
+            if conn.execute(f"SELECT 1 FROM {nama}.sqlite_master WHERE name = ?", (f"{tabel}_fts",)).fetchone() is None:
+                for sql in _fts(tabel, nama):
+                    conn.execute(sql)
+    langkah.append(fts_arsip)
+    return langkah
+
+def versi_skema(conn: sqlite3.Connection) -> int:
+    """Membaca versi skema yang tersimpan di database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def jalankan_migrasi(conn: sqlite3.Connection) -> int:
+    """Menerapkan migrasi yang belum dijalankan satu per satu, masing-masing dalam transaksinya sendiri.
+    Mengembalikan versi skema akhir."""
+    versi = versi_skema(conn)
+    for nomor in range(versi + 1, VERSI_TERBARU + 1):
+        nama, langkah = MIGRASI[nomor - 1]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if versi_skema(conn) >= nomor: # Sudah dimigrasi proses lain selagi menunggu lock
+                conn.rollback()
+                continue
+            for sql in langkah:
+                if callable(sql):
+                    sql(conn)
+                else:
+                    conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {nomor}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        print(f" -> Migrasi {nomor} ({nama}) diterapkan.")
+    return versi_skema(conn)
@@ -1,14 +1,26 @@
 # model.py
 import datetime
+import warnings
+from typing import Iterator
+import numpy as np
+import pandas as pd
+
+class PeringatanData(UserWarning):
+    """Peringatan validasi data model. Jalur massal dapat membungkamnya dengan warnings.simplefilter('ignore', PeringatanData)."""
+
+def _peringatan(pesan: str) -> None:
+    warnings.warn(f"Peringatan: {pesan}", PeringatanData, stacklevel=3)
 
 class PengukuranTubuh:
+    __slots__ = ("id", "tanggal", "berat_kg", "tinggi_cm")
+
     def __init__(self, tanggal: datetime.date, berat_kg: float, tinggi_cm: float, id_pengukuran: int | None = None):
         self.id = id_pengukuran
         self.tanggal = tanggal
         self.berat_kg = float(berat_kg) if berat_kg > 0 else 0.0
         self.tinggi_cm = float(tinggi_cm) if tinggi_cm > 0 else 0.0
-        if self.berat_kg <= 0: print(f"Peringatan: Berat badan {berat_kg}' harus positif.")
-        if self.tinggi_cm <= 0: print(f"Peringatan: Tinggi badan {tinggi_cm}' harus positif.")
+        if self.berat_kg <= 0: _peringatan(f"Berat badan {berat_kg}' harus positif.")
+        if self.tinggi_cm <= 0: _peringatan(f"Tinggi badan {tinggi_cm}' harus positif.")
 
     def hitung_imt(self) -> float:
         if self.tinggi_cm > 0 and self.berat_kg > 0:
@@ -23,7 +35,18 @@ class PengukuranTubuh:
             "tinggi_cm": self.tinggi_cm
         }
 
+def hitung_imt_batch(berat_kg, tinggi_cm) -> np.ma.MaskedArray:
+    """Menghitung IMT untuk seluruh array sekaligus. Berat/tinggi yang nol, negatif, atau NaN dimask."""
+    berat = np.asarray(berat_kg, dtype=np.float64)
+    tinggi_meter = np.asarray(tinggi_cm, dtype=np.float64) / 100
+    tidak_valid = ~(np.isfinite(berat) & np.isfinite(tinggi_meter) & (berat > 0) & (tinggi_meter > 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        imt = berat / (tinggi_meter ** 2)
+    return np.ma.masked_array(imt, mask=tidak_valid)
+
 class AktivitasFisik:
+    __slots__ = ("id", "tanggal", "jenis_aktivitas", "durasi_menit", "kalori_terbakar_perkiraan", "catatan")
+
     def __init__(self, tanggal: datetime.date, jenis_aktivitas: str, durasi_menit: int, kalori_terbakar_perkiraan: float | None = None, catatan: str | None = None, id_aktivitas: int | None = None):
         self.id = id_aktivitas
         self.tanggal = tanggal
@@ -31,7 +54,7 @@ class AktivitasFisik:
         self.durasi_menit = int(durasi_menit) if durasi_menit > 0 else 0
         self.kalori_terbakar_perkiraan = float(kalori_terbakar_perkiraan) if kalori_terbakar_perkiraan is not None and kalori_terbakar_perkiraan >= 0 else None
         self.catatan = catatan
-        if self.durasi_menit <= 0: print(f"Peringatan: Durasi aktivitas {durasi_menit}' harus positif.")
+        if self.durasi_menit <= 0: _peringatan(f"Durasi aktivitas {durasi_menit}' harus positif.")
 
     def to_dict(self) -> dict:
         return {
@@ -43,6 +66,8 @@ class AktivitasFisik:
         }
 
 class AsupanMakanan:
+    __slots__ = ("id", "tanggal", "deskripsi_makanan", "kalori", "protein_g", "karbo_g", "lemak_g")
+
     def __init__(self, tanggal: datetime.date, deskripsi_makanan: str, kalori: float, protein_g: float | None = None, karbo_g: float | None = None, lemak_g: float | None = None, id_makanan: int | None = None):
         self.id = id_makanan
         self.tanggal = tanggal
@@ -51,7 +76,7 @@ class AsupanMakanan:
         self.protein_g = float(protein_g) if protein_g is not None and protein_g >= 0 else 0.0
         self.karbo_g = float(karbo_g) if karbo_g is not None and karbo_g >= 0 else 0.0
         self.lemak_g = float(lemak_g) if lemak_g is not None and lemak_g >= 0 else 0.0
-        if self.kalori < 0: print(f"Peringatan: Kalori {kalori}' tidak boleh negatif.")
+        if kalori < 0: _peringatan(f"Kalori {kalori}' tidak boleh negatif.")
 
     def to_dict(self) -> dict:
         return {
@@ -64,11 +89,13 @@ class AsupanMakanan:
         }
 
 class AsupanAir:
+    __slots__ = ("id", "tanggal", "jumlah_ml")
+
     def __init__(self, tanggal: datetime.date, jumlah_ml: int, id_air: int | None = None):
         self.id = id_air
         self.tanggal = tanggal
         self.jumlah_ml = int(jumlah_ml) if jumlah_ml > 0 else 0
-        if self.jumlah_ml <= 0: print(f"Peringatan: Jumlah air {jumlah_ml}' harus positif.")
+        if self.jumlah_ml <= 0: _peringatan(f"Jumlah air {jumlah_ml}' harus positif.")
 
     def to_dict(self) -> dict:
         return {
@@ -76,15 +103,21 @@ class AsupanAir:
             "jumlah_ml": self.jumlah_ml
         }
 
+def _skala_valid(nilai) -> bool:
+    """Skala catatan harian harus bernilai bulat (3 atau 3.0) dan berada di antara 1 dan 5."""
+    return nilai is not None and 1 <= nilai <= 5 and float(nilai).is_integer()
+
 class CatatanHarian:
+    __slots__ = ("id", "tanggal", "suasana_hati_skala", "tingkat_energi_skala", "catatan_tambahan")
+
     def __init__(self, tanggal: datetime.date, suasana_hati_skala: int | None = None, tingkat_energi_skala: int | None = None, catatan_tambahan: str | None = None, id_catatan: int | None = None):
         self.id = id_catatan
         self.tanggal = tanggal
-        self.suasana_hati_skala = int(suasana_hati_skala) if suasana_hati_skala is not None and 1 <= suasana_hati_skala <= 5 else None
-        self.tingkat_energi_skala = int(tingkat_energi_skala) if tingkat_energi_skala is not None and 1 <= tingkat_energi_skala <= 5 else None
+        self.suasana_hati_skala = int(suasana_hati_skala) if _skala_valid(suasana_hati_skala) else None
+        self.tingkat_energi_skala = int(tingkat_energi_skala) if _skala_valid(tingkat_energi_skala) else None
         self.catatan_tambahan = catatan_tambahan
-        if self.suasana_hati_skala is not None and not (1 <= self.suasana_hati_skala <= 5): print(f"Peringatan: Skala suasana hati {suasana_hati_skala}' harus antara 1 dan 5.")
-        if self.tingkat_energi_skala is not None and not (1 <= self.tingkat_energi_skala <= 5): print(f"Peringatan: Skala tingkat energi {tingkat_energi_skala}' harus antara 1 dan 5.")
+        if suasana_hati_skala is not None and not _skala_valid(suasana_hati_skala): _peringatan(f"Skala suasana hati {suasana_hati_skala}' harus bilangan bulat antara 1 dan 5.")
+        if tingkat_energi_skala is not None and not _skala_valid(tingkat_energi_skala): _peringatan(f"Skala tingkat energi {tingkat_energi_skala}' harus bilangan bulat antara 1 dan 5.")
 
     def to_dict(self) -> dict:
         return {
@@ -92,4 +125,168 @@ class CatatanHarian:
             "suasana_hati_skala": self.suasana_hati_skala,
             "tingkat_energi_skala": self.tingkat_energi_skala,
             "catatan_tambahan": self.catatan_tambahan
-        }
\ No newline at end of file
+        }
+
+class SnapshotHarian:
+    """Seluruh metrik dan tabel detail dashboard untuk satu tanggal, dibaca dalam satu transaksi."""
+    __slots__ = ("tanggal", "kalori_masuk", "kalori_keluar", "air_ml", "makro", "imt_terbaru", "df_makanan", "df_aktivitas", "df_catatan")
+
+    def __init__(self, tanggal: datetime.date, kalori_masuk: float, kalori_keluar: float, air_ml: float, makro: dict,
+                 imt_terbaru: tuple[float, datetime.date] | None, df_makanan: pd.DataFrame, df_aktivitas: pd.DataFrame, df_catatan: pd.DataFrame):
+        self.tanggal = tanggal
+        self.kalori_masuk = kalori_masuk
+        self.kalori_keluar = kalori_keluar
+        self.air_ml = air_ml
+        self.makro = makro
+        self.imt_terbaru = imt_terbaru
+        self.df_makanan = df_makanan
+        self.df_aktivitas = df_aktivitas
+        self.df_catatan = df_catatan
+
+    @property
+    def kalori_bersih(self) -> float:
+        return self.kalori_masuk - self.kalori_keluar
+
+# --- Batch Kolumnar ---
+class BatchRekaman:
+    """Kumpulan rekaman satu jenis yang disimpan per kolom (satu array NumPy per kolom), tanpa objek per baris.
+    Subkelas menentukan MODEL, KOLOM (nama kolom tabel -> dtype, urutan = urutan parameter INSERT) dan aturan validasi."""
+    __slots__ = ("id", "kolom")
+    MODEL: type = object
+    KOLOM: dict[str, str] = {}
+
+    def __init__(self, **kolom):
+        panjang = {len(nilai) for nilai in kolom.values()}
+        if len(panjang) > 1:
+            raise ValueError(f"Panjang kolom {type(self).__name__} tidak sama: {panjang}")
+        n = panjang.pop() if panjang else 0
+        self.kolom = {}
+        for nama, dtype in self.KOLOM.items():
+            nilai = kolom.get(nama)
+            if nilai is None:
+                nilai = np.full(n, np.nan if dtype == "float64" else None, dtype=object if dtype == "object" else dtype)
+            self.kolom[nama] = np.asarray(nilai, dtype=dtype)
+        self.id = np.zeros(n, dtype=np.int64) # 0 = belum tersimpan
+        self._normalisasi()
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __getitem__(self, nama: str) -> np.ndarray:
+        return self.kolom[nama]
+
+    def _normalisasi(self) -> None:
+        """Menyamakan aturan konstruktor model (nilai negatif -> 0/None) secara vektor."""
+
+    def valid(self) -> np.ndarray:
+        """Mask boolean baris yang lolos validasi yang sama dengan WellnessTracker._tambah."""
+        return ~np.isnat(self.kolom["tanggal"])
+
+    @classmethod
+    def dari_dataframe(cls, df: pd.DataFrame) -> "BatchRekaman":
+        kolom = {nama: df[nama].to_numpy() for nama in cls.KOLOM if nama in df.columns}
+        if "tanggal" in kolom:
+            kolom["tanggal"] = pd.to_datetime(df["tanggal"], errors="coerce").to_numpy(dtype="datetime64[D]")
+        batch = cls(**kolom)
+        if "id" in df.columns:
+            batch.id = df["id"].fillna(0).to_numpy(dtype=np.int64)
+        return batch
+
+    @classmethod
+    def dari_objek(cls, daftar: list) -> "BatchRekaman":
+        kolom = {nama: [getattr(objek, atribut) for objek in daftar] for nama, atribut in cls._ATRIBUT.items()}
+        kolom["tanggal"] = np.array([np.datetime64(objek.tanggal, "D") for objek in daftar], dtype="datetime64[D]")
+        return cls(**kolom)
+
+    def ke_dataframe(self) -> pd.DataFrame:
+        df = pd.DataFrame({"id": self.id, **self.kolom})
+        df["tanggal"] = df["tanggal"].astype("datetime64[s]")
+        return df
+
+    def saring(self, mask: np.ndarray) -> "BatchRekaman":
+        hasil = object.__new__(type(self))
+        hasil.kolom = {nama: nilai[mask] for nama, nilai in self.kolom.items()}
+        hasil.id = self.id[mask]
+        return hasil
+
+    def ke_params(self, ukuran_chunk: int = 10_000) -> Iterator[tuple[int, list[tuple]]]:
+        """Parameter executemany (urutan kolom = KOLOM) per chunk: (indeks awal, daftar tuple).
+        Tuple hanya dibuat untuk satu chunk sekaligus agar memori puncak tetap kecil."""
+        for mulai in range(0, len(self), ukuran_chunk):
+            akhir = mulai + ukuran_chunk
+            kolom = [np.datetime_as_string(nilai[mulai:akhir], unit="D").tolist() if nama == "tanggal" else nilai[mulai:akhir].tolist()
+                     for nama, nilai in self.kolom.items()]
+            yield mulai, list(zip(*kolom))
+
+def _positif_atau(nilai: np.ndarray, ganti) -> np.ndarray:
+    return np.where(np.nan_to_num(nilai, nan=-1) > 0, nilai, ganti)
+
+class BatchPengukuranTubuh(BatchRekaman):
+    __slots__ = ()
+    MODEL = PengukuranTubuh
+    KOLOM = {"tanggal": "datetime64[D]", "berat_kg": "float64", "tinggi_cm": "float64"}
+    _ATRIBUT = {"berat_kg": "berat_kg", "tinggi_cm": "tinggi_cm"}
+
+    def _normalisasi(self):
+        self.kolom["berat_kg"] = _positif_atau(self.kolom["berat_kg"], 0.0)
+        self.kolom["tinggi_cm"] = _positif_atau(self.kolom["tinggi_cm"], 0.0)
+
+    def valid(self):
+        return super().valid() & (self.kolom["berat_kg"] > 0) & (self.kolom["tinggi_cm"] > 0)
+
+    def hitung_imt(self) -> np.ma.MaskedArray:
+        return hitung_imt_batch(self.kolom["berat_kg"], self.kolom["tinggi_cm"])
+
+class BatchAktivitasFisik(BatchRekaman):
+    __slots__ = ()
+    MODEL = AktivitasFisik
+    KOLOM = {"tanggal": "datetime64[D]", "jenis_aktivitas": "object", "durasi_menit": "float64", "kalori_terbakar": "float64"}
+    _ATRIBUT = {"jenis_aktivitas": "jenis_aktivitas", "durasi_menit": "durasi_menit", "kalori_terbakar": "kalori_terbakar_perkiraan"}
+
+    def _normalisasi(self):
+        jenis = self.kolom["jenis_aktivitas"]
+        self.kolom["jenis_aktivitas"] = np.where(pd.isna(jenis) | (jenis == ""), "Lainnya", jenis).astype(object)
+        self.kolom["durasi_menit"] = np.floor(_positif_atau(self.kolom["durasi_menit"], 0.0))
+        kalori = self.kolom["kalori_terbakar"].astype(np.float64)
+        self.kolom["kalori_terbakar"] = np.where(kalori >= 0, kalori, np.nan)
+
+    def valid(self):
+        return super().valid() & (self.kolom["durasi_menit"] > 0)
+
+class BatchAsupanMakanan(BatchRekaman):
+    __slots__ = ()
+    MODEL = AsupanMakanan
+    KOLOM = {"tanggal": "datetime64[D]", "deskripsi_makanan": "object", "kalori": "float64", "protein_g": "float64", "karbo_g": "float64", "lemak_g": "float64"}
+    _ATRIBUT = {"deskripsi_makanan": "deskripsi_makanan", "kalori": "kalori", "protein_g": "protein_g", "karbo_g": "karbo_g", "lemak_g": "lemak_g"}
+
+    def _normalisasi(self):
+        for nama in ("kalori", "protein_g", "karbo_g", "lemak_g"): # Seperti AsupanMakanan: negatif/kosong -> 0
+            nilai = self.kolom[nama]
+            self.kolom[nama] = np.where(nilai >= 0, nilai, 0.0)
+
+    def valid(self):
+        deskripsi = self.kolom["deskripsi_makanan"]
+        return super().valid() & ~pd.isna(deskripsi) & (deskripsi != "")
+
+class BatchAsupanAir(BatchRekaman):
+    __slots__ = ()
+    MODEL = AsupanAir
+    KOLOM = {"tanggal": "datetime64[D]", "jumlah_ml": "float64"}
+    _ATRIBUT = {"jumlah_ml": "jumlah_ml"}
+
+    def _normalisasi(self):
+        self.kolom["jumlah_ml"] = np.floor(_positif_atau(self.kolom["jumlah_ml"], 0.0))
+
+    def valid(self):
+        return super().valid() & (self.kolom["jumlah_ml"] > 0)
+
+class BatchCatatanHarian(BatchRekaman):
+    __slots__ = ()
+    MODEL = CatatanHarian
+    KOLOM = {"tanggal": "datetime64[D]", "suasana_hati_skala": "float64", "tingkat_energi_skala": "float64", "catatan_tambahan": "object"}
+    _ATRIBUT = {"suasana_hati_skala": "suasana_hati_skala", "tingkat_energi_skala": "tingkat_energi_skala", "catatan_tambahan": "catatan_tambahan"}
+
+    def _normalisasi(self):
+        for nama in ("suasana_hati_skala", "tingkat_energi_skala"):
+            nilai = self.kolom[nama] # Sama dengan CatatanHarian: bulat dan 1-5, selain itu null (diperiksa sebelum dibulatkan)
+            self.kolom[nama] = np.where((nilai >= 1) & (nilai <= 5) & (nilai == np.floor(nilai)), nilai, np.nan)
@@ -0,0 +1,78 @@
+# presentasi.py
+# Lapisan tampilan: mengubah DataFrame bertipe dari WellnessTracker.get_data_* menjadi teks siap tampil.
+# Analitik sebaiknya memakai data bertipe langsung; format hanya diterapkan pada baris yang benar-benar ditampilkan.
+import pandas as pd
+
+def _tanggal(df: pd.DataFrame) -> pd.Series:
+    return df['tanggal'].dt.strftime('%d-%m-%Y')
+
+def format_pengukuran(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': df['id'],
+        'Tanggal': _tanggal(df),
+        'Berat (kg)': df['berat_kg'].map('{:.1f}'.format),
+        'Tinggi (cm)': df['tinggi_cm'].map('{:.0f}'.format),
+        'IMT': df['imt'].fillna(0.0).map('{:.2f}'.format),
+    })
+
+def format_aktivitas(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': df['id'],
+        'Tanggal': _tanggal(df),
+        'Jenis Aktivitas': df['jenis_aktivitas'].astype(str),
+        'Durasi (menit)': df['durasi_menit'],
+        'Kalori Terbakar': df['kalori_terbakar'].fillna(0).map('{:.0f}'.format),
+    })
+
+def format_makanan(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': df['id'],
+        'Tanggal': _tanggal(df),
+        'Deskripsi Makanan': df['deskripsi_makanan'],
+        'Kalori': df['kalori'].map('{:.0f}'.format),
+        'Protein (g)': df['protein_g'].fillna(0).map('{:.1f}'.format),
+        'Karbo (g)': df['karbo_g'].fillna(0).map('{:.1f}'.format),
+        'Lemak (g)': df['lemak_g'].fillna(0).map('{:.1f}'.format),
+    })
+
+def format_air(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': df['id'],
+        'Tanggal': _tanggal(df),
+        'Jumlah (ml)': df['jumlah_ml'],
+    })
+
+def format_catatan(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': df['id'],
+        'Tanggal': _tanggal(df),
+        'Suasana Hati (1-5)': df['suasana_hati_skala'].astype(object).where(df['suasana_hati_skala'].notna(), 'N/A').astype(str),
+        'Tingkat Energi (1-5)': df['tingkat_energi_skala'].astype(object).where(df['tingkat_energi_skala'].notna(), 'N/A').astype(str),
+        'Catatan Tambahan': df['catatan_tambahan'],
+    })
+
+FORMAT_RIWAYAT = {
+    "pengukuran_tubuh": format_pengukuran,
+    "aktivitas_fisik": format_aktivitas,
+    "asupan_makanan": format_makanan,
+    "asupan_air": format_air,
+    "catatan_harian": format_catatan,
+}
+
+class TabelLazy:
+    """Membungkus DataFrame bertipe; format tampilan baru dihitung untuk potongan baris yang diminta."""
+
+    def __init__(self, df_mentah: pd.DataFrame, formatter):
+        self.df_mentah = df_mentah
+        self.formatter = formatter
+
+    def __len__(self) -> int:
+        return len(self.df_mentah)
+
+    @property
+    def empty(self) -> bool:
+        return self.df_mentah.empty
+
+    def halaman(self, mulai: int = 0, jumlah: int | None = None) -> pd.DataFrame:
+        akhir = None if jumlah is None else mulai + jumlah
+        return self.formatter(self.df_mentah.iloc[mulai:akhir]).reset_index(drop=True)
@@ -0,0 +1,38 @@
+# setup_db_wellness.py
+# Menjalankan migrasi skema secara manual, misalnya sebelum deploy:
+#   python setup_db_wellness.py [--cek-ringkasan] [--rebuild-ringkasan] [--arsipkan [HARI]]
+import argparse
+import database
+import migrasi
+from konfigurasi import ARSIP_HORIZON_HARI
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Setup/migrasi database Wellness Tracker.")
+    parser.add_argument("--cek-ringkasan", action="store_true", help="Bandingkan ringkasan_harian dengan tabel mentah")
+    parser.add_argument("--rebuild-ringkasan", action="store_true", help="Hitung ulang ringkasan_harian dari tabel mentah")
+    parser.add_argument("--arsipkan", type=int, nargs="?", const=ARSIP_HORIZON_HARI, default=None, metavar="HARI",
+                        help=f"Pindahkan data lebih tua dari HARI hari (default {ARSIP_HORIZON_HARI}) ke database arsip")
+    args = parser.parse_args()
+
+    if not database.setup_database_initial():
+        print("Setup database GAGAL.")
+        raise SystemExit(1)
+    with database.koneksi() as conn:
+        print(f"Database siap pada versi skema {migrasi.versi_skema(conn)} (terbaru: {migrasi.VERSI_TERBARU}).")
+
+    if args.cek_ringkasan or args.rebuild_ringkasan or args.arsipkan is not None:
+        from manajer_wellness import WellnessTracker
+        tracker = WellnessTracker()
+        if args.cek_ringkasan:
+            selisih = tracker.cek_konsistensi_ringkasan()
+            print("ringkasan_harian konsisten." if selisih.empty else f"{len(selisih)} hari tidak konsisten:\n{selisih}")
+        if args.rebuild_ringkasan:
+            print("ringkasan_harian dihitung ulang." if tracker.rebuild_ringkasan_harian() else "Rebuild ringkasan_harian GAGAL.")
+        if args.arsipkan is not None:
+            hasil = tracker.arsipkan(args.arsipkan)
+            if hasil:
+                print(f"Diarsipkan (sebelum {hasil['batas']}): {hasil['dipindah']}")
+                if "ruang" in hasil:
+                    print(f"Ruang: {hasil['ruang']}")
+            else:
+                print("Arsipkan GAGAL.")
@@ -4,6 +4,8 @@ import datetime
 import pandas as pd
 import locale
 import calendar # For week number in trends
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Set locale for currency formatting
 try:
@@ -24,7 +26,11 @@ def format_rp(angka):
 try:
     from model import PengukuranTubuh, AktivitasFisik, AsupanMakanan, AsupanAir, CatatanHarian
     from manajer_wellness import WellnessTracker
-    from konfigurasi import KATEGORI_AKTIVITAS, SKALA_SUASANA_ENERGI
+    from database import PoolPenuh
+    import presentasi
+    import instrumentasi
+    from konfigurasi import KATEGORI_AKTIVITAS, SKALA_SUASANA_ENERGI, RIWAYAT_UKURAN_HALAMAN, RIWAYAT_MAKS_PARALEL, TREN_MAKS_TITIK, CARI_BATAS_HASIL
+    from konfigurasi import DB_MULTI_PENGGUNA, DB_ROUTER_MAKS_POOL, STREAMLIT_TTL_TRACKER_DETIK
 except ImportError as e:
     st.error(f"Gagal mengimpor modul: {e}. Pastikan file .py lain ada di direktori yang sama.")
     st.stop()
@@ -32,12 +38,41 @@ except ImportError as e:
 st.set_page_config(page_title="Personal Wellness Tracker", layout="wide", initial_sidebar_state="expanded")
 
 # Initialize Wellness Manager (Use Cache)
-@st.cache_resource
-def get_wellness_manager():
+# Satu tracker per pengguna, dibatasi seperti pool router agar cache baca (per tracker) tidak tumbuh tanpa batas
+@st.cache_resource(max_entries=DB_ROUTER_MAKS_POOL, ttl=STREAMLIT_TTL_TRACKER_DETIK)
+def get_wellness_manager(pengguna: str | None = None):
     print(">>> STREAMLIT: (Cache Resource) Menginisialisasi WellnessTracker...")
-    return WellnessTracker() # Ini akan memicu cek DB/Tabel di init
+    return WellnessTracker(pengguna=pengguna) # Ini akan memicu cek DB/Tabel di init
+
+def get_pengguna_login() -> str | None:
+    """Identitas pengguna dari sesi login (st.user), bukan dari URL yang bisa diubah siapa saja.
+    None dalam mode satu pengguna; halaman berhenti di tombol masuk jika belum login."""
+    if not DB_MULTI_PENGGUNA:
+        return None
+    if not st.user.get("is_logged_in", False):
+        st.title("🩺 Personal Wellness Tracker")
+        st.info("Silakan masuk untuk membuka data kesehatan Anda.")
+        st.button("Masuk", on_click=st.login)
+        st.stop()
+    return st.user.get("sub") or st.user.get("email") # sub: id stabil dari penyedia identitas
+
+# Multi-pengguna: pengguna yang login memakai database (shard) miliknya sendiri
+wellness_manager = get_wellness_manager(get_pengguna_login())
+
+@st.cache_resource
+def get_executor_baca():
+    # Thread pool bersama untuk memuat query halaman secara paralel; setiap thread meminjam koneksinya sendiri dari pool
+    return ThreadPoolExecutor(max_workers=RIWAYAT_MAKS_PARALEL, thread_name_prefix="wellness-baca")
 
-wellness_manager = get_wellness_manager()
+def muat_paralel(daftar_tugas: dict) -> dict:
+    """Mengirim setiap fungsi baca ke thread pool; mengembalikan {kunci: future}."""
+    executor = get_executor_baca()
+    return {executor.submit(fungsi): kunci for kunci, fungsi in daftar_tugas.items()}
+
+def reset_pilihan_katalog():
+    # Awalan katalog berubah: saran lama tidak berlaku, pilihan dibuang (satu key tetap, tidak menumpuk per awalan)
+    for kunci in ("katalog_pilihan", "katalog_terisi"):
+        st.session_state.pop(kunci, None)
 
 # --- Fungsi Halaman/UI ---
 
@@ -49,17 +84,18 @@ def halaman_dashboard():
 
     col1, col2, col3, col4 = st.columns(4)
 
+    # Semua data dashboard dibaca sekaligus dalam satu transaksi
+    snapshot = wellness_manager.get_snapshot_harian(today)
+
     # Kalori
-    total_kalori_makanan, total_kalori_terbakar = wellness_manager.hitung_total_kalori_harian(today)
-    col1.metric(label="Kalori Masuk (makanan)", value=f"{total_kalori_makanan:,.0f} Kkal")
-    col2.metric(label="Kalori Keluar (aktivitas)", value=f"{total_kalori_terbakar:,.0f} Kkal")
+    col1.metric(label="Kalori Masuk (makanan)", value=f"{snapshot.kalori_masuk:,.0f} Kkal")
+    col2.metric(label="Kalori Keluar (aktivitas)", value=f"{snapshot.kalori_keluar:,.0f} Kkal")
 
     # Air
-    total_air = wellness_manager.hitung_total_air_harian(today)
-    col3.metric(label="Asupan Air", value=f"{total_air:,.0f} ml")
+    col3.metric(label="Asupan Air", value=f"{snapshot.air_ml:,.0f} ml")
 
     # IMT
-    latest_imt_data = wellness_manager.get_latest_imt()
+    latest_imt_data = snapshot.imt_terbaru
     if latest_imt_data and latest_imt_data[1] == today:
         imt_val, imt_date = latest_imt_data
         col4.metric(label="IMT Terbaru", value=f"{imt_val:.2f}")
@@ -71,7 +107,7 @@ def halaman_dashboard():
 
     # Makanan Hari Ini
     st.write("#### Asupan Makanan Hari Ini")
-    df_makanan_hari_ini = wellness_manager.get_riwayat_makanan(today)
+    df_makanan_hari_ini = snapshot.df_makanan
     if not df_makanan_hari_ini.empty:
         st.dataframe(df_makanan_hari_ini.drop(columns=['id', 'Tanggal']), use_container_width=True, hide_index=True)
     else:
@@ -79,7 +115,7 @@ def halaman_dashboard():
 
     # Aktivitas Hari Ini
     st.write("#### Aktivitas Fisik Hari Ini")
-    df_aktivitas_hari_ini = wellness_manager.get_riwayat_aktivitas(today)
+    df_aktivitas_hari_ini = snapshot.df_aktivitas
     if not df_aktivitas_hari_ini.empty:
         st.dataframe(df_aktivitas_hari_ini.drop(columns=['id', 'Tanggal']), use_container_width=True, hide_index=True)
     else:
@@ -87,7 +123,7 @@ def halaman_dashboard():
 
     # Catatan Harian Hari Ini
     st.write("#### Catatan Harian Hari Ini")
-    df_catatan_hari_ini = wellness_manager.get_riwayat_catatan(today)
+    df_catatan_hari_ini = snapshot.df_catatan
     if not df_catatan_hari_ini.empty:
         st.dataframe(df_catatan_hari_ini.drop(columns=['id', 'Tanggal']), use_container_width=True, hide_index=True)
     else:
@@ -115,7 +151,6 @@ def halaman_input_data_baru():
                         pengukuran_baru = PengukuranTubuh(tgl_ukur, berat_kg, tinggi_cm)
                         if wellness_manager.tambah_pengukuran(pengukuran_baru):
                             st.success("Pengukuran tubuh berhasil disimpan!", icon="✅")
-                            st.cache_data.clear()
                             st.rerun()
                         else:
                             st.error("Gagal menyimpan pengukuran tubuh.", icon="❌")
@@ -136,21 +171,39 @@ def halaman_input_data_baru():
                         aktivitas_baru = AktivitasFisik(tgl_aktivitas, jenis_aktivitas, durasi_menit, kalori_terbakar if kalori_terbakar > 0 else None)
                         if wellness_manager.tambah_aktivitas(aktivitas_baru):
                             st.success("Aktivitas fisik berhasil disimpan!", icon="✅")
-                            st.cache_data.clear()
                             st.rerun()
                         else:
                             st.error("Gagal menyimpan aktivitas fisik.", icon="❌")
 
     with tab3:
         st.subheader("Tambah Asupan Makanan")
+        # Autocomplete dari katalog makanan: memilih saran mengisi deskripsi & nilai gizi pada form di bawah
+        awalan = st.text_input("Cari di katalog makanan:", key="katalog_awalan", placeholder="Ketik awal nama makanan, lalu Enter",
+                               on_change=reset_pilihan_katalog)
+        saran = {item["id"]: item for item in wellness_manager.cari_katalog(awalan)} if awalan.strip() else {}
+        if awalan.strip() and not saran:
+            st.caption("Tidak ada makanan di katalog yang cocok.")
+        elif saran:
+            pilihan = st.selectbox("Saran:", options=list(saran), index=None, key="katalog_pilihan",
+                                   format_func=lambda i: f"{saran[i]['nama']} ({saran[i]['kalori']:.0f} kkal)"
+                                                         + (" · riwayat" if saran[i]["sumber"] == "riwayat" else ""),
+                                   placeholder="Pilih untuk mengisi form")
+            if pilihan is not None and st.session_state.get("katalog_terisi") != pilihan:
+                item = saran[pilihan]
+                st.session_state["makan_deskripsi"] = item["nama"]
+                st.session_state["makan_kalori"] = float(item["kalori"] or 0.0)
+                st.session_state["makan_protein"] = float(item["protein_g"] or 0.0)
+                st.session_state["makan_karbo"] = float(item["karbo_g"] or 0.0)
+                st.session_state["makan_lemak"] = float(item["lemak_g"] or 0.0)
+                st.session_state["katalog_terisi"] = pilihan
         with st.form("form_asupan_makanan", clear_on_submit=True):
             tgl_makan = st.date_input("Tanggal Asupan*", value=datetime.date.today())
-            deskripsi_makanan = st.text_input("Deskripsi Makanan*:", placeholder="Contoh: Nasi Goreng, Dada Ayam")
-            kalori_makan = st.number_input("Kalori (Kkal)*:", min_value=0.0, step=10.0, format="%.0f")
+            deskripsi_makanan = st.text_input("Deskripsi Makanan*:", placeholder="Contoh: Nasi Goreng, Dada Ayam", key="makan_deskripsi")
+            kalori_makan = st.number_input("Kalori (Kkal)*:", min_value=0.0, step=10.0, format="%.0f", key="makan_kalori")
             col_p, col_k, col_l = st.columns(3)
-            protein_g = col_p.number_input("Protein (g):", min_value=0.0, step=0.1, format="%.1f")
-            karbo_g = col_k.number_input("Karbohidrat (g):", min_value=0.0, step=0.1, format="%.1f")
-            lemak_g = col_l.number_input("Lemak (g):", min_value=0.0, step=0.1, format="%.1f")
+            protein_g = col_p.number_input("Protein (g):", min_value=0.0, step=0.1, format="%.1f", key="makan_protein")
+            karbo_g = col_k.number_input("Karbohidrat (g):", min_value=0.0, step=0.1, format="%.1f", key="makan_karbo")
+            lemak_g = col_l.number_input("Lemak (g):", min_value=0.0, step=0.1, format="%.1f", key="makan_lemak")
             submitted_makanan = st.form_submit_button("Simpan Asupan Makanan")
             if submitted_makanan:
                 if not deskripsi_makanan or kalori_makan < 0:
@@ -160,7 +213,9 @@ def halaman_input_data_baru():
                         makanan_baru = AsupanMakanan(tgl_makan, deskripsi_makanan, kalori_makan, protein_g, karbo_g, lemak_g)
                         if wellness_manager.tambah_makanan(makanan_baru):
                             st.success("Asupan makanan berhasil disimpan!", icon="✅")
-                            st.cache_data.clear()
+                            for kunci in ("katalog_awalan", "katalog_pilihan", "katalog_terisi", "makan_deskripsi", "makan_kalori", "makan_protein",
+                                          "makan_karbo", "makan_lemak"):
+                                st.session_state.pop(kunci, None) # Kosongkan pencarian & isian katalog untuk entri berikutnya
                             st.rerun()
                         else:
                             st.error("Gagal menyimpan asupan makanan.", icon="❌")
@@ -179,7 +234,6 @@ def halaman_input_data_baru():
                         air_baru = AsupanAir(tgl_air, jumlah_ml)
                         if wellness_manager.tambah_air(air_baru):
                             st.success("Asupan air berhasil disimpan!", icon="✅")
-                            st.cache_data.clear()
                             st.rerun()
                         else:
                             st.error("Gagal menyimpan asupan air.", icon="❌")
@@ -201,7 +255,6 @@ def halaman_input_data_baru():
                         catatan_baru = CatatanHarian(tgl_catatan, suasana_hati, tingkat_energi, catatan_tambahan)
                         if wellness_manager.tambah_catatan(catatan_baru):
                             st.success("Catatan harian berhasil disimpan!", icon="✅")
-                            st.cache_data.clear()
                             st.rerun()
                         else:
                             st.error("Gagal menyimpan catatan harian.", icon="❌")
@@ -242,11 +295,51 @@ def halaman_riwayat_analisis():
         "Pengukuran Tubuh", "Aktivitas Fisik", "Asupan Makanan", "Asupan Air", "Catatan Harian"
     ])
 
-    def display_and_delete(df: pd.DataFrame, delete_func, data_type: str):
-        if df.empty:
+    # (tab, judul, fungsi data bertipe, nama tabel, fungsi hapus, jenis data)
+    daftar_riwayat = [
+        (tab_riwayat1, "Riwayat Pengukuran Tubuh", wellness_manager.get_data_pengukuran, "pengukuran_tubuh", wellness_manager.hapus_pengukuran, "Pengukuran Tubuh"),
+        (tab_riwayat2, "Riwayat Aktivitas Fisik", wellness_manager.get_data_aktivitas, "aktivitas_fisik", wellness_manager.hapus_aktivitas, "Aktivitas Fisik"),
+        (tab_riwayat3, "Riwayat Asupan Makanan", wellness_manager.get_data_makanan, "asupan_makanan", wellness_manager.hapus_makanan, "Asupan Makanan"),
+        (tab_riwayat4, "Riwayat Asupan Air", wellness_manager.get_data_air, "asupan_air", wellness_manager.hapus_air, "Asupan Air"),
+        (tab_riwayat5, "Riwayat Catatan Harian", wellness_manager.get_data_catatan, "catatan_harian", wellness_manager.hapus_catatan, "Catatan Harian"),
+    ]
+
+    def kursor_riwayat(data_type: str) -> list:
+        # Keyset pagination: simpan tumpukan kursor (tanggal, id) per jenis data; reset saat filter berubah
+        kunci_kursor = f"kursor_{data_type}"
+        if st.session_state.get(f"filter_{data_type}") != (start_date, end_date):
+            st.session_state[kunci_kursor] = [None]
+            st.session_state[f"filter_{data_type}"] = (start_date, end_date)
+        return st.session_state[kunci_kursor]
+
+    def muat_riwayat(muat_data, tabel: str, after):
+        # Dijalankan di thread pool: tanpa pemanggilan st.*; satu koneksi baca untuk halaman + jumlah entri
+        with wellness_manager.db.koneksi():
+            df_mentah = muat_data(start=start_date, end=end_date, after=after, limit=RIWAYAT_UKURAN_HALAMAN)
+            total = wellness_manager.get_jumlah_entri_per_kategori(tabel, start=start_date, end=end_date) if not df_mentah.empty else 0
+        return df_mentah, total
+
+    def display_and_delete(hasil, muat_data, tabel: str, delete_func, data_type: str):
+        kursor = kursor_riwayat(data_type)
+        df_mentah, total = hasil
+        if df_mentah.empty and len(kursor) > 1: # Halaman ini kosong (mis. setelah hapus), kembali ke halaman pertama
+            del kursor[1:]
+            df_mentah, total = muat_riwayat(muat_data, tabel, None)
+        if df_mentah.empty:
             st.info(f"Belum ada data {data_type} untuk periode ini.")
         else:
-            st.dataframe(df, use_container_width=True, hide_index=True)
+            jumlah_halaman = max(1, math.ceil(total / RIWAYAT_UKURAN_HALAMAN))
+            # Format teks hanya untuk baris halaman ini; data bertipe tetap dipakai untuk kursor
+            st.dataframe(presentasi.TabelLazy(df_mentah, presentasi.FORMAT_RIWAYAT[tabel]).halaman(), use_container_width=True, hide_index=True)
+            col_prev, col_info, col_next = st.columns([0.2, 0.6, 0.2])
+            col_info.caption(f"Halaman {len(kursor)} dari {jumlah_halaman} · {total} entri")
+            if col_prev.button("⬅️ Sebelumnya", key=f"prev_{data_type}", disabled=len(kursor) == 1):
+                kursor.pop()
+                st.rerun()
+            if col_next.button("Berikutnya ➡️", key=f"next_{data_type}", disabled=len(kursor) >= jumlah_halaman):
+                baris_terakhir = df_mentah.iloc[-1]
+                kursor.append((baris_terakhir['tanggal'].date(), int(baris_terakhir['id'])))
+                st.rerun()
             st.write(f"Hapus {data_type}:")
             col_id, col_btn = st.columns([0.7, 0.3])
             id_to_delete = col_id.number_input(f"Masukkan ID {data_type} yang akan dihapus:", min_value=1, value=1, key=f"delete_{data_type}_id")
@@ -255,7 +348,6 @@ def halaman_riwayat_analisis():
                     with st.spinner("Menghapus..."):
                         if delete_func(id_to_delete):
                             st.success(f"Data {data_type} (ID: {id_to_delete}) berhasil dihapus!", icon="✅")
-                            st.cache_data.clear()
                             st.session_state[f'confirm_delete_{data_type}_{id_to_delete}'] = False # Reset confirmation
                             st.rerun()
                         else:
@@ -264,65 +356,51 @@ def halaman_riwayat_analisis():
                     st.session_state[f'confirm_delete_{data_type}_{id_to_delete}'] = True
                     st.warning(f"Apakah Anda yakin ingin menghapus data {data_type} dengan ID: {id_to_delete}? Klik 'Hapus {data_type} Terpilih' lagi untuk konfirmasi.", icon="⚠️")
 
-
-    with tab_riwayat1:
-        st.subheader("Riwayat Pengukuran Tubuh")
-        with st.spinner("Memuat riwayat pengukuran..."):
-            df_ukur = wellness_manager.get_riwayat_pengukuran(start_date if start_date == end_date else None) if periode_filter_option != "Semua Waktu" else wellness_manager.get_riwayat_pengukuran()
-            display_and_delete(df_ukur, wellness_manager.hapus_pengukuran, "Pengukuran Tubuh")
-
-    with tab_riwayat2:
-        st.subheader("Riwayat Aktivitas Fisik")
-        with st.spinner("Memuat riwayat aktivitas..."):
-            df_aktivitas = wellness_manager.get_riwayat_aktivitas(start_date if start_date == end_date else None) if periode_filter_option != "Semua Waktu" else wellness_manager.get_riwayat_aktivitas()
-            display_and_delete(df_aktivitas, wellness_manager.hapus_aktivitas, "Aktivitas Fisik")
-
-    with tab_riwayat3:
-        st.subheader("Riwayat Asupan Makanan")
-        with st.spinner("Memuat riwayat makanan..."):
-            df_makanan = wellness_manager.get_riwayat_makanan(start_date if start_date == end_date else None) if periode_filter_option != "Semua Waktu" else wellness_manager.get_riwayat_makanan()
-            display_and_delete(df_makanan, wellness_manager.hapus_makanan, "Asupan Makanan")
-
-    with tab_riwayat4:
-        st.subheader("Riwayat Asupan Air")
-        with st.spinner("Memuat riwayat air..."):
-            df_air = wellness_manager.get_riwayat_air(start_date if start_date == end_date else None) if periode_filter_option != "Semua Waktu" else wellness_manager.get_riwayat_air()
-            display_and_delete(df_air, wellness_manager.hapus_air, "Asupan Air")
-
-    with tab_riwayat5:
-        st.subheader("Riwayat Catatan Harian")
-        with st.spinner("Memuat riwayat catatan..."):
-            df_catatan = wellness_manager.get_riwayat_catatan(start_date if start_date == end_date else None) if periode_filter_option != "Semua Waktu" else wellness_manager.get_riwayat_catatan()
-            display_and_delete(df_catatan, wellness_manager.hapus_catatan, "Catatan Harian")
-
     st.divider()
 
     # --- Analisis Data ---
     st.subheader("Analisis Tren dan Ringkasan")
 
-    tab_analisis1, tab_analisis2 = st.tabs(["Tren Berat Badan & IMT", "Kalori & Makro Nutrisi"])
+    tab_analisis1, tab_analisis2, tab_analisis3 = st.tabs(["Tren Berat Badan & IMT", "Kalori & Makro Nutrisi", "Cari Makanan & Catatan"])
 
     with tab_analisis1:
         st.write("#### Tren Berat Badan")
         periode_tren = st.selectbox("Periode Tren Berat Badan:", ["harian", "mingguan", "bulanan"])
-        with st.spinner("Memuat data tren berat badan..."):
-            df_tren_berat = wellness_manager.get_data_tren_berat_badan(periode_tren)
-            if not df_tren_berat.empty:
-                st.line_chart(df_tren_berat.set_index('periode'))
-            else:
-                st.info("Belum ada data pengukuran tubuh untuk menampilkan tren.")
-
+        wadah_tren_berat = st.container()
         st.write("#### Tren IMT (Indeks Massa Tubuh)")
-        with st.spinner("Memuat data tren IMT..."):
-            df_imt = wellness_manager.get_riwayat_pengukuran() # Get all for IMT trend
-            if not df_imt.empty:
-                df_imt['Tanggal'] = pd.to_datetime(df_imt['Tanggal'])
-                df_imt = df_imt.sort_values(by='Tanggal')
-                df_imt['IMT'] = pd.to_numeric(df_imt['IMT'])
-                st.line_chart(df_imt.set_index('Tanggal')['IMT'])
-            else:
-                st.info("Belum ada data pengukuran tubuh untuk menampilkan tren IMT.")
-
+        wadah_tren_imt = st.container()
+
+    # Semua query riwayat & tren dikirim sekaligus; tiap bagian digambar begitu hasilnya tersedia
+    daftar_tugas = {
+        data_type: (lambda muat_data=muat_data, tabel=tabel, after=kursor_riwayat(data_type)[-1]: muat_riwayat(muat_data, tabel, after))
+        for _, _, muat_data, tabel, _, data_type in daftar_riwayat
+    }
+    daftar_tugas["tren_berat"] = lambda: wellness_manager.get_data_tren_berat_badan(periode_tren, maks_titik=TREN_MAKS_TITIK)
+    daftar_tugas["tren_imt"] = lambda: wellness_manager.get_data_tren_imt(maks_titik=TREN_MAKS_TITIK)
+    spek_riwayat = {riwayat[5]: riwayat for riwayat in daftar_riwayat}
+
+    with st.spinner("Memuat riwayat & tren..."):
+        for future in as_completed(futures := muat_paralel(daftar_tugas)):
+            kunci = futures[future]
+            if kunci in spek_riwayat:
+                tab, judul, muat_data, tabel, delete_func, data_type = spek_riwayat[kunci]
+                with tab:
+                    st.subheader(judul)
+                    display_and_delete(future.result(), muat_data, tabel, delete_func, data_type)
+            elif kunci == "tren_berat":
+                df_tren_berat = future.result()
+                with wadah_tren_berat:
+                    if not df_tren_berat.empty:
+                        st.line_chart(df_tren_berat.set_index('periode'))
+                    else:
+                        st.info("Belum ada data pengukuran tubuh untuk menampilkan tren.")
+            elif kunci == "tren_imt":
+                df_imt = future.result()
+                with wadah_tren_imt:
+                    if not df_imt.empty:
+                        st.line_chart(df_imt.set_index('Tanggal')['IMT'])
+                    else:
+                        st.info("Belum ada data pengukuran tubuh untuk menampilkan tren IMT.")
 
     with tab_analisis2:
         st.write("#### Total Kalori Makanan vs. Kalori Terbakar")
@@ -332,16 +410,7 @@ def halaman_riwayat_analisis():
         if kalori_start_date > kalori_end_date:
             st.warning("Tanggal mulai tidak boleh lebih dari tanggal akhir.", icon="⚠️")
         else:
-            dates = [kalori_start_date + datetime.timedelta(days=x) for x in range((kalori_end_date - kalori_start_date).days + 1)]
-            data_kalori = []
-            for dt in dates:
-                total_makan, total_terbakar = wellness_manager.hitung_total_kalori_harian(dt)
-                data_kalori.append({
-                    'Tanggal': dt.strftime('%Y-%m-%d'),
-                    'Kalori Masuk': total_makan,
-                    'Kalori Keluar': total_terbakar
-                })
-            df_kalori = pd.DataFrame(data_kalori).set_index('Tanggal')
+            df_kalori = wellness_manager.get_seri_kalori(kalori_start_date, kalori_end_date).set_index('Tanggal')
             if not df_kalori.empty:
                 st.bar_chart(df_kalori)
             else:
@@ -370,22 +439,77 @@ def halaman_riwayat_analisis():
             else:
                 st.info("Tidak ada data kalori terbakar per jenis aktivitas untuk rentang tanggal ini.")
 
+    with tab_analisis3:
+        st.write("#### Cari di Deskripsi Makanan & Catatan Harian")
+        st.caption("Mengikuti filter periode di atas. Kata boleh diketik sebagian, mis. 'nasi gor' atau 'sakit kep'.")
+        col_cari1, col_cari2 = st.columns([3, 1])
+        kata_cari = col_cari1.text_input("Kata kunci:", key="kata_cari", placeholder="nasi goreng, sakit kepala, ...")
+        sumber_cari = col_cari2.radio("Cari di:", ["Makanan", "Catatan"], key="sumber_cari", horizontal=True)
+        if kata_cari.strip():
+            if sumber_cari == "Makanan":
+                df_cari = wellness_manager.cari_makanan(kata_cari, start_date, end_date)
+                format_cari = presentasi.format_makanan
+            else:
+                df_cari = wellness_manager.cari_catatan(kata_cari, start_date, end_date)
+                format_cari = presentasi.format_catatan
+            if not df_cari.empty:
+                st.caption(f"{len(df_cari)} hasil teratas (paling relevan di atas, maksimal {CARI_BATAS_HASIL}).")
+                st.dataframe(format_cari(df_cari), use_container_width=True, hide_index=True)
+            else:
+                st.info(f"Tidak ada {sumber_cari.lower()} yang cocok dengan '{kata_cari}'.")
+
+
+def halaman_diagnostik():
+    # Halaman tersembunyi: hanya muncul di menu jika URL berisi ?diagnostik=1
+    st.header("🛠️ Diagnostik Query")
+    instrumen = instrumentasi.get_instrumentasi()
+    st.caption(f"Ambang query lambat: {instrumen.ambang_lambat_ms:.0f} ms · Instrumentasi {'aktif' if instrumen.aktif else 'nonaktif'}")
+    df_statistik = wellness_manager.statistik_query()
+    if df_statistik.empty:
+        st.info("Belum ada query yang tercatat.")
+    else:
+        st.dataframe(df_statistik.style.format({"p50_ms": "{:.2f}", "p95_ms": "{:.2f}", "maks_ms": "{:.2f}", "total_ms": "{:.1f}",
+                                                 "rata_baris": "{:.1f}", "rata_tunggu_koneksi_ms": "{:.2f}"}), use_container_width=True, hide_index=True)
+    st.write("#### Query Lambat Terakhir")
+    daftar_lambat = instrumen.query_lambat()
+    if not daftar_lambat:
+        st.info("Tidak ada query yang melewati ambang.")
+    for catatan in daftar_lambat[:10]:
+        with st.expander(f"{catatan.durasi_ms:.1f} ms · {catatan.metode or '-'} · {catatan.baris} baris"):
+            st.code(catatan.template, language="sql")
+            st.code("\n".join(catatan.rencana or []))
+    st.write("#### Cache Baca")
+    st.json(wellness_manager.statistik_cache())
+    if st.button("Reset Statistik Query"):
+        instrumen.reset()
+        st.rerun()
 
 def main():
     st.sidebar.title("🩺 Personal Wellness Tracker")
-    menu_pilihan = st.sidebar.radio("Pilih Menu:", ["Dashboard Harian", "Input Data Baru", "Riwayat & Analisis"], key="menu_utama")
+    daftar_menu = ["Dashboard Harian", "Input Data Baru", "Riwayat & Analisis"]
+    if st.query_params.get("diagnostik") == "1":
+        daftar_menu.append("Diagnostik")
+    menu_pilihan = st.sidebar.radio("Pilih Menu:", daftar_menu, key="menu_utama")
     st.sidebar.markdown("---")
     st.sidebar.info("Aplikasi Pelacak Kesehatan dan Kebugaran Komprehensif")
+    if DB_MULTI_PENGGUNA:
+        st.sidebar.caption(f"Masuk sebagai {st.user.get('email') or st.user.get('name') or '-'}")
+        st.sidebar.button("Keluar", on_click=st.logout)
 
     # The manager is already initialized via @st.cache_resource at the top level
     # wellness_manager = get_wellness_manager() # No need to call here again
 
-    if menu_pilihan == "Dashboard Harian":
-        halaman_dashboard()
-    elif menu_pilihan == "Input Data Baru":
-        halaman_input_data_baru()
-    elif menu_pilihan == "Riwayat & Analisis":
-        halaman_riwayat_analisis()
+    try:
+        if menu_pilihan == "Dashboard Harian":
+            halaman_dashboard()
+        elif menu_pilihan == "Input Data Baru":
+            halaman_input_data_baru()
+        elif menu_pilihan == "Riwayat & Analisis":
+            halaman_riwayat_analisis()
+        elif menu_pilihan == "Diagnostik":
+            halaman_diagnostik()
+    except PoolPenuh: # Semua koneksi database sedang dipakai sesi lain: jangan tampilkan halaman kosong seolah tanpa data
+        st.error("Server sedang sibuk melayani banyak pengguna. Silakan muat ulang halaman beberapa saat lagi.", icon="⏳")
 
     st.markdown("---")
     st.caption("Pengembangan Aplikasi Berbasis OOP")